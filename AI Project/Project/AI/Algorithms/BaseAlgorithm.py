@@ -5,6 +5,9 @@ Hold Base class for algorithms
 from typing import List, Tuple
 import math
 
+# Third party imports
+import numpy as np
+
 # PyQt imports
 # from PyQt5.QtCore import
 from PyQt5.QtWidgets import QWidget
@@ -79,6 +82,41 @@ class BaseAlgorithm(object):
         """
         return False, "The step method of the algorithm should be implemented"
 
+    def population_step(self, algorithm_data: AlgorithmData, population: dict) -> Tuple[bool, str, np.ndarray]:
+        """Perform one step in the algorithm for each long term memory of a population
+
+        Default population step method
+
+        The step is activated with each long term memory of the population and the StepResult
+        of the step is collected. At the end the long term memory of the algorithm is restored.
+        An algorithm can implement this method with calculation of all the population at once
+
+        Args:
+            algorithm_data: (AlgorithmData) - The algorithm data
+            population: (dict) - For each key of the long term memory an array with a long term memory
+                entry in each row (population size X entry shape)
+
+        Returns:
+            bool:   Whether the method succeeded
+            str:    Result message
+            np.ndarray: The StepResult of each long term memory (population size X observations)
+        """
+        saved_ltm = [(key, self.ltm[key]) for key in self.ltm.keys()]
+        population_size = next(iter(population.values())).shape[0]
+        results = np.empty((population_size, algorithm_data.shape[0]), dtype=int)
+        try:
+            for ltm_idx in range(population_size):
+                for key in population.keys():
+                    self.ltm[key] = population[key][ltm_idx]
+                success, message = self.step(algorithm_data)
+                if not success:
+                    return False, message, results
+                results[ltm_idx] = algorithm_data.labels(FieldRolls.StepResult)
+        finally:
+            for key, value in saved_ltm:
+                self.ltm[key] = value
+        return True, "", results
+
     def finished(self, score: float) -> Tuple[bool, str, bool]:
         """Check if the algorithm finished
 
@@ -0,0 +1,163 @@
+"""
+Implement the KMeansClustering algorithm accelerated with the triangle inequality (Hamerly's algorithm)
+"""
+# python imports
+from typing import Tuple
+
+# Third party imports
+import numpy as np
+
+# My imports
+from .KMeansClustering import KMeansClustering
+from .BaseAlgorithm import DistanceMetrics
+from .BaseAlgorithm import FieldRolls
+from .BaseAlgorithm import AlgorithmData
+from .BaseAlgorithm import ParametersList
+
+
+class HamerlyKMeansClustering(KMeansClustering):
+    """
+    This class implements the KMeansClustering algorithm with Hamerly's bounds
+
+    # Algorithm Description
+    ## Perpose:
+        To divide observations to groups with less distance calculations than KMeansClustering
+        (the result is the same)
+
+    ## Algorithm principals:
+        -   For each observation 2 bounds are kept:
+            -   upper - a bound on the distance from the centroid of its group
+            -   lower - a bound on the distance from the second nearest centroid
+        -   An observation can not change its group if its upper bound is smaller than its
+            lower bound or than half of the distance between its centroid and the nearest other centroid
+            (triangle inequality). The distances to all the centroids are calculated only for the other observations
+        -   After the centroids are moved the bounds are updated by the movement of the centroids:
+            -   upper - is the distance from the new centroid (calculated anyway for the evaluation)
+            -   lower - is decreased by the largest movement of the other centroids
+
+    ## Attributes
+        -   upper                   (ndarray of float) : the upper bound of each observation
+        -   lower                   (ndarray of float) : the lower bound of each observation
+        -   distance_evaluations    (int)              : the number of distances calculated
+
+    Args:
+        parameters      (ParametersList)    : a list of parameters to the algorithm
+        algorithm_data   (AlgorithmData)    : a normalized AlgorithmData
+    """
+
+    def __init__(self, parameters: ParametersList, algorithm_data: AlgorithmData):
+        super(HamerlyKMeansClustering, self).__init__(parameters, algorithm_data)
+        self.upper = None
+        self.lower = None
+        self.distance_evaluations = 0
+
+    def init(self) -> Tuple[bool, str]:
+        """
+        Init phase of the algorithm
+
+        Select the centroids (see KMeansClustering.init) and reset the bounds.
+        The bounds are set in the first step
+
+        Returns:
+            bool - Whether the operation succeeded
+            string - A result message string
+        """
+        self.upper = None
+        self.lower = None
+        self.distance_evaluations = 0
+        return super(HamerlyKMeansClustering, self).init()
+
+    def step(self, algorithm_data: AlgorithmData) -> Tuple[bool, str]:
+        """
+        Process a step in the algorithm
+
+        -#   Find the observations that their bounds do not prove that they stay in their group
+        -#   Put these observations in the correct group
+        -#   Calc the new centroid for each group as the avarage of the observations
+        -#   Update the bounds by the movement of the centroids
+
+        Returns:
+            bool - Whether the operation succeeded
+            string - A result message string
+        """
+        parameters = algorithm_data.cols_matrix(FieldRolls.Parameter, allow_sparse=True)
+        previous_groups = algorithm_data.labels(FieldRolls.StepResult)
+
+        # In the first step the distances from all the centroids are calculated
+        if self.upper is None:
+            groups, self.upper, self.lower = HamerlyKMeansClustering.two_nearest(parameters, self.centroids)
+            self.distance_evaluations += parameters.shape[0] * self.num_groups
+        else:
+            groups = previous_groups.copy()
+
+            # Half of the distance from each centroid to the nearest other centroid
+            centroids_distances = np.sqrt(DistanceMetrics.square_euclidean_matrix(self.centroids, self.centroids))
+            np.fill_diagonal(centroids_distances, np.inf)
+            half_distances = centroids_distances.min(axis=1) / 2
+            self.distance_evaluations += self.num_groups * self.num_groups
+
+            # Calculate the distances from all the centroids only for the observations that might move
+            moving = np.where(self.upper > np.maximum(half_distances[groups], self.lower))[0]
+            if moving.shape[0] > 0:
+                groups[moving], self.upper[moving], self.lower[moving] = \
+                    HamerlyKMeansClustering.two_nearest(parameters[moving], self.centroids)
+                self.distance_evaluations += moving.shape[0] * self.num_groups
+
+        # Set the groups and check whether there was a change
+        self.alg_finished = np.array_equal(groups, previous_groups)
+        algorithm_data.set_labels(FieldRolls.StepResult, groups)
+
+        # Calc the new centroids and update the bounds
+        previous_centroids = self.centroids.copy()
+        self.upper = self.calcCentroids()
+        self.distance_evaluations += parameters.shape[0]
+        self.update_lower(groups, np.sqrt(np.sum((self.centroids - previous_centroids) ** 2, axis=1)))
+        return True, ""
+
+    def update_lower(self, groups: np.ndarray, shifts: np.ndarray):
+        """
+        Decrease the lower bounds by the movement of the centroids
+
+        The lower bound of an observation is decreased by the largest movement of a centroid
+        that is not the centroid of its group
+
+        Args:
+            groups  : (ndarray of int) - The group of each observation
+            shifts  : (ndarray of float) - The movement of each centroid
+        """
+        if shifts.shape[0] < 2:
+            return
+        largest, second = np.argsort(shifts)[::-1][:2]
+        self.lower -= np.where(groups == largest, shifts[second], shifts[largest])
+
+    @staticmethod
+    def two_nearest(parameters, centroids: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Find the nearest and the second nearest centroids of each observation
+
+        The observations are processed in blocks (see DistanceMetrics.block_size)
+
+        Args:
+            parameters  : (ndarray or sparse.csr_matrix) - The parameters of the observations
+            centroids   : (ndarray matrix of float) - The centroids
+
+        Returns:
+            ndarray : The index of the nearest centroid of each observation
+            ndarray : The distance from the nearest centroid
+            ndarray : The distance from the second nearest centroid (inf if there is one centroid)
+        """
+        num_observations = parameters.shape[0]
+        groups = np.empty(num_observations, dtype=int)
+        nearest = np.empty(num_observations)
+        second = np.full(num_observations, np.inf)
+        rows_in_block = max(1, DistanceMetrics.block_size // max(1, centroids.shape[0]))
+        for start in range(0, num_observations, rows_in_block):
+            stop = min(start + rows_in_block, num_observations)
+            distances = np.sqrt(DistanceMetrics.square_euclidean_matrix(parameters[start:stop], centroids))
+            groups[start:stop] = np.argmin(distances, axis=1)
+            rows_idx = np.arange(stop - start)
+            nearest[start:stop] = distances[rows_idx, groups[start:stop]]
+            if centroids.shape[0] > 1:
+                distances[rows_idx, groups[start:stop]] = np.inf
+                second[start:stop] = distances.min(axis=1)
+        return groups, nearest, second
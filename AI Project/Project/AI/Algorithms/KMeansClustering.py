@@ -3,18 +3,27 @@ Implement the KMeansClustering algorithm
 """
 # python imports
 from typing import List, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+import multiprocessing
+import os
 
 # Third party imports
 import numpy as np
+from scipy import sparse
 from scipy.cluster.vq import kmeans2
 from sklearn.cluster import KMeans
 
+# PyQt imports
+from PyQt5.QtWidgets import QWidget
+
 # My imports
 from .BaseAlgorithm import BaseAlgorithm
 from .BaseAlgorithm import DistanceMetrics
 from .BaseAlgorithm import FieldRolls
-from .BaseAlgorithm import AlgorithmData, RowNames, ufunc
+from .BaseAlgorithm import AlgorithmData, RowNames
 from .BaseAlgorithm import ParametersList
+from .BaseAlgorithm import StdPrm, StdPrmInput
 
 
 class KMeansClustering(BaseAlgorithm):
@@ -28,20 +37,27 @@ class KMeansClustering(BaseAlgorithm):
     ## Algorithm parameters
         -   The number of groups to divide the observations to
         -   The observations
+        -   The number of restarts
 
     ## Algorithm principals:
         -   Each group has a centroid the centroid is a vector with the size of the
             number of the input fields fields
-        -   The initiation is to put one observation (randomly selected) as a centroid of each group
+        -   The initiation is to select observations as the centroids with k-means++ (see plus_plus_centroids)
+        -   If there is more than one restart the algorithm is run to the end from a different initiation in each
+            restart (the restarts run in parallel processes) and the centroids with the lowest evaluation are
+            the initiation
         -   The algorithm works in iterations. in each iteration there are 2 steps:
             -   Put each observation at the group which it's centroid is the nearest to 
             -   Calculate the new centroid as the avarage of the members in the group
         -   The algorithm finishes when there are no transfers of observations from one group to another
+        -   If the parameters include one-of-N code columns the observations are rows of
+            a sparse matrix (see AlgorithmData.sparse_cols) and the centroids are in the expanded space
 
     ## Attributes
         -   algorithm_data  (AlgorithmData)    : holds all the data for processing an algorithm
         -   finished_alg    (bool)             : whether the algorithm ended
         -   num_groups      (int)              : the number of groups 
+        -   num_restarts    (int)              : the number of restarts
         -   numFields       (int)              : the number of fields in each observation
         -   centroids       (num_groups X numFields float matrix)
 
@@ -50,14 +66,27 @@ class KMeansClustering(BaseAlgorithm):
         algorithm_data   (AlgorithmData)    : a normalized AlgorithmData
     """
 
+    # The maximal number of steps in a restart
+    max_restart_steps = 300
+
+    # The maximal number of processes that run the restarts
+    max_restart_workers = os.cpu_count() or 1
+
+    # The parameters of the observations in a process of the restarts (see init_restarts_process)
+    restarts_parameters = None
+
     def __init__(self, parameters: ParametersList, algorithm_data: AlgorithmData):
         super(KMeansClustering, self).__init__(parameters, algorithm_data)
 
         # Get the number of groups which is the number of possible results
         self.num_groups = len(algorithm_data.resultValues)
+        self.num_restarts = int(self.parameters["Number of restarts"]["value"])
 
         # Get the number of parameters
-        self.num_fields = self.algorithm_data[RowNames.Roll, FieldRolls.Parameter].shape[0]
+        if self.algorithm_data.has_categories(FieldRolls.Parameter):
+            self.num_fields = self.algorithm_data.sparse_cols(FieldRolls.Parameter).shape[1]
+        else:
+            self.num_fields = self.algorithm_data[RowNames.Roll, FieldRolls.Parameter].shape[0]
 
         # Allocate the centroids
         self.centroids = np.zeros((self.num_groups, self.num_fields))
@@ -65,28 +94,181 @@ class KMeansClustering(BaseAlgorithm):
         # Initialize finished flag
         self.alg_finished = False
 
+    @staticmethod
+    def prms(widget: QWidget) -> List:
+        """Generate parameters list of the algorithm
+
+        This method adds the following parameters:
+        -   The number of restarts (1 - no restarts)
+
+        Args:
+            widget: (QWidget) - The ParametersWidget that will handle the parameters
+
+        Retrns:
+            List of parameters to the algorithm
+        """
+        parameters = []
+        parameters.append(
+            StdPrm("Number of restarts", 1, True, StdPrmInput.spinBox, [1], widget.spinValueChanged, []))
+        return parameters
+
     def init(self) -> Tuple[bool, str]:
         """
         Init phase of the algorithm
 
-        Randomly select observations and put them in the centroids  
+        Select the centroids with k-means++ or with the restarts (see best_centroids)
 
         Returns:
             bool - Whether the operation succeeded  
             string - A result message string    
        
         """
-        # Int the step results column in the algorithm data
-        ufunc.fill(self.algorithm_data, FieldRolls.StepResult, -1)
+        if self.num_restarts < 1:
+            return False, "The number of restarts has to be positive"
 
-        # Select and fill the centroids
-        centroid_idxs = np.random.randint(0, self.algorithm_data.shape[0], self.num_groups).tolist()
+        # Int the step results column in the algorithm data
+        self.algorithm_data.set_labels(FieldRolls.StepResult, -1)
 
         # Create the centroids
-        self.centroids = self.algorithm_data[centroid_idxs, FieldRolls.Parameter]
+        parameters = self.algorithm_data.cols_matrix(FieldRolls.Parameter, allow_sparse=True)
+        self.centroids = KMeansClustering.best_centroids(parameters, self.num_groups, self.num_restarts)
 
         return True, ""
 
+    @staticmethod
+    def best_centroids(parameters, num_groups: int, num_restarts: int) -> np.ndarray:
+        """
+        Select the initial centroids
+
+        -   One restart - the centroids are selected with k-means++
+        -   More restarts - each restart is run (see restart) in a process pool (if there is more than
+            one cpu) with a different seed and the centroids of the restart with the lowest evaluation are returned
+
+        The seeds are drawn from np.random so the result depends only on the numpy seed
+
+        The processes of the pool are spawned on all the platforms (like the default on Windows) so the main
+        script of the application has to be guarded by if __name__ == "__main__" (see main.py).
+        The parameters are sent once to each process (see init_restarts_process) and only the seeds are sent
+        for each restart
+
+        Args:
+            parameters      : (ndarray or sparse.csr_matrix) - The parameters of the observations
+            num_groups      : (int) - The number of groups
+            num_restarts    : (int) - The number of restarts
+
+        Returns:
+            ndarray : num_groups X parameters matrix
+        """
+        if num_restarts == 1:
+            return KMeansClustering.plus_plus_centroids(parameters, num_groups)
+        seeds = np.random.randint(0, 2 ** 31 - 1, num_restarts)
+        num_workers = min(num_restarts, KMeansClustering.max_restart_workers)
+        if num_workers == 1:
+            results = [KMeansClustering.restart(parameters, num_groups, seed) for seed in seeds]
+        else:
+            with ProcessPoolExecutor(max_workers=num_workers, mp_context=multiprocessing.get_context("spawn"),
+                                     initializer=KMeansClustering.init_restarts_process,
+                                     initargs=(parameters,)) as executor:
+                results = list(executor.map(KMeansClustering.process_restart, repeat(num_groups), seeds))
+        _, centroids = min(results, key=lambda result: result[0])
+        return centroids
+
+    @staticmethod
+    def init_restarts_process(parameters):
+        """
+        Keep the parameters of the observations in a process of the restarts (the initializer of the pool)
+
+        Args:
+            parameters  : (ndarray or sparse.csr_matrix) - The parameters of the observations
+        """
+        KMeansClustering.restarts_parameters = parameters
+
+    @staticmethod
+    def process_restart(num_groups: int, seed: int) -> Tuple[float, np.ndarray]:
+        """
+        Run a restart (see restart) in a process of the restarts with the parameters kept by init_restarts_process
+
+        Args:
+            num_groups  : (int) - The number of groups
+            seed        : (int) - The seed of the random state of the restart
+
+        Returns:
+            float   : The evaluation of the last step
+            ndarray : The centroids
+        """
+        return KMeansClustering.restart(KMeansClustering.restarts_parameters, num_groups, seed)
+
+    @staticmethod
+    def restart(parameters, num_groups: int, seed: int) -> Tuple[float, np.ndarray]:
+        """
+        Run the algorithm to the end from centroids selected with k-means++
+
+        The algorithm finishes when there are no transfers of observations or after max_restart_steps
+
+        Args:
+            parameters  : (ndarray or sparse.csr_matrix) - The parameters of the observations
+            num_groups  : (int) - The number of groups
+            seed        : (int) - The seed of the random state of the restart (np.random is not changed)
+
+        Returns:
+            float   : The evaluation of the last step
+            ndarray : The centroids
+        """
+        centroids = KMeansClustering.plus_plus_centroids(parameters, num_groups, np.random.RandomState(seed))
+        groups = np.full(parameters.shape[0], -1)
+        evaluation = 0.0
+        for _ in range(KMeansClustering.max_restart_steps):
+            selected_centroids = DistanceMetrics.nearest(parameters, centroids)
+            finished = np.array_equal(selected_centroids, groups)
+            groups = selected_centroids
+            evaluation, _ = KMeansClustering.update_centroids(parameters, groups, centroids, num_groups)
+            if finished:
+                break
+        return evaluation, centroids
+
+    @staticmethod
+    def plus_plus_centroids(parameters, num_groups: int, random_state: np.random.RandomState = None) -> np.ndarray:
+        """
+        Select centroids with k-means++
+
+        -   The first centroid is a randomly selected observation
+        -   Each of the next centroids is an observation selected with a probability proportional
+            to the square distance from the nearest centroid that was already selected
+
+        So the centroids are different observations (unless there are less different observations than groups)
+        that are spread over the data
+
+        Args:
+            parameters  : (ndarray or sparse.csr_matrix) - The parameters of the observations
+            num_groups  : (int) - The number of groups
+            random_state: (np.random.RandomState) - The random numbers generator (np.random if None)
+
+        Returns:
+            ndarray : num_groups X parameters matrix
+        """
+        random = np.random if random_state is None else random_state
+        num_observations = parameters.shape[0]
+        norms = DistanceMetrics.square_norms(parameters)
+        centroids = np.zeros((num_groups, parameters.shape[1]))
+        closest = np.full(num_observations, np.inf)
+        centroid_idx = random.randint(0, num_observations)
+        for group in range(num_groups):
+            if group > 0:
+                # Select an observation by the square distances (uniformly if all the distances are 0)
+                cumulative = np.cumsum(closest)
+                if cumulative[-1] > 0:
+                    centroid_idx = int(np.searchsorted(cumulative, random.random() * cumulative[-1], side="right"))
+                    centroid_idx = min(centroid_idx, num_observations - 1)
+                else:
+                    centroid_idx = random.randint(0, num_observations)
+            centroid = parameters[centroid_idx]
+            centroids[group] = centroid.toarray().flatten() if sparse.issparse(centroid) else centroid
+
+            # The square distance of each observation from the nearest selected centroid
+            products = np.asarray(parameters @ centroids[group]).flatten()
+            closest = np.minimum(closest, np.maximum(norms + centroids[group] @ centroids[group] - 2 * products, 0))
+        return centroids
+
     def step(self, algorithm_data: AlgorithmData) -> Tuple[bool, str]:
         """
         Process a step in the algorithm
@@ -140,6 +322,10 @@ class KMeansClustering(BaseAlgorithm):
 
         In each case a different algorithm_data is used  
 
+        The distances between all the observations and the centroids are calculated as matrix
+        products and the group of each observation is the argmin of its row (see DistanceMetrics.nearest).
+        This is done the same way for dense and sparse parameters
+
         Args:  
             num_groups       : (int) - The number of groups in the algorithm  
             algorithm_data	 : (AlgorithmData) - The algorithm_data to process  
@@ -149,32 +335,15 @@ class KMeansClustering(BaseAlgorithm):
             bool : whether there was a change in the groups   
                 
         """
-        dist_met = DistanceMetrics()
-        finished = True
+        parameters = algorithm_data.cols_matrix(FieldRolls.Parameter, allow_sparse=True)
+        centroids = np.asarray(centroids, dtype=float)[:num_groups]
 
         # from each observation find the neerest centroid
-        for row_idx in range(algorithm_data.shape[0]):
-            selected_centroid = -1
-            min_dist = float('inf')
-            parameters = algorithm_data[row_idx, FieldRolls.Parameter]
-
-            # for each group
-            for group_idx in range(num_groups):
-
-                # calc the distance between the observation and the centroid
-                dist = dist_met.euclidean(centroids[group_idx], parameters)
-
-                # if the distance is smaller then the previous one set the group
-                if (dist < min_dist):
-                    min_dist = dist
-                    selected_centroid = group_idx
-
-            # After there is a dissition for the observation update set the group and update
-            # the finished flag
-            if (selected_centroid != algorithm_data[row_idx, FieldRolls.StepResult]):
-                finished = False
-                algorithm_data[row_idx, FieldRolls.StepResult] = selected_centroid
+        selected_centroids = DistanceMetrics.nearest(parameters, centroids)
 
+        # Set the groups and check whether there was a change
+        finished = np.array_equal(selected_centroids, algorithm_data.labels(FieldRolls.StepResult))
+        algorithm_data.set_labels(FieldRolls.StepResult, selected_centroids)
         return finished
 
     def calcCentroids(self):
@@ -185,31 +354,87 @@ class KMeansClustering(BaseAlgorithm):
         -#   After the groups where constructed calc the new centroid as the avarage of the
             observations in the group  
         -#   Calc the avarage of the distance between the observations and the new centroid
-            for presentation perposes         
+            for presentation perposes (the evaluation is the sum of the avarages of the groups)
+
+        The sums of the groups are calculated for all the groups at once (see group_sums) and the
+        distances as \f$\|x\|^2 + \|c\|^2 - 2xc\f$
+
+        An empty group has no avarage. Its centroid is moved to the observation that is the
+        farthest from its centroid (so the group gets members in the next step) and it is not
+        part of the evaluation
+
+        Returns:
+            ndarray : The distance of each observation from the new centroid of its group
         """
-        dist_met = DistanceMetrics()
-        self.evaluation = 0
+        parameters = self.algorithm_data.cols_matrix(FieldRolls.Parameter, allow_sparse=True)
+        groups = self.algorithm_data.labels(FieldRolls.StepResult)
+        self.evaluation, members_dist = KMeansClustering.update_centroids(parameters, groups, self.centroids,
+                                                                          self.num_groups)
+        return members_dist
 
-        # calc the centroid
-        for group_idx in range(self.num_groups):
+    @staticmethod
+    def update_centroids(parameters, groups: np.ndarray, centroids: np.ndarray,
+                         num_groups: int) -> Tuple[float, np.ndarray]:
+        """
+        Calculate the new centroids (in place) and the evaluation (see calcCentroids)
+
+        Args:
+            parameters  : (ndarray or sparse.csr_matrix) - The parameters of the observations
+            groups      : (ndarray of int) - The group of each observation
+            centroids   : (ndarray matrix of float) - The centroids (updated by the method)
+            num_groups  : (int) - The number of groups
 
-            # Generate a list of rows bellongs to the group
-            members = np.where(self.algorithm_data[:, FieldRolls.StepResult] == group_idx)[0]
+        Returns:
+            float   : The evaluation
+            ndarray : The distance of each observation from the new centroid of its group
+        """
+        # calc the centroids of the groups that have members
+        counts = np.bincount(groups, minlength=num_groups)
+        members_groups = counts > 0
+        sums = KMeansClustering.group_sums(parameters, groups, num_groups)
+        centroids[members_groups] = sums[members_groups] / counts[members_groups].reshape(-1, 1)
+
+        # The distance of each observation from the centroid of its group
+        products = DistanceMetrics.row_products(parameters, centroids[groups])
+        members_dist = np.sqrt(np.maximum(DistanceMetrics.square_norms(parameters) +
+                                          DistanceMetrics.square_norms(centroids)[groups] - 2 * products, 0))
+
+        # Calc the avarage of the distances of each group and add it to the evaluation
+        dist_sums = np.bincount(groups, weights=members_dist, minlength=num_groups)
+        evaluation = float(np.sum(dist_sums[members_groups] / counts[members_groups]))
+
+        # Move the centroids of the empty groups to the farthest observations
+        empty_groups = np.where(~members_groups)[0]
+        if empty_groups.shape[0] > 0:
+            farthest = np.argsort(members_dist, kind="stable")[::-1][:empty_groups.shape[0]]
+            farthest_parameters = parameters[farthest]
+            if sparse.issparse(farthest_parameters):
+                farthest_parameters = farthest_parameters.toarray()
+            centroids[empty_groups[:farthest.shape[0]]] = farthest_parameters
+        return evaluation, members_dist
 
-            # generate a matrix of members X the members parameters
-            members_parameters = self.algorithm_data[members.tolist(), FieldRolls.Parameter]
+    @staticmethod
+    def group_sums(parameters, groups: np.ndarray, num_groups: int) -> np.ndarray:
+        """
+        Calculate the sums of the parameters of the observations of each group
 
-            # calculate the avarage of each parameters and put it in the centroid
-            for parameter_idx in range(self.num_fields):
-                self.centroids[group_idx, parameter_idx] = np.average(members_parameters[:, parameter_idx])
+        -   Dense parameters - np.bincount with the parameter as weights (for each parameter)
+        -   Sparse parameters - a product with a sparse membership matrix (groups X observations)
 
-            # Create a vector holds the distances between the observations and the new centroid
-            members_dist = np.zeros(members.shape[0])
-            for member_idx in range(members.shape[0]):
-                members_dist[member_idx] = dist_met.euclidean(members_parameters[member_idx], self.centroids[group_idx])
+        Args:
+            parameters  : (ndarray or sparse.csr_matrix) - The parameters of the observations
+            groups      : (ndarray of int) - The group of each observation
+            num_groups  : (int) - The number of groups
 
-            # Calc the avarage of the distances and add it to the evaluation
-            self.evaluation += np.average(members_dist)
+        Returns:
+            ndarray : num_groups X parameters matrix
+        """
+        if sparse.issparse(parameters):
+            membership = sparse.csr_matrix((np.ones(groups.shape[0]), (groups, np.arange(groups.shape[0]))),
+                                           shape=(num_groups, groups.shape[0]))
+            return (membership @ parameters).toarray()
+        return np.stack([np.bincount(groups, weights=parameters[:, parameter_idx], minlength=num_groups)
+                         for parameter_idx in range(parameters.shape[1])], axis=1)
 
     @staticmethod
     def create_test_conv(num_groups: int, algorithm_data: AlgorithmData) -> np.ndarray:
@@ -234,25 +459,17 @@ class KMeansClustering(BaseAlgorithm):
 
         # The test conv is converting between the number of the group in the centroid
         # (The location in the vector) and the group in the result (the value in the vector)
-        test_conv = np.zeros(num_groups)
-        for step_group_idx in range(num_groups):
-
-            # Get all the rows with the step_group_idx in the stepResult column
-            rows_of_step_group = np.argwhere(
-                algorithm_data[:, FieldRolls.StepResult] == step_group_idx).flatten().tolist()
+        step_groups = algorithm_data.labels(FieldRolls.StepResult)
+        result_groups = algorithm_data.labels(FieldRolls.ResultPresentation)
 
-            # Extract from the matrix with the rows with the step_group_idx the column with the result group
-            step_group_data = algorithm_data[rows_of_step_group, FieldRolls.ResultPresentation]
+        # Count for each step group the number of the members of each result group
+        # (only observations that has a step group and a result group are counted)
+        legal = (step_groups >= 0) & (step_groups < num_groups) & (result_groups >= 0) & (result_groups < num_groups)
+        counts = np.bincount(step_groups[legal] * num_groups + result_groups[legal], minlength=num_groups * num_groups)
 
-            result_group_size = 0
-
-            # Find the result group with the largest number of entries in the vectors
-            # This result group is the group that the algorithm claims that is the step group
-            for result_group_Idx in range(num_groups):
-                num_result_in_group = np.where(step_group_data == result_group_Idx)[0].shape[0]
-                if num_result_in_group > result_group_size:
-                    result_group_size = num_result_in_group
-                    test_conv[step_group_idx] = result_group_Idx
+        # The result group with the largest number of entries in the step group
+        # is the group that the algorithm claims that is the step group
+        test_conv = counts.reshape((num_groups, num_groups)).argmax(axis=1)
 
         return test_conv
 
@@ -293,17 +510,12 @@ class KMeansClustering(BaseAlgorithm):
             True  
             string  : A string holds the test results      
         """
-        # for each row in the test data increase a counter according to whether
-        # the result calculated by the algorithm is equal to the expected result
-        num_success = 0
-        num_field = 0
-        for row_idx in range(algorithm_data.shape[0]):
-            test_result = test_conv[int(algorithm_data[row_idx, FieldRolls.StepResult])]
-            expected_result = algorithm_data[row_idx, FieldRolls.ResultPresentation]
-            if test_result == expected_result:
-                num_success += 1
-            else:
-                num_field += 1
+        # for each row in the test data check whether the result calculated by the
+        # algorithm is equal to the expected result
+        test_results = test_conv[algorithm_data.labels(FieldRolls.StepResult)]
+        expected_results = algorithm_data.labels(FieldRolls.ResultPresentation)
+        num_success = int(np.sum(test_results == expected_results))
+        num_field = algorithm_data.shape[0] - num_success
 
         # Generate output message
         num_test = num_field + num_success
@@ -337,23 +549,24 @@ class KMeansClustering(BaseAlgorithm):
             string  : A string holds the test results    
         """
 
-        # Create input to the scipy method
-        parameters = algorithm_data[:, FieldRolls.Parameter]
+        # Create input to the scipy method (kmeans2 works only with dense matrix)
+        parameters = algorithm_data.cols_matrix(FieldRolls.Parameter, allow_sparse=True)
+        if sparse.issparse(parameters):
+            parameters = parameters.toarray()
         num_groups = len(algorithm_data.resultValues)
 
         # Activate the scipy method
         centroids, labels = kmeans2(parameters, num_groups)
 
         # Insert the results to the algorithm_data
-        for row_idx in range(labels.shape[0]):
-            algorithm_data[row_idx, FieldRolls.StepResult] = labels[row_idx]
+        algorithm_data.set_labels(FieldRolls.StepResult, labels)
 
         # Create a conversion vector
         test_conv = KMeansClustering.create_test_conv(num_groups, algorithm_data)
 
         # Perform one step of the algorithm to decide to which group each
         # result belongs
-        ufunc.fill(test_algorithm_data, FieldRolls.StepResult, -1)
+        test_algorithm_data.set_labels(FieldRolls.StepResult, -1)
         KMeansClustering.find_centroid(num_groups, test_algorithm_data, centroids)
 
         # Test the results
@@ -384,7 +597,7 @@ class KMeansClustering(BaseAlgorithm):
         """
 
         # Create input to the scipy method
-        parameters = algorithm_data[:, FieldRolls.Parameter]
+        parameters = algorithm_data.cols_matrix(FieldRolls.Parameter, allow_sparse=True)
         num_groups = len(algorithm_data.resultValues)
 
         # Activate the scikit - Learn method
@@ -393,15 +606,14 @@ class KMeansClustering(BaseAlgorithm):
         centroids = kmeans.cluster_centers_
 
         # Insert the results to the algorithm_data
-        for row_idx in range(labels.shape[0]):
-            algorithm_data[row_idx, FieldRolls.StepResult] = labels[row_idx]
+        algorithm_data.set_labels(FieldRolls.StepResult, labels)
 
         # Create a conversion vector
         test_conv = KMeansClustering.create_test_conv(num_groups, algorithm_data)
 
         # Perform one step of the algorithm to decide to which group each
         # result belongs
-        ufunc.fill(test_algorithm_data, FieldRolls.StepResult, -1)
+        test_algorithm_data.set_labels(FieldRolls.StepResult, -1)
         KMeansClustering.find_centroid(num_groups, test_algorithm_data, centroids)
 
         # Test the results
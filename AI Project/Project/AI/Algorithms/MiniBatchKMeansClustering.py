@@ -0,0 +1,185 @@
+"""
+Implement the mini batch KMeansClustering algorithm
+"""
+# python imports
+from typing import List, Tuple
+
+# Third party imports
+import numpy as np
+
+# PyQt imports
+from PyQt5.QtWidgets import QWidget
+
+# My imports
+from .KMeansClustering import KMeansClustering
+from .BaseAlgorithm import DistanceMetrics
+from .BaseAlgorithm import FieldRolls
+from .BaseAlgorithm import AlgorithmData
+from .BaseAlgorithm import ParametersList
+from .BaseAlgorithm import StdPrm, StdPrmInput
+
+
+class MiniBatchKMeansClustering(KMeansClustering):
+    """
+    This class implements the mini batch KMeansClustering algorithm
+
+    # Algorithm Description
+    ## Perpose:
+        To divide observations to groups when the observations do not fit in the memory
+
+    ## Algorithm parameters
+        -   The number of observations in a batch
+        -   The number of restarts (run on a batch see KMeansClustering.best_centroids)
+        -   The observations (an AlgorithmData in the memory or loaded with a memory map
+            see AlgorithmData.load)
+
+    ## Algorithm principals:
+        -   In each step a batch of observations is randomly selected. Only the rows of the
+            batch are read from the algorithm data
+        -   Each observation of the batch is put in the group which it's centroid is the nearest to
+        -   Each centroid is moved to the avarage of the members of its group in the batch with a
+            learning rate that is the part of the batch members from all the observations the centroid
+            had so far (so the centroid is the avarage of all the observations that were assigned to it)
+        -   The algorithm finishes when the largest movement of a centroid in a step is smaller
+            than movement_tolerance
+        -   The groups are set only in the batches (the StepResult column of the algorithm data is not changed)
+
+    ## Attributes
+        -   batch_size      (int)                    : the number of observations in a batch
+        -   counts          (ndarray of int)         : the number of observations each centroid had
+        -   movement        (float)                  : the largest movement of a centroid in the last step
+
+    Args:
+        parameters      (ParametersList)    : a list of parameters to the algorithm
+        algorithm_data   (AlgorithmData)    : a normalized AlgorithmData
+    """
+
+    # The largest movement of a centroid in a step that finishes the algorithm
+    movement_tolerance = 1e-3
+
+    def __init__(self, parameters: ParametersList, algorithm_data: AlgorithmData):
+        super(MiniBatchKMeansClustering, self).__init__(parameters, algorithm_data)
+        self.batch_size = int(self.parameters["Batch size"]["value"])
+        self.counts = np.zeros(self.num_groups, dtype=int)
+        self.movement = np.inf
+        self.evaluation = 0.0
+
+    @staticmethod
+    def prms(widget: QWidget) -> List:
+        """Generate parameters list of the algorithm
+
+        Gets the parameters of KMeansClustering
+
+        Add to these parameters the number of observations in a batch
+
+        Args:
+            widget: (QWidget) - The ParametersWidget that will handle the parameters
+
+        Retrns:
+            List of parameters to the algorithm
+        """
+        parameters = KMeansClustering.prms(widget)
+        parameters.append(
+            StdPrm("Batch size", "", False, StdPrmInput.spinBox, [100], widget.spinValueChanged, []))
+        return parameters
+
+    def init(self) -> Tuple[bool, str]:
+        """
+        Init phase of the algorithm
+
+        Select the centroids from a batch (see KMeansClustering.best_centroids)
+
+        Returns:
+            bool - Whether the operation succeeded
+            string - A result message string
+        """
+        if self.batch_size < 1 or self.num_restarts < 1:
+            return False, "The batch size and the number of restarts have to be positive"
+        batch = MiniBatchKMeansClustering.batch(
+            self.algorithm_data, np.unique(np.random.randint(0, self.algorithm_data.shape[0], self.batch_size)))
+        self.centroids = KMeansClustering.best_centroids(batch.cols_matrix(FieldRolls.Parameter, allow_sparse=True),
+                                                         self.num_groups, self.num_restarts)
+        self.counts = np.zeros(self.num_groups, dtype=int)
+        self.movement = np.inf
+        return True, ""
+
+    def step(self, algorithm_data: AlgorithmData) -> Tuple[bool, str]:
+        """
+        Process a step in the algorithm
+
+        -#   Select a batch and put each observation of the batch in the correct group
+        -#   Move each centroid toward the avarage of its members in the batch
+        -#   Calc the evaluation of the batch
+
+        Returns:
+            bool - Whether the operation succeeded
+            string - A result message string
+        """
+        batch_idx = np.unique(np.random.randint(0, algorithm_data.shape[0], self.batch_size))
+        batch = MiniBatchKMeansClustering.batch(algorithm_data, batch_idx)
+        KMeansClustering.find_centroid(self.num_groups, batch, self.centroids)
+        parameters = batch.cols_matrix(FieldRolls.Parameter, allow_sparse=True)
+        groups = batch.labels(FieldRolls.StepResult)
+
+        # Move the centroids with a learning rate of the batch members from all the centroid members
+        batch_counts = np.bincount(groups, minlength=self.num_groups)
+        members_groups = batch_counts > 0
+        self.counts += batch_counts
+        learning_rates = batch_counts[members_groups] / self.counts[members_groups]
+        batch_centroids = KMeansClustering.group_sums(parameters, groups, self.num_groups)[members_groups] / \
+            batch_counts[members_groups].reshape(-1, 1)
+        previous_centroids = self.centroids.copy()
+        self.centroids[members_groups] += learning_rates.reshape(-1, 1) * \
+            (batch_centroids - self.centroids[members_groups])
+        self.movement = float(np.max(np.sqrt(np.sum((self.centroids - previous_centroids) ** 2, axis=1))))
+        self.alg_finished = self.movement < MiniBatchKMeansClustering.movement_tolerance
+
+        # Calc the avarage of the distances of each group in the batch and add it to the evaluation
+        members_dist = np.sqrt(np.maximum(DistanceMetrics.square_norms(parameters) +
+                                          DistanceMetrics.square_norms(self.centroids)[groups] -
+                                          2 * DistanceMetrics.row_products(parameters, self.centroids[groups]), 0))
+        dist_sums = np.bincount(groups, weights=members_dist, minlength=self.num_groups)
+        self.evaluation = float(np.sum(dist_sums[members_groups] / batch_counts[members_groups]))
+        return True, ""
+
+    @staticmethod
+    def batch(algorithm_data: AlgorithmData, rows_idx: np.ndarray) -> AlgorithmData:
+        """
+        Get a copy of rows of the algorithm data
+
+        Only the selected rows are read (if the algorithm data is a memory map the rest of
+        the data is not read). The rows are read in their order in the data so rows_idx should be sorted
+
+        Args:
+            algorithm_data  : (AlgorithmData) - The algorithm data
+            rows_idx        : (ndarray of int) - The indexes of the rows
+
+        Returns:
+            AlgorithmData : The rows with the header of algorithm_data
+        """
+        rows_idx = np.asarray(rows_idx)
+        rows = np.ndarray.__getitem__(algorithm_data, (rows_idx, slice(None)))
+        return algorithm_data.share_attributes(rows, rows_idx)
+
+    def test(self, test_algorithm_data: AlgorithmData) -> Tuple[bool, str, bool]:
+        """
+
+        test the algorithm results on test data
+
+        The conversion between the groups of the algorithm and the groups in the result is
+        created from a new batch (the groups are not set for all the observations)
+
+        Args:
+            test_algorithm_data	: (AlgorithmData) - an algorithm data with the test data
+
+        Returns:
+            success : Wether the operation succeeded
+            string  : A string holds the test results
+            bool    : The result of the test
+        """
+        batch = MiniBatchKMeansClustering.batch(
+            self.algorithm_data, np.unique(np.random.randint(0, self.algorithm_data.shape[0], self.batch_size)))
+        KMeansClustering.find_centroid(self.num_groups, batch, self.centroids)
+        test_conv = KMeansClustering.create_test_conv(self.num_groups, batch)
+        KMeansClustering.find_centroid(self.num_groups, test_algorithm_data, self.centroids)
+        return KMeansClustering.test_results(test_conv, test_algorithm_data)
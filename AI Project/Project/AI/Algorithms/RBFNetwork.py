@@ -3,7 +3,6 @@ Implement the RBFNetwork algorithm
 """
 # python imports
 from typing import List, Tuple
-import math
 
 # Third party imports
 import numpy as np
@@ -65,6 +64,9 @@ class RBFNetwork(BaseAlgorithm):
         algorithm_data   (AlgorithmData)    : a normalized AlgorithmData
     """
 
+    # The number of entries in a block of the population step
+    population_block_size = 2 ** 16
+
     def __init__(self, parameters: ParametersList, algorithm_data: AlgorithmData):
         super(RBFNetwork, self).__init__(parameters, algorithm_data)
 
@@ -80,9 +82,6 @@ class RBFNetwork(BaseAlgorithm):
             (self.num_funcs, self.num_fields))), ("b", np.zeros((self.num_funcs, self.num_fields))),
                                   ("c", np.zeros((self.num_funcs, self.num_fields))))
 
-        # Create an instance of distance metrix
-        self.dist_met = DistanceMetrics()
-
         #initialize the number of misses to the number of results
         self.num_miss = self.algorithm_data.shape[0]
 
@@ -122,20 +121,22 @@ class RBFNetwork(BaseAlgorithm):
 
         This method implement one step fo the algorithm
 
-        -#  For each observation
-            -#  Activate the RBF method on the observation
-            -#  The selected group is the one with the maximum result of the RBF   
+        -#  Calculate the results of all the RBF methods on all the observations (see rbf_matrix)
+        -#  The selected group of each observation is the one with the maximum result of the RBF
+
+        The observations are processed in blocks so the memory used is bounded (see DistanceMetrics.block_size)
 
         Returns:
             bool:   Whether the method succeeded
             str:    Result message
         """
-        for input_idx in range(algorithm_data.shape[0]):
-            prms = algorithm_data[input_idx, FieldRolls.Parameter]
-            rbf_results = np.zeros(self.num_funcs)
-            for rbf_idx in range(self.num_funcs):
-                rbf_results[rbf_idx] = self.rbf(prms, rbf_idx)
-            algorithm_data[input_idx, FieldRolls.StepResult] = rbf_results.argmax()
+        parameters = algorithm_data.cols_matrix(FieldRolls.Parameter, float)
+        selected = np.empty(parameters.shape[0], dtype=int)
+        rows_in_block = max(1, DistanceMetrics.block_size // max(1, self.num_funcs, self.num_fields))
+        for start in range(0, parameters.shape[0], rows_in_block):
+            stop = min(start + rows_in_block, parameters.shape[0])
+            selected[start:stop] = self.rbf_matrix(parameters[start:stop]).argmax(axis=1)
+        algorithm_data.set_labels(FieldRolls.StepResult, selected)
         return True, ""
 
     def rbf(self, prms: np.ndarray, rbf_idx: int) -> float:
@@ -150,7 +151,122 @@ class RBFNetwork(BaseAlgorithm):
         Returns:
             float: The result of the RBF 
         """
+        return float(self.rbf_matrix(np.asarray(prms, dtype=float).reshape(1, -1))[0, rbf_idx])
+
+    def rbf_matrix(self, parameters: np.ndarray) -> np.ndarray:
+        """The results of all the RBF methods on observations
+
+        The square distances \f$\|b_i X- c_i \|^2\f$ of all the observations and the RBF methods
+        are calculated as matrix products \f$X^2 (b^2)^T - 2X(bc)^T + \|c\|^2\f$
+
+        Args:
+            parameters: (np.ndarray) - The observations (observations X fields)
+
+        Returns:
+            np.ndarray: The results (observations X RBF methods)
+        """
+        a = self.ltm["a"]
+        return np.sum(a) * np.expm1(-self.square_distances(parameters)) + a.size
+
+    def square_distances(self, parameters: np.ndarray) -> np.ndarray:
+        """The square distances \f$\|b_i X- c_i \|^2\f$ of observations from the centers of the RBF methods
+
+        Args:
+            parameters: (np.ndarray) - The observations (observations X fields)
+
+        Returns:
+            np.ndarray: The square distances (observations X RBF methods)
+        """
+        return RBFNetwork.centers_square_distances(parameters, self.ltm["b"], self.ltm["c"])
+
+    @staticmethod
+    def centers_square_distances(parameters: np.ndarray, b: np.ndarray, c: np.ndarray) -> np.ndarray:
+        """The square distances \f$\|b_i X- c_i \|^2\f$ of observations from centers with scales
+
+        The calculation formula is \f$X^2 (b^2)^T - 2X(bc)^T + \|c\|^2\f$
+
+        Args:
+            parameters: (np.ndarray) - The observations (observations X fields)
+            b: (np.ndarray) - The scales (centers X fields)
+            c: (np.ndarray) - The centers (centers X fields)
+
+        Returns:
+            np.ndarray: The square distances (observations X centers)
+        """
+        square_distances = DistanceMetrics.products(parameters ** 2, b ** 2) - \
+            2 * DistanceMetrics.products(parameters, b * c) + np.sum(c ** 2, axis=1)
+        return np.maximum(square_distances, 0)
+
+    def population_step(self, algorithm_data: AlgorithmData, population: dict) -> Tuple[bool, str, np.ndarray]:
+        """Perform one step in the algorithm for each long term memory of a population
+
+        The RBF methods of all the population are stacked so the square distances of all the
+        population are calculated with one matrix product for each block of observations
+        (the blocks are of population_block_size entries so they stay in the cache)
+
+        Args:
+            algorithm_data: (AlgorithmData) - The algorithm data
+            population: (dict) - For each key of the long term memory an array with a long term memory
+                entry in each row (population size X RBF methods X fields)
+
+        Returns:
+            bool:   Whether the method succeeded
+            str:    Result message
+            np.ndarray: The StepResult of each long term memory (population size X observations)
+        """
+        a, b, c = population["a"], population["b"], population["c"]
+        population_size = a.shape[0]
+        totals = np.sum(a, axis=(1, 2)).reshape(1, -1, 1)
+        stacked_b = b.reshape(-1, self.num_fields)
+        stacked_c = c.reshape(-1, self.num_fields)
+
+        parameters = algorithm_data.cols_matrix(FieldRolls.Parameter, float)
+        results = np.empty((population_size, parameters.shape[0]), dtype=int)
+        rows_in_block = max(1, RBFNetwork.population_block_size // max(1, stacked_b.shape[0], self.num_fields))
+        for start in range(0, parameters.shape[0], rows_in_block):
+            stop = min(start + rows_in_block, parameters.shape[0])
+            square_distances = RBFNetwork.centers_square_distances(parameters[start:stop], stacked_b, stacked_c)
+            rbf_results = totals * np.expm1(-square_distances.reshape(stop - start, population_size, -1)) + \
+                a[0].size
+            results[:, start:stop] = rbf_results.argmax(axis=2).T
+        return True, "", results
+
+    def gradients(self, parameters: np.ndarray, groups: np.ndarray) -> Tuple[float, dict]:
+        """The loss of observations and its gradients by the long term memory
+
+        The selected group is the argmax of \f$z_i = A p_i\f$ where \f$A = \sum a\f$ and
+        \f$p_i = e^{-\|b_i X- c_i \|^2}\f$ (see rbf_matrix) so the loss is the softmax cross entropy of z.
+        The gradients are calculated analytically for all the observations with matrix products
+
+        Args:
+            parameters: (np.ndarray) - The observations (observations X fields)
+            groups: (np.ndarray) - The expected group of each observation (an index of an RBF method)
+
+        Returns:
+            float:  The avarage loss of the observations
+            dict:   The gradient of each entry of the long term memory (with the same shape)
+        """
+        a, b, c = self.ltm["a"], self.ltm["b"], self.ltm["c"]
+        rows_idx = np.arange(parameters.shape[0])
+        total = np.sum(a)
+
+        # The softmax of the results
+        rbf_results = np.exp(-self.square_distances(parameters))
+        logits = total * rbf_results
+        logits -= logits.max(axis=1, keepdims=True)
+        probabilities = np.exp(logits)
+        probabilities /= probabilities.sum(axis=1, keepdims=True)
+        loss = float(-np.mean(np.log(np.maximum(probabilities[rows_idx, groups], np.finfo(float).tiny))))
+
+        # The gradient by the logits and by the square distances
+        logits_gradients = probabilities
+        logits_gradients[rows_idx, groups] -= 1
+        logits_gradients /= parameters.shape[0]
+        distances_gradients = -total * logits_gradients * rbf_results
 
-        r = self.dist_met.euclidean(prms * self.ltm["b"][rbf_idx, :], self.ltm["c"][rbf_idx, :])
-        exp = math.expm1(-r**2)
-        return np.sum(self.ltm["a"] * exp + 1)
+        # The gradients of the coefficients
+        weighted_sums = distances_gradients.T @ parameters
+        weighted_square_sums = distances_gradients.T @ parameters ** 2
+        return loss, {"a": np.full(a.shape, np.sum(logits_gradients * rbf_results)),
+                      "b": 2 * (b * weighted_square_sums - c * weighted_sums),
+                      "c": -2 * (b * weighted_sums - c * distances_gradients.sum(axis=0).reshape(-1, 1))}
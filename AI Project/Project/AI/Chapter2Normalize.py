@@ -2,7 +2,11 @@
 This module generates a normalized algorithm data
 """
 # Python Imports
+import os
 import math
+import json
+import shutil
+import hashlib
 
 # Third party imports
 import numpy as np
@@ -13,6 +17,7 @@ import numpy as np
 from ..Infrastructure.AlgorithmData import AlgorithmData, ufunc, RowNames
 from ..Infrastructure.Enums import FieldRolls, FieldsTypes, NormalizeRange, NormalizeMethod
 from ..UserInterface.Parameter import Parameter
+from ..Utilities.FileUtiles import FileUtiles
 
 
 class NormalizeData(Parameter):
@@ -28,14 +33,33 @@ class NormalizeData(Parameter):
                              ("valuesOrder", []), ("min", 0), ("max", 0), ("indexInDataFile", idx))
 
 
+class TypedColumns(list):
+    """
+    The input matrix of the normalize as typed columns (see Normalize.loadCsv)
+
+    Each item is the data of a field in the normalize data (without the name):
+    -   Qualitative fields - np.ndarray of int (the indexes of the values in the values order)
+    -   Other fields - np.ndarray of float
+    """
 
 
 class Normalize(object):
     """
     This class implements normalization
+
+    The Normalize object is also a normalize model:
+    -#  fit - creates from the normalize data everything needed for the normalizing
+    -#  normalize / transform - normalize the input matrix / other matrixes with the same model
+    -#  save / load - keep the fitted model in a file so new data can be normalized
+        without the training data
+    -#  normalizeCsv - normalize a csv file in chunks of rows (for files that are larger than the memory)
+    -#  loadCsv - load a csv file to typed columns according to the normalize data
     """
 
-    def __init__(self, inputMatrix, normalizeData):
+    # The enums that can be values of the normalize data (used for saving the model)
+    enums = {enum.__name__: enum for enum in (FieldRolls, FieldsTypes, NormalizeRange, NormalizeMethod)}
+
+    def __init__(self, inputMatrix, normalizeData, sparseOneOfN=False):
         """
         Initialize The Normalize class
 
@@ -43,11 +67,128 @@ class Normalize(object):
             inputMatrix     , (list)                - the data as read from the file
                                                       Note that the first row should be the name
                                                       of the prms and is not normalized
+                                                      The input matrix can also be TypedColumns
             normalizeData   , (List(NormalizeData]) - the normalize data for the matrix
+            sparseOneOfN    , (bool)                - If True the one-of-N parameters are kept as one column
+                                                      with the index of the value (see AlgorithmData.sparse_cols)
         """
         self.inputMatrix = inputMatrix
         self.normalizeData = normalizeData
+        self.sparseOneOfN = sparseOneOfN
         self.equilateralEncodingMatrixes = {}
+        self.valuesIndexes = {}
+
+    def fit(self):
+        """
+        Fit the normalize model
+
+        -   Copy the normalize data (so changes in the design do not change the model)
+        -   Create the values indexes of the qualitative fields
+        -   Create the equilateral encoding matrixes
+
+        Returns,
+            Normalize   , self
+        """
+        normalizeDataCopy = []
+        for normalizeData in self.normalizeData:
+            copy = NormalizeData(normalizeData["indexInDataFile"], normalizeData["fieldName"])
+            copy.update(normalizeData)
+            copy["valuesOrder"] = list(normalizeData["valuesOrder"])
+            normalizeDataCopy.append(copy)
+        self.normalizeData = normalizeDataCopy
+
+        for normalizeData in self.normalizeData:
+            if Normalize.isQualitative(normalizeData):
+                self.valuesIndexesOf(normalizeData)
+            if normalizeData["normalizeMethod"] == NormalizeMethod.EquilateralEncoding:
+                self.equilateralMatrix(len(normalizeData["valuesOrder"]))
+        return self
+
+    def transform(self, inputMatrix):
+        """
+        Normalize another matrix with the model
+
+        Args,
+            inputMatrix     , (list)    - the data as read from the file (the first row is the names)
+                                          or TypedColumns
+
+        Returns,
+            AlgorithmData , The normalized matrix
+        """
+        self.inputMatrix = inputMatrix
+        return self.normalize()
+
+    def save(self, fileName):
+        """
+        Save the model to a compressed numpy file
+
+        The file holds the normalize data (as json) and the equilateral encoding matrixes
+
+        Args,
+            fileName    , (str) - The file name
+        """
+        matrixes = {"equilateral_" + str(n): np.array(matrix) for n, matrix in self.equilateralEncodingMatrixes.items()}
+        np.savez_compressed(fileName, normalizeData=np.array(self.normalizeDataJson()),
+                            sparseOneOfN=np.array(self.sparseOneOfN), **matrixes)
+
+    def normalizeDataJson(self):
+        """
+        Serialize the normalize data to json (see saveValue)
+
+        Returns,
+            str , The json string
+        """
+        normalizeData = [[[key, Normalize.saveValue(value)] for key, value in parameter.items()]
+                         for parameter in self.normalizeData]
+        return json.dumps(normalizeData)
+
+    @staticmethod
+    def load(fileName):
+        """
+        Load a model that was saved with the save method
+
+        Args,
+            fileName    , (str) - The file name
+
+        Returns,
+            Normalize   , The fitted model (without input matrix)
+        """
+        with np.load(fileName) as file:
+            normalizeDataList = []
+            for items in json.loads(str(file["normalizeData"])):
+                values = {key: Normalize.loadValue(value) for key, value in items}
+                normalizeData = NormalizeData(values["indexInDataFile"], values["fieldName"])
+                normalizeData.update((key, values[key]) for key, _ in items)
+                normalizeDataList.append(normalizeData)
+
+            normalize = Normalize(None, normalizeDataList, bool(file["sparseOneOfN"]))
+            for key in file.files:
+                if key.startswith("equilateral_"):
+                    normalize.equilateralEncodingMatrixes[int(key[len("equilateral_"):])] = file[key]
+        return normalize.fit()
+
+    @staticmethod
+    def saveValue(value):
+        """
+        Convert a value of the normalize data to a value that can be saved in json
+        (Enums are saved as [enum name, member name])
+        """
+        if isinstance(value, tuple(Normalize.enums.values())):
+            return {"enum": [type(value).__name__, value.name]}
+        if isinstance(value, np.generic):
+            return value.item()
+        if isinstance(value, list):
+            return [Normalize.saveValue(item) for item in value]
+        return value
+
+    @staticmethod
+    def loadValue(value):
+        """
+        Convert a value saved by saveValue to the value of the normalize data
+        """
+        if isinstance(value, dict) and "enum" in value:
+            return Normalize.enums[value["enum"][0]][value["enum"][1]]
+        return value
 
     def normalize(self):
         """
@@ -59,28 +200,259 @@ class Normalize(object):
         Returns,
             AlgorithmData , The normalized matrix
         """
+        algorithm_data = self.normalizeCols()
+        ufunc.parameters_reduction(algorithm_data)
+        self.resultPresentation(algorithm_data)
+        return algorithm_data
+
+    def normalizeCols(self):
+        """
+        Normalize the columns of the input matrix (without the parameters reduction and the result presentation)
+
+        Returns,
+            AlgorithmData , The normalized columns
+        """
         normalizedCol = []
-        resultCol = -1
-        for col_idx in range(len(self.inputMatrix[0])):
-            if self.normalizeData[col_idx]["roll"] == FieldRolls.Result:
-                resultCol = col_idx
-            col = self.inputMatrix[:, col_idx]
+        for col_idx, col in enumerate(self.inputColumns()):
             if self.normalizeData[col_idx]["roll"] in [FieldRolls.Parameter, FieldRolls.Result]:
                 normalizedCol.append(self.normalizePrm(col, self.normalizeData[col_idx]))
             else:
                 normalizedCol.append(self.createCol(col, self.normalizeData[col_idx]))
-        algorithm_data = ufunc.hstack(normalizedCol)
+        return ufunc.hstack(normalizedCol)
 
-        ufunc.parameters_reduction(algorithm_data)
+    def resultPresentation(self, algorithm_data):
+        """
+        Set the ResultPresentation column to the index of the result value of each row
+        (see ufunc.result_presentation)
+
+        Args,
+            algorithm_data  , (AlgorithmData)   - The normalized input matrix
+        """
+        resultCol = -1
+        for col_idx in range(len(self.normalizeData)):
+            if self.normalizeData[col_idx]["roll"] == FieldRolls.Result:
+                resultCol = col_idx
 
         if resultCol != -1:
-            originalResultsCol = [self.inputMatrix[row_idx][resultCol] for row_idx in range(1, len(self.inputMatrix))]
-            ufunc.result_presentation(algorithm_data, originalResultsCol, self.normalizeData[resultCol]["valuesOrder"])
+            normalizeData = self.normalizeData[resultCol]
+            presentation_col = algorithm_data.col_idx(FieldRolls.ResultPresentation)
+            algorithm_data.view(np.ndarray)[:, presentation_col] = \
+                self.valuesCodes(self.inputColumns()[resultCol], normalizeData)
+            algorithm_data.resultValues = normalizeData["valuesOrder"]
+
+    def inputColumns(self):
+        """
+        Get the data columns of the input matrix (without the names)
+
+        Returns,
+            list    , The columns (TypedColumns are returned as they are)
+        """
+        if isinstance(self.inputMatrix, TypedColumns):
+            return self.inputMatrix
+        return [self.inputMatrix[1:, col_idx] for col_idx in range(len(self.inputMatrix[0]))]
+
+    def loadCsv(self, fileName):
+        """
+        Load a csv file to typed columns according to the normalize data
+
+        The file is parsed once (see FileUtiles.load_csv_columns) and each field is
+        parsed straight to its final type:
+        -   Qualitative parameters and results - the indexes of the values in the values order
+            (see valueConverter. A column of the file that is used by more than one field is
+            loaded as strings and converted by valuesCodes)
+        -   Other fields - float
+        -   Fields that are not in the file (indexInDataFile is -1) - 0
+
+        Args,
+            fileName    , (str) - The csv file name
+
+        Returns,
+            TypedColumns    , The input matrix for normalize / transform
+
+        Raises,
+            ValueError      , If a value of a qualitative field is not in the values order
+        """
+        fileData = [normalizeData for normalizeData in self.normalizeData if normalizeData["indexInDataFile"] != -1]
+        fileIndexes = [normalizeData["indexInDataFile"] for normalizeData in fileData]
+
+        # The qualitative fields are parsed straight to the indexes (unless their column is used by another field)
+        converters = {}
+        fileColumns = []
+        for normalizeData in fileData:
+            fileIdx = normalizeData["indexInDataFile"]
+            if self.isTypedQualitative(normalizeData) and fileIndexes.count(fileIdx) == 1:
+                converters[fileIdx] = self.valueConverter(normalizeData)
+                fileColumns.append((fileIdx, int))
+            elif self.isTypedQualitative(normalizeData):
+                fileColumns.append((fileIdx, object))
+            else:
+                fileColumns.append((fileIdx, float))
+
+        try:
+            columns = FileUtiles.load_csv_columns(fileName, fileColumns, converters)
+        except ValueError as e:
+            # A value that is not in the values order (the error of the converter is the cause)
+            if isinstance(e.__cause__, ValueError):
+                raise e.__cause__
+            raise
+        rowsCount = len(columns[0]) if len(columns) > 0 else 0
+
+        typedColumns = TypedColumns()
+        loadedColumns = iter(columns)
+        for normalizeData in self.normalizeData:
+            if normalizeData["indexInDataFile"] == -1:
+                typedColumns.append(np.zeros(rowsCount))
+            elif self.isTypedQualitative(normalizeData):
+                typedColumns.append(self.valuesCodes(next(loadedColumns), normalizeData))
+            else:
+                typedColumns.append(next(loadedColumns))
+        return typedColumns
+
+    @staticmethod
+    def isQualitative(normalizeData):
+        """
+        Check if the normalize method of a field uses the values order
+        """
+        return normalizeData["normalizeMethod"] in (NormalizeMethod.OneOfN, NormalizeMethod.QualitativeToRange,
+                                                    NormalizeMethod.EquilateralEncoding)
+
+    @staticmethod
+    def isTypedQualitative(normalizeData):
+        """
+        Check if a field is loaded as the indexes of its values (see loadCsv)
+        """
+        return normalizeData["roll"] in [FieldRolls.Parameter, FieldRolls.Result] and \
+            Normalize.isQualitative(normalizeData)
+
+    def designMatrix(self, fileMatrix):
+        """
+        Create the input matrix from a matrix read from the data file
+
+        Each normalize data is a column in the input matrix which is the column
+        indexInDataFile of the file matrix. If the indexInDataFile is -1 the column is
+        filled with "0" (see AlgorithmDataDesign.loadNormalizeData)
+
+        Args,
+            fileMatrix  , (np.ndarray)  - The matrix as read from the file (the first row is the names)
+
+        Returns,
+            np.ndarray  , The input matrix
+        """
+        dataMatrix = []
+        for normalizeData in self.normalizeData:
+            if normalizeData["indexInDataFile"] == -1:
+                newCol = np.full(fileMatrix.shape[0], "0", dtype='U100')
+                newCol[0] = normalizeData["fieldName"]
+                dataMatrix.append(newCol)
+            else:
+                dataMatrix.append(fileMatrix[:, normalizeData["indexInDataFile"]])
+        return np.stack(dataMatrix, axis=-1)
+
+    def fitCsv(self, fileName, chunkSize=10000):
+        """
+        First pass on a csv file : collect the statistics of the file in chunks of rows
+
+        -   Count the rows
+        -   Quantitative fields that their min is equal to their max : calculate the min and max
+        -   Qualitative fields with empty values order : collect the values (in the order they appear)
+
+        Args,
+            fileName    , (str) - The csv file name
+            chunkSize   , (int) - The number of rows in a chunk
+
+        Returns,
+            Normalize   , self (fitted)
+        """
+        self.fit()
+        self.rowsCount = 0
+        mins = {}
+        maxs = {}
+        values = {}
+        for fileMatrix in FileUtiles.load_csv_chunks(fileName, chunkSize):
+            inputMatrix = self.designMatrix(fileMatrix)
+            self.rowsCount += inputMatrix.shape[0] - 1
+            for col_idx, normalizeData in enumerate(self.normalizeData):
+                if normalizeData["roll"] not in [FieldRolls.Parameter, FieldRolls.Result]:
+                    continue
+                col = inputMatrix[1:, col_idx]
+                if Normalize.isQualitative(normalizeData):
+                    if len(normalizeData["valuesOrder"]) == 0:
+                        chunkValues, firstIndexes = np.unique(col, return_index=True)
+                        for value in chunkValues[np.argsort(firstIndexes)].tolist():
+                            values.setdefault(col_idx, {}).setdefault(value, None)
+                elif normalizeData["normalizeMethod"] == NormalizeMethod.NormalizeToRange:
+                    if normalizeData["min"] == normalizeData["max"]:
+                        col = col.astype(float)
+                        mins[col_idx] = min(mins.get(col_idx, np.inf), float(np.min(col)))
+                        maxs[col_idx] = max(maxs.get(col_idx, -np.inf), float(np.max(col)))
+
+        # Set the statistics to the normalize data
+        for col_idx in mins.keys():
+            self.normalizeData[col_idx]["min"] = mins[col_idx]
+            self.normalizeData[col_idx]["max"] = maxs[col_idx]
+        for col_idx in values.keys():
+            normalizeData = self.normalizeData[col_idx]
+            normalizeData["valuesOrder"] = list(values[col_idx].keys())
+            if normalizeData["min"] == normalizeData["max"]:
+                normalizeData["min"] = 0
+                normalizeData["max"] = len(normalizeData["valuesOrder"]) - 1
+        return self.fit()
+
+    def normalizeCsv(self, fileName, chunkSize=10000, memmapFileName=None):
+        """
+        Normalize a csv file in chunks of rows
+
+        -#  First pass - collect the statistics of the file (fitCsv)
+        -#  Second pass - normalize each chunk and copy it to a preallocated AlgorithmData
+        -#  The parameters reduction is done in chunks (see ufunc.parameters_reduction)
+
+        Only one chunk of the file is in the memory at a time. If memmapFileName is given
+        the data of the AlgorithmData is a numpy memory map (.npy file) so the result
+        does not have to be in the memory too
+
+        Args,
+            fileName        , (str) - The csv file name
+            chunkSize       , (int) - The number of rows in a chunk
+            memmapFileName  , (str) - The file for the data of the AlgorithmData (None - in memory)
+
+        Returns,
+            AlgorithmData , The normalized matrix
+
+        Raises,
+            ValueError      , If there are no rows in the file
+        """
+        self.fitCsv(fileName, chunkSize)
+        if self.rowsCount == 0:
+            raise ValueError("There are no rows in " + fileName)
+
+        algorithm_data = None
+        row_idx = 0
+        for fileMatrix in FileUtiles.load_csv_chunks(fileName, chunkSize):
+            self.inputMatrix = self.designMatrix(fileMatrix)
+            chunk = self.normalizeCols()
+            self.resultPresentation(chunk)
+
+            # Allocate the result according to the first chunk
+            if algorithm_data is None:
+                shape = (self.rowsCount, chunk.shape[1])
+                if memmapFileName is None:
+                    data = np.zeros(shape)
+                else:
+                    data = np.lib.format.open_memmap(memmapFileName, mode="w+", dtype=float, shape=shape)
+                algorithm_data = AlgorithmData.from_header(data, chunk.header, chunk.names_table, chunk.categories)
+
+            algorithm_data.view(np.ndarray)[row_idx:row_idx + chunk.shape[0]] = chunk.view(np.ndarray)
+            if hasattr(chunk, 'resultValues'):
+                algorithm_data.resultValues = chunk.resultValues
+            row_idx += chunk.shape[0]
+
+        self.inputMatrix = None
+        ufunc.parameters_reduction(algorithm_data, chunkSize)
         return algorithm_data
 
     def createCol(self, col, normalizeData):
         name = np.char.array([normalizeData["fieldName"]])
-        data = np.array(col[1:]).astype(float)
+        data = np.asarray(col).astype(float)
         return AlgorithmData(data, name, *self.createHeader(normalizeData, 1))
 
     def normalizePrm(self, col, normalizeData):
@@ -148,19 +520,27 @@ class Normalize(object):
         Examples,
             If the values order is ['a','b','c'] and the value is 'b'
             The row for the parameter will be [0,1,0]
+
+        Note,
+            If sparseOneOfN is set the result of a parameter is one column with the index of the value
+            (1 in the example) and the categories of the column is the number of the values
         """
         numCols = len(normalizeData["valuesOrder"])
+        if self.sparseOneOfN and normalizeData["roll"] == FieldRolls.Parameter:
+            name = np.char.array([normalizeData["fieldName"]])
+            return AlgorithmData(self.valuesCodes(col, normalizeData), name, *self.createHeader(normalizeData, 1),
+                                 categories=np.array([numCols]))
+
         names = np.char.array(["Is " + valueName for valueName in normalizeData["valuesOrder"]])
         if normalizeData["normalizeRange"] == NormalizeRange.ZeroToOne:
-            initData = [0 for idx in range(numCols)]
+            oneOfNMatrix = np.zeros((numCols, numCols), dtype=int)
         else:
-            initData = [-1 for idx in range(numCols)]
-        data = []
-        for prm in col[1:]:
-            row = list(initData)
-            row[normalizeData["valuesOrder"].index(prm)] = 1
-            data.append(row)
-        return AlgorithmData(np.array(data), names, *self.createHeader(normalizeData, numCols))
+            oneOfNMatrix = np.full((numCols, numCols), -1, dtype=int)
+        np.fill_diagonal(oneOfNMatrix, 1)
+
+        # The row of each parameter is the row of the index of the value in the matrix
+        data = oneOfNMatrix[self.valuesCodes(col, normalizeData)]
+        return AlgorithmData(data, names, *self.createHeader(normalizeData, numCols))
 
     def normalize_equilateralEncoding(self, col, normalizeData):
         """
@@ -172,9 +552,9 @@ class Normalize(object):
         a matrix size (num of possible values X num of possible values - 1)
         This is done using the createEquilateralMatrix method
 
-        Then for each parameter in the column the following is done
-        -# Get the index of the value in the values order list
-        -# Add the line in the matrix with the row index equal to the index of the value
+        Then the following is done
+        -# Get the indexes of the values in the values order list (valuesCodes)
+        -# Take the lines in the matrix with the row index equal to the index of the value
 
         In order to avoid recalculating the matrixes, the matrixes are kept in a dictionary
         in which the key is the number of possible values and the value is the matrix.
@@ -190,17 +570,8 @@ class Normalize(object):
         """
         numCols = len(normalizeData["valuesOrder"]) - 1
         names = np.char.array([normalizeData["fieldName"] + "#" + str(idx) for idx in range(numCols)])
-        if numCols not in self.equilateralEncodingMatrixes.keys():
-            #     equilateralEncodingMatrix = self.equilateralEncodingMatrixes[numCols]
-            # else,
-            self.equilateralEncodingMatrixes[numCols + 1] = self.createEquilateralMatrix(numCols + 1)
-
-        data = []
-        for prm in col[1:]:            
-            row = self.equilateralEncodingMatrixes[numCols + 1][ufunc.index(normalizeData["valuesOrder"], prm)]                
-            data.append(row)
-           
-        return AlgorithmData(np.array(data), names, *self.createHeader(normalizeData, numCols))
+        data = self.equilateralMatrix(numCols + 1)[self.valuesCodes(col, normalizeData)]
+        return AlgorithmData(data, names, *self.createHeader(normalizeData, numCols))
 
     def  normalize_qualitativeToRange(self, col, normalizeData):
         """
@@ -219,7 +590,7 @@ class Normalize(object):
             AlgorithmData   , The normalized column
         """
         name = np.char.array([normalizeData["fieldName"]])
-        data = np.array([float(normalizeData["valuesOrder"].index(col[idx])) for idx in range(1, len(col))])
+        data = self.valuesCodes(col, normalizeData).astype(float)
         algorithm_data = AlgorithmData(data, name, *self.createHeader(normalizeData, 1))
         return self.transferToRange(algorithm_data)
 
@@ -240,7 +611,7 @@ class Normalize(object):
             AlgorithmData   , The normalized column
         """
         name = np.char.array([normalizeData["fieldName"]])
-        data = np.array([float(col[idx]) for idx in range(1, len(col))])
+        data = np.asarray(col).astype(float)
         algorithm_data = AlgorithmData(data, name, *self.createHeader(normalizeData, 1))
         return self.transferToRange(algorithm_data)
 
@@ -258,10 +629,99 @@ class Normalize(object):
         Returns,
             AlgorithmData   , The normalized column
         """
-        name = np.char.array([normalizeData[normalizeData["fieldName"]]])
-        data = np.array([1 / float(col[idx]) for idx in range(1, len(col))])
+        name = np.char.array([normalizeData["fieldName"]])
+        data = 1 / np.asarray(col).astype(float)
         return AlgorithmData(data, name, *self.createHeader(normalizeData, 1))
 
+    def valuesCodes(self, col, normalizeData):
+        """
+        Get the index in the values order of each value in the column
+
+        The distinct values of the column are found (np.unique) and only them are
+        searched in the values order, so the time is linear in the number of rows
+
+        A column of int (TypedColumns) already holds the indexes and is returned as it is
+
+        Args,
+            col             , (list)            - The parameter column (data)
+            normalizeData   , (NormalizeData)   - holds the values order
+
+        Returns,
+            np.ndarray      , The indexes (int) of the values
+
+        Raises,
+            ValueError      , If a value is not in the values order
+        """
+        col = np.asarray(col)
+        if np.issubdtype(col.dtype, np.integer):
+            return col
+        values, inverse = np.unique(col, return_inverse=True)
+        valuesIndexes = self.valuesIndexesOf(normalizeData)
+
+        try:
+            codes = np.array([valuesIndexes[value] for value in values.tolist()], dtype=int)
+        except KeyError as e:
+            raise ValueError(str(e) + " is not in the values order of " + str(normalizeData["fieldName"]))
+        return codes[inverse.reshape(-1)]
+
+    def valueConverter(self, normalizeData):
+        """
+        Create a function that converts a value of a qualitative field to its index in the values order
+        (used to parse a csv file straight to the indexes see loadCsv)
+
+        Args,
+            normalizeData   , (NormalizeData)   - holds the values order
+
+        Returns,
+            function        , value (str) -> index (int). Raises ValueError if the value is not in the values order
+        """
+        valuesIndexes = self.valuesIndexesOf(normalizeData)
+
+        def converter(value):
+            try:
+                return valuesIndexes[value]
+            except KeyError as e:
+                raise ValueError(str(e) + " is not in the values order of " + str(normalizeData["fieldName"]))
+        return converter
+
+    def valuesIndexesOf(self, normalizeData):
+        """
+        Get a dictionary from the values of a qualitative field to their indexes in the values order
+
+        The dictionaries are kept in the model (valuesIndexes) by the values order
+
+        Args,
+            normalizeData   , (NormalizeData)   - holds the values order
+
+        Returns,
+            dict            , value -> index
+        """
+        key = tuple(normalizeData["valuesOrder"])
+        if key not in self.valuesIndexes:
+
+            # If a value appears more than once in the values order the first index is used
+            valuesIndexes = {}
+            for idx, value in enumerate(normalizeData["valuesOrder"]):
+                valuesIndexes.setdefault(value, idx)
+            self.valuesIndexes[key] = valuesIndexes
+        return self.valuesIndexes[key]
+
+    def equilateralMatrix(self, n):
+        """
+        Get the equilateral matrix for n values
+
+        The matrixes are kept in the model (equilateralEncodingMatrixes) by n
+
+        Args,
+            n , (int)  - The number of values that the matrix is for
+
+        Returns,
+            np.ndarray   , The equilateral matrix
+        """
+        if n not in self.equilateralEncodingMatrixes:
+            self.equilateralEncodingMatrixes[n] = np.array(self.createEquilateralMatrix(n))
+        return self.equilateralEncodingMatrixes[n]
+
     def transferToRange(self, algorithm_data):
         """
         Transfer value from real world range to normalized range
@@ -274,20 +734,23 @@ class Normalize(object):
 
         Returns,
             AlgorithmData   , The normalized column
+
+        Note,
+            The transfer is done for all the columns in one numpy expression
+            Columns with min equal to max are set to the target min
         """
-        for col_idx in range(algorithm_data.shape[1]):
-            colMin = algorithm_data[RowNames.Min, col_idx]
-            colMax = algorithm_data[RowNames.Max, col_idx]
-            targetMin = algorithm_data[RowNames.MinTarget, col_idx]
-            targetMax = algorithm_data[RowNames.MaxTarget, col_idx]
-            if colMin == colMax:
-                for row_idx in range(len(algorithm_data)):
-                    algorithm_data[row_idx, col_idx] = targetMin
-            else:
-                for row_idx in range(len(algorithm_data)):
-                    algorithm_data[row_idx, col_idx] = (
-                        (targetMax - targetMin) *
-                        (algorithm_data[row_idx, col_idx] - colMin)) / (colMax - colMin) + targetMin
+        data = algorithm_data.view(np.ndarray)
+        colMin = algorithm_data.header[RowNames.Min.value].astype(float)
+        colMax = algorithm_data.header[RowNames.Max.value].astype(float)
+        targetMin = algorithm_data.header[RowNames.MinTarget.value].astype(float)
+        targetMax = algorithm_data.header[RowNames.MaxTarget.value].astype(float)
+
+        # Mask the columns with constant range so they are not divided by 0
+        constant = colMin == colMax
+        colRange = np.where(constant, 1.0, colMax - colMin)
+
+        data[...] = (targetMax - targetMin) * (data - colMin) / colRange + targetMin
+        data[:, constant] = targetMin[constant]
         return algorithm_data
 
     def createEquilateralMatrix(self, n):
@@ -300,20 +763,146 @@ class Normalize(object):
             List[List{float]]   , The equilateral matrix
         """
 
-        result = [[0 for i in range(n - 1)] for j in range(n)]
+        result = np.zeros((n, n - 1))
         result[0][0] = -1
         result[1][0] = 1.0
         for k in range(2, n):
             r = k
             f = math.sqrt(r * r - 1.0) / r
-            for i in range(k):
-                for j in range(k - 1):
-                    result[i][j] *= f
+            result[:k, :k - 1] *= f
 
             r = -1.0 / r
-            for i in range(k):
-                result[i][k - 1] = r
+            result[:k, k - 1] = r
 
             result[k][k - 1] = 1.0
 
-        return result
+        return result.tolist()
+
+
+class NormalizeCache(object):
+    """
+    A cache of normalized csv files on the disk
+
+    -   The key of an entry is a hash of the bytes of the csv file and the normalize model
+        (the normalize data and sparseOneOfN) so any change in the file or the design is a new entry
+    -   Each entry is a directory with a saved AlgorithmData (see AlgorithmData.save)
+        which is loaded as a memory map
+    -   The total size of the entries is limited. When it is exceeded the least recently used
+        entries are removed (the modification time of an entry is updated when it is used)
+    """
+
+    def __init__(self, directory, maxSize=2 ** 30):
+        """
+        Initialize The NormalizeCache class
+
+        Args,
+            directory   , (str) - The directory of the cache (created if it does not exist)
+            maxSize     , (int) - The maximum size in bytes of the entries
+        """
+        self.directory = directory
+        self.maxSize = maxSize
+        os.makedirs(directory, exist_ok=True)
+
+    def normalize(self, normalizer, fileName, inputMatrix=None):
+        """
+        Normalize a csv file with a fitted normalize model or take the result from the cache
+
+        Args,
+            normalizer  , (Normalize)   - The fitted normalize model
+            fileName    , (str)         - The csv file name
+            inputMatrix , (list)        - The file already loaded as an input matrix of the normalize model
+                                          (None - the file is loaded with Normalize.loadCsv)
+
+        Returns,
+            AlgorithmData , The normalized matrix
+        """
+        key = self.key(normalizer, fileName)
+        algorithm_data = self.get(key)
+        if algorithm_data is None:
+            if inputMatrix is None:
+                inputMatrix = normalizer.loadCsv(fileName)
+            algorithm_data = normalizer.transform(inputMatrix)
+            self.put(key, algorithm_data)
+        return algorithm_data
+
+    def key(self, normalizer, fileName):
+        """
+        Create the key of a csv file and a normalize model
+
+        Args,
+            normalizer  , (Normalize)   - The normalize model
+            fileName    , (str)         - The csv file name
+
+        Returns,
+            str , The key (sha256 hex digest)
+        """
+        digest = hashlib.sha256()
+        with open(fileName, "rb") as f:
+            for block in iter(lambda: f.read(2 ** 20), b""):
+                digest.update(block)
+        digest.update(normalizer.normalizeDataJson().encode())
+        digest.update(str((normalizer.sparseOneOfN, AlgorithmData.file_format_version)).encode())
+        return digest.hexdigest()
+
+    def get(self, key):
+        """
+        Get an entry from the cache
+
+        Args,
+            key , (str) - The key of the entry
+
+        Returns,
+            AlgorithmData , The cached AlgorithmData (None if the entry is not in the cache)
+        """
+        entryDirectory = os.path.join(self.directory, key)
+        if not os.path.isfile(os.path.join(entryDirectory, "manifest.json")):
+            return None
+        try:
+            algorithm_data = AlgorithmData.load(entryDirectory)
+        except Exception:
+            # A damaged entry is removed and treated as not cached
+            shutil.rmtree(entryDirectory, ignore_errors=True)
+            return None
+        os.utime(entryDirectory)
+        return algorithm_data
+
+    def put(self, key, algorithm_data):
+        """
+        Add an entry to the cache and remove the least recently used entries
+        if the size of the cache is larger than maxSize
+
+        The entry is saved to a temporary directory which is renamed to the key
+        so an entry is never read before it is complete
+
+        Args,
+            key             , (str)             - The key of the entry
+            algorithm_data  , (AlgorithmData)   - The normalized matrix
+        """
+        entryDirectory = os.path.join(self.directory, key)
+        tempDirectory = entryDirectory + ".tmp" + str(os.getpid())
+        shutil.rmtree(tempDirectory, ignore_errors=True)
+        algorithm_data.save(tempDirectory)
+        try:
+            os.replace(tempDirectory, entryDirectory)
+        except OSError:
+            # The entry was added by another process
+            shutil.rmtree(tempDirectory, ignore_errors=True)
+        self.evict()
+
+    def evict(self):
+        """
+        Remove the least recently used entries until the size of the cache is not larger than maxSize
+        """
+        entries = []
+        for name in os.listdir(self.directory):
+            entryDirectory = os.path.join(self.directory, name)
+            if os.path.isdir(entryDirectory) and ".tmp" not in name:
+                size = sum(entry.stat().st_size for entry in os.scandir(entryDirectory) if entry.is_file())
+                entries.append((os.path.getmtime(entryDirectory), size, entryDirectory))
+
+        totalSize = sum(size for _, size, _ in entries)
+        for _, size, entryDirectory in sorted(entries):
+            if totalSize <= self.maxSize:
+                break
+            shutil.rmtree(entryDirectory, ignore_errors=True)
+            totalSize -= size
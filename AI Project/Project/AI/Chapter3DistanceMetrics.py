@@ -4,11 +4,12 @@
     2 vectors
 """
 # Python Imports
-import math
 from typing import List, Union
 
 # Third party imports
 import numpy as np
+from scipy import sparse
+from scipy.spatial import cKDTree
 
 # PyQt imports
 
@@ -21,16 +22,181 @@ from ..Infrastructure.Enums import FieldsTypes, NormalizeRange, NormalizeMethod
 class DistanceMetrics(object):
     """ Distance Metrics 
 
-        This class implements 3 types of distance metrics between 2 vectors:
-        -#  Euclidean distance metrics
-        -#  Manhattan distance metrics
-        -#  Chebyshave distance metrics
+        This class implements distance metrics between vectors. The metrics are kept
+        in a registry (metrics) by name:
+        -#  euclidean - Euclidean distance metrics
+        -#  sqeuclidean - The square of the Euclidean distance
+        -#  manhattan - Manhattan distance metrics
+        -#  chebyshave - Chebyshave distance metrics
+        -#  minkowski - Minkowski distance metrics of order (parameter) order
+        -#  cosine - 1 - the cosine of the angle between the vectors
+        -#  hamming - The number of different values
+        -#  mahalanobis - Mahalanobis distance metrics with the covariance of the observations
+            in the parameter data (or the parameter inverse_covariance)
 
-        The distance metrics is done between 2 AlgorithmData. at the beginning of the distance
-        metrics methods there is a conversion to AlgorithmData
+        The arguments of the distance methods can be vectors or matrixes of rows:
+        -#  2 vectors - the result is the distance (float)
+        -#  A vector and a matrix - the result is the distance of the vector from each row
+        -#  2 matrixes with the same number of rows - the result is the distance between matching rows
+
+        The pairwise method calculates the matrix of distances between each row of one
+        matrix and each row of another matrix
+
+        The vectors and matrixes can also be scipy.sparse matrixes (see AlgorithmData.sparse_cols)
+
+        A metric is registered (see register) with:
+        -#  A method that gets 2 blocks of rows (that can be broadcasted) and the parameters
+            and returns the distances along the last axis
+        -#  Optionally a method that calculates the pairwise matrix in a faster way
+        -#  Optionally a method that resolves the parameters once before the blocks are
+            calculated (like the inverse covariance of the mahalanobis metrics)
 
     """
 
+    # The registry of the metrics : name -> (distance method, pairwise method, prepare method)
+    metrics = {}
+
+    # The maximum number of values in a block of rows that is created at once
+    block_size = 2 ** 22
+
+    # The number of bits in each byte (for the hamming distance on packed bits)
+    bits_count = np.array([bin(byte).count("1") for byte in range(256)], dtype=np.int64)
+
+    @staticmethod
+    def register(name: str, distance, pairwise=None, prepare=None):
+        """ Register a distance metrics
+
+            Args:
+                name        : (str) - The name of the metrics
+                distance    : (method) - distance(p_block, q_block, **parameters) returns the distances
+                              between the rows along the last axis
+                pairwise    : (method) - pairwise(p, q, **parameters) returns the distances matrix
+                              (None - the distance method is used on blocks of rows)
+                prepare     : (method) - prepare(**parameters) returns the parameters that are passed
+                              to the distance and pairwise methods (None - the parameters are passed as they are)
+        """
+        DistanceMetrics.metrics[name] = (distance, pairwise, prepare)
+
+    @staticmethod
+    def metric(name: str):
+        """ Get a registered metrics
+
+            Raises:
+                ValueError : If the metric is unknown
+        """
+        if name not in DistanceMetrics.metrics:
+            raise ValueError("Unknown distance metrics " + str(name))
+        return DistanceMetrics.metrics[name]
+
+    @staticmethod
+    def prepare_parameters(name: str, parameters: dict) -> dict:
+        """ Resolve the parameters of a metrics once (before the blocks of rows are calculated)
+
+            Raises:
+                ValueError : If the metric is unknown
+        """
+        _, _, prepare = DistanceMetrics.metric(name)
+        if prepare is None:
+            return parameters
+        return prepare(**parameters)
+
+    @staticmethod
+    def as_rows(p):
+        """ Convert a vector or a matrix to a matrix of rows (a vector is a matrix with one row)
+
+            Returns:
+                np.ndarray or sparse.csr_matrix : 2 dimensions matrix of floats
+        """
+        if sparse.issparse(p):
+            return sparse.csr_matrix(p, dtype=float)
+        p = np.asarray(p, dtype=float)
+        if p.ndim < 2:
+            return p.reshape(1, -1)
+        return p
+
+    @staticmethod
+    def dense_rows(p, start: int, stop: int):
+        """ Get the rows start:stop of a matrix as a dense matrix (a matrix with one row is returned as it is)
+        """
+        if p.shape[0] > 1:
+            p = p[start:stop]
+        if sparse.issparse(p):
+            return p.toarray()
+        return p
+
+    def distance(self, p, q, metric: str="euclidean", **parameters):
+        """ Calculate a distance between the rows of p and the rows of q
+
+            The rows are processed in blocks (so a sparse matrix is made dense one block at a time)
+
+            Args:
+                p, q        : The vectors or matrixes (see the class documentation)
+                metric      : (str) - The name of the metrics
+                parameters  : The parameters of the metrics (like order for minkowski)
+
+            Returns:
+                float or np.ndarray : The distance (if p and q are vectors) or the distances
+
+            Raises:
+                ValueError : If p and q are matrixes with different number of rows or the metric is unknown
+        """
+        distance, _, _ = DistanceMetrics.metric(metric)
+        parameters = DistanceMetrics.prepare_parameters(metric, parameters)
+        p = DistanceMetrics.as_rows(p)
+        q = DistanceMetrics.as_rows(q)
+        num_rows = max(p.shape[0], q.shape[0])
+        if p.shape[0] not in (1, num_rows) or q.shape[0] not in (1, num_rows):
+            raise ValueError("The number of rows " + str(p.shape[0]) + " and " + str(q.shape[0]) + " do not match")
+
+        rows_in_block = max(1, DistanceMetrics.block_size // max(1, p.shape[1]))
+        distances = np.empty(num_rows)
+        for start in range(0, num_rows, rows_in_block):
+            stop = min(start + rows_in_block, num_rows)
+            distances[start:stop] = distance(DistanceMetrics.dense_rows(p, start, stop),
+                                             DistanceMetrics.dense_rows(q, start, stop), **parameters)
+
+        if num_rows == 1:
+            return float(distances[0])
+        return distances
+
+    def pairwise(self, p, q, metric: str="euclidean", **parameters) -> np.ndarray:
+        """ The distances between each row of p and each row of q
+
+            If the metric has no pairwise method blocks_pairwise is used
+
+            Args:
+                p, q        : (matrix) - The matrixes (or vectors)
+                metric      : (str) - The name of the metrics
+                parameters  : The parameters of the metrics
+
+            Returns:
+                np.ndarray : Matrix with p rows X q rows
+
+            Raises:
+                ValueError : If the metric is unknown
+        """
+        distance, pairwise, _ = DistanceMetrics.metric(metric)
+        parameters = DistanceMetrics.prepare_parameters(metric, parameters)
+        p = DistanceMetrics.as_rows(p)
+        q = DistanceMetrics.as_rows(q)
+        if pairwise is not None:
+            return pairwise(p, q, **parameters)
+        return DistanceMetrics.blocks_pairwise(distance, p, q, **parameters)
+
+    @staticmethod
+    def blocks_pairwise(distance, p, q, **parameters) -> np.ndarray:
+        """ The distances between each row of p and each row of q calculated by a distance method
+            on blocks of rows of p against all the rows of q (with broadcasting)
+        """
+        q = DistanceMetrics.dense_rows(q, 0, None)
+        rows_in_block = max(1, DistanceMetrics.block_size // max(1, q.shape[0] * q.shape[1]))
+        distances = np.empty((p.shape[0], q.shape[0]))
+        for start in range(0, p.shape[0], rows_in_block):
+            stop = min(start + rows_in_block, p.shape[0])
+            p_block = DistanceMetrics.dense_rows(p, start, stop)
+            distances[start:stop] = distance(p_block[:, np.newaxis, :], q[np.newaxis, :, :], **parameters)
+        return distances
+
     def euclidean(self, p, q):
         """ Euclidean distance metrics
 
@@ -38,14 +204,7 @@ class DistanceMetrics(object):
             \f$\sqrt{\sum_{i=0}^n (p_i-q_i)^2}\f$.
 
         """
-        p = AlgorithmData(p)
-        q = AlgorithmData(q)
-
-        sum = 0
-        for i in range(p.shape[0]):
-            sum += math.pow((p[i, 0] - q[i, 0]), 2)
-        sum = math.sqrt(sum)
-        return sum
+        return self.distance(p, q, "euclidean")
 
     def manhattan(self, p: Union[AlgorithmData, List[float]], q: Union[AlgorithmData, List[float]]):
         """ Manhatten distance metrics
@@ -53,12 +212,7 @@ class DistanceMetrics(object):
             The calculation formula is:
             \f$\sum_{i=0}^n |(p_i-q_i|\f$.
         """
-        p = AlgorithmData(p)
-        q = AlgorithmData(q)
-        sum = 0
-        for i in range(p.shape[0]):
-            sum += abs(p[i, 0] - q[i, 0])
-        return sum
+        return self.distance(p, q, "manhattan")
 
     def chebyshave(self, p: Union[AlgorithmData, List[float]], q: Union[AlgorithmData, List[float]]):
         """ Chevichase distance metrics
@@ -66,15 +220,257 @@ class DistanceMetrics(object):
             The calculation formula is:
              \f$ max|p_i-q_i|\f$.
         """
+        return self.distance(p, q, "chebyshave")
+
+    @staticmethod
+    def square_norms(p) -> np.ndarray:
+        """ The square of the norm of each row of a matrix
+        """
+        if sparse.issparse(p):
+            return np.asarray(p.power(2).sum(axis=1)).flatten()
+        return np.sum(p ** 2, axis=1)
+
+    @staticmethod
+    def products(p, q) -> np.ndarray:
+        """ The dot products between each row of p and each row of q (p and q can be sparse)
+        """
+        products = p @ q.T
+        if sparse.issparse(products):
+            return products.toarray()
+        return np.asarray(products)
+
+    @staticmethod
+    def row_products(p, q) -> np.ndarray:
+        """ The dot product of each row of p with the same row of q (p can be sparse)
+        """
+        if sparse.issparse(p):
+            return np.asarray(p.multiply(q).sum(axis=1)).flatten()
+        return np.einsum("ij,ij->i", p, q)
+
+    @staticmethod
+    def square_euclidean_matrix(p, q) -> np.ndarray:
+        """ The square euclidean distances between each row of p and each row of q
+
+            The calculation formula is:
+            \f$\|p\|^2 + \|q\|^2 - 2pq\f$.
+
+            (negative results of rounding errors are set to 0)
+
+            Returns:
+                np.ndarray : Matrix with p rows X q rows
+        """
+        p = DistanceMetrics.as_rows(p)
+        q = DistanceMetrics.as_rows(q)
+        distances = DistanceMetrics.square_norms(p).reshape(-1, 1) + DistanceMetrics.square_norms(q).reshape(1, -1) - \
+            2 * DistanceMetrics.products(p, q)
+        return np.maximum(distances, 0)
+
+    @staticmethod
+    def nearest(p, q) -> np.ndarray:
+        """ The index of the nearest (euclidean) row of q for each row of p
+
+            The square norms of the rows of p do not change the order of the distances of a row
+            so the argmin is of \f$\|q\|^2 - 2pq\f$. The rows of p are processed in blocks
+
+            Returns:
+                np.ndarray : The indexes (int) of the rows of q
+        """
+        p = DistanceMetrics.as_rows(p)
+        q = DistanceMetrics.as_rows(q)
+        q_norms = DistanceMetrics.square_norms(q)
+        rows_in_block = max(1, DistanceMetrics.block_size // max(1, q.shape[0]))
+        indexes = np.empty(p.shape[0], dtype=int)
+        for start in range(0, p.shape[0], rows_in_block):
+            stop = min(start + rows_in_block, p.shape[0])
+            distances = DistanceMetrics.products(p[start:stop], q)
+            distances *= -2
+            distances += q_norms
+            indexes[start:stop] = np.argmin(distances, axis=1)
+        return indexes
 
-        p = AlgorithmData(p)
-        q = AlgorithmData(q)
-        sum = 0
-        for i in range(p.shape[0]):
-            sum = max(sum, abs(p[i, 0] - q[i, 0]))
-        return sum
+    @staticmethod
+    def cosine_matrix(p, q) -> np.ndarray:
+        """ The cosine distances between each row of p and each row of q
 
-    def select(self, prmOptions: List[List[str]], options: List[List[int]], itemToFind: List):
+            The rows are divided by their norms and the distance is 1 - the dot product
+            (a zero vector has distance 1 from any vector)
+        """
+        p_norms = np.sqrt(DistanceMetrics.square_norms(p))
+        q_norms = np.sqrt(DistanceMetrics.square_norms(q))
+        p_norms[p_norms == 0] = np.inf
+        q_norms[q_norms == 0] = np.inf
+        return 1 - DistanceMetrics.products(p, q) / p_norms.reshape(-1, 1) / q_norms.reshape(1, -1)
+
+    @staticmethod
+    def cosine(p: np.ndarray, q: np.ndarray) -> np.ndarray:
+        """ The cosine distances between broadcasted blocks of rows (see cosine_matrix)
+        """
+        norms = np.sqrt(np.sum(p ** 2, axis=-1)) * np.sqrt(np.sum(q ** 2, axis=-1))
+        norms[norms == 0] = np.inf
+        return 1 - np.sum(p * q, axis=-1) / norms
+
+    @staticmethod
+    def is_binary(p) -> bool:
+        """ Check if all the values of a matrix are 0 or 1
+        """
+        values = p.data if sparse.issparse(p) else p
+        return bool(np.all((values == 0) | (values == 1)))
+
+    @staticmethod
+    def hamming(p: np.ndarray, q: np.ndarray) -> np.ndarray:
+        """ The hamming distances (the number of different values) between broadcasted blocks of rows
+        """
+        return np.sum(p != q, axis=-1).astype(float)
+
+    @staticmethod
+    def hamming_matrix(p, q) -> np.ndarray:
+        """ The hamming distances between each row of p and each row of q
+
+            If all the values are 0 or 1 (like the boolean character grids) the rows are
+            packed to bits (8 values in a byte) and the distance is the count of the bits of p XOR q
+        """
+        if not (DistanceMetrics.is_binary(p) and DistanceMetrics.is_binary(q)):
+            return DistanceMetrics.blocks_pairwise(DistanceMetrics.hamming, p, q)
+        p_bits = np.packbits(DistanceMetrics.dense_rows(p, 0, None).astype(bool), axis=1)
+        q_bits = np.packbits(DistanceMetrics.dense_rows(q, 0, None).astype(bool), axis=1)
+        rows_in_block = max(1, DistanceMetrics.block_size // max(1, q_bits.shape[0] * q_bits.shape[1]))
+        distances = np.empty((p_bits.shape[0], q_bits.shape[0]))
+        for start in range(0, p_bits.shape[0], rows_in_block):
+            stop = min(start + rows_in_block, p_bits.shape[0])
+            xor = np.bitwise_xor(p_bits[start:stop, np.newaxis, :], q_bits[np.newaxis, :, :])
+            distances[start:stop] = np.sum(DistanceMetrics.bits_count[xor], axis=2)
+        return distances
+
+    @staticmethod
+    def inverse_covariance(data) -> np.ndarray:
+        """ The inverse of the covariance matrix of the observations (rows) in data
+
+            The inverse is calculated with the pseudo inverse (the covariance of normalized
+            data is often singular)
+
+            Args:
+                data : (matrix) - The observations
+
+            Returns:
+                np.ndarray : The inverse covariance matrix
+        """
+        data = DistanceMetrics.dense_rows(DistanceMetrics.as_rows(data), 0, None)
+        return np.linalg.pinv(np.atleast_2d(np.cov(data, rowvar=False)))
+
+    @staticmethod
+    def mahalanobis_parameters(data=None, inverse_covariance=None) -> np.ndarray:
+        """ Get the inverse covariance of the mahalanobis parameters
+
+            Raises:
+                ValueError : If neither data nor inverse_covariance is given
+        """
+        if inverse_covariance is not None:
+            return np.asarray(inverse_covariance, dtype=float)
+        if data is None:
+            raise ValueError("The mahalanobis distance needs the parameter data or inverse_covariance")
+        return DistanceMetrics.inverse_covariance(data)
+
+    @staticmethod
+    def mahalanobis_prepare(data=None, inverse_covariance=None) -> dict:
+        """ Resolve the inverse covariance of the mahalanobis parameters once for all the blocks of rows
+
+            Raises:
+                ValueError : If neither data nor inverse_covariance is given
+        """
+        return {"inverse_covariance": DistanceMetrics.mahalanobis_parameters(data, inverse_covariance)}
+
+    @staticmethod
+    def mahalanobis(p: np.ndarray, q: np.ndarray, data=None, inverse_covariance=None) -> np.ndarray:
+        """ The mahalanobis distances between broadcasted blocks of rows
+
+            The calculation formula is:
+            \f$\sqrt{(p-q)^T S^{-1} (p-q)}\f$.
+        """
+        inverse_covariance = DistanceMetrics.mahalanobis_parameters(data, inverse_covariance)
+        differences = p - q
+        return np.sqrt(np.maximum(np.sum((differences @ inverse_covariance) * differences, axis=-1), 0))
+
+    @staticmethod
+    def mahalanobis_matrix(p, q, data=None, inverse_covariance=None) -> np.ndarray:
+        """ The mahalanobis distances between each row of p and each row of q
+
+            The calculation formula is:
+            \f$pS^{-1}p + qS^{-1}q - 2pS^{-1}q\f$.
+        """
+        inverse_covariance = DistanceMetrics.mahalanobis_parameters(data, inverse_covariance)
+        p_transformed = np.asarray(p @ inverse_covariance)
+        q_transformed = np.asarray(q @ inverse_covariance)
+        p_norms = np.asarray(p.multiply(p_transformed).sum(axis=1)).flatten() if sparse.issparse(p) else \
+            np.sum(p * p_transformed, axis=1)
+        q_norms = np.asarray(q.multiply(q_transformed).sum(axis=1)).flatten() if sparse.issparse(q) else \
+            np.sum(q * q_transformed, axis=1)
+        distances = p_norms.reshape(-1, 1) + q_norms.reshape(1, -1) - 2 * DistanceMetrics.products(q, p_transformed).T
+        return np.sqrt(np.maximum(distances, 0))
+
+    def select(self, prmOptions: List[List[str]], options: List[List[int]], itemToFind: List, metric: str="euclidean",
+               **parameters):
+        """ Select the option that is the nearest to the item
+
+            The selection is done with a NearestNeighbours index. In order to select for many
+            items create the NearestNeighbours once and query it
+
+            Args:
+                prmOptions  : (List[List[str]]) - The possible values of each parameter
+                options     : (List[List]) - The options
+                itemToFind  : (List) - The item
+                metric      : (str) - The name of the distance metrics (see DistanceMetrics.metrics)
+                parameters  : The parameters of the metrics
+
+            Returns:
+                int : The index of the selected option
+        """
+        _, indexes = NearestNeighbours(prmOptions, options, metric, **parameters).query(itemToFind)
+        return int(indexes[0])
+
+
+# The registered distance metrics
+DistanceMetrics.register("euclidean", lambda p, q: np.sqrt(np.sum((p - q) ** 2, axis=-1)),
+                         lambda p, q: np.sqrt(DistanceMetrics.square_euclidean_matrix(p, q)))
+DistanceMetrics.register("sqeuclidean", lambda p, q: np.sum((p - q) ** 2, axis=-1),
+                         DistanceMetrics.square_euclidean_matrix)
+DistanceMetrics.register("manhattan", lambda p, q: np.sum(np.abs(p - q), axis=-1))
+DistanceMetrics.register("chebyshave", lambda p, q: np.max(np.abs(p - q), axis=-1))
+DistanceMetrics.register("minkowski", lambda p, q, order=2: np.sum(np.abs(p - q) ** order, axis=-1) ** (1 / order))
+DistanceMetrics.register("cosine", DistanceMetrics.cosine, DistanceMetrics.cosine_matrix)
+DistanceMetrics.register("hamming", DistanceMetrics.hamming, DistanceMetrics.hamming_matrix)
+DistanceMetrics.register("mahalanobis", DistanceMetrics.mahalanobis, DistanceMetrics.mahalanobis_matrix,
+                         DistanceMetrics.mahalanobis_prepare)
+
+
+class NearestNeighbours(object):
+    """ Nearest neighbours index of options
+
+        The index is built once from the options:
+        -#  The options are normalized (equilateral encoding) and the normalize model is kept
+            for normalizing the queries. For the hamming metric the values are normalized to
+            their index (qualitative to range) so the distance is the number of different parameters
+        -#  For the metrics that are p-norms (euclidean, sqeuclidean, manhattan, chebyshave, minkowski)
+            and a small number of dimensions a KD-tree (scipy.spatial.cKDTree) is built
+        -#  Else the queries are answered by brute force with DistanceMetrics.pairwise
+
+        The query method gets one item or a list of items and returns the k nearest options
+    """
+
+    # The maximum number of dimensions of the normalized options for using the KD-tree
+    kd_tree_max_dimensions = 16
+
+    def __init__(self, prmOptions: List[List[str]], options: List[List], metric: str="euclidean", **parameters):
+        """ NearestNeighbours constructor
+
+            Args:
+                prmOptions  : (List[List[str]]) - The possible values of each parameter
+                options     : (List[List]) - The options
+                metric      : (str) - The name of the distance metrics (see DistanceMetrics.metrics)
+                parameters  : The parameters of the metrics
+        """
+        self.metric = metric
+        self.parameters = DistanceMetrics.prepare_parameters(metric, parameters)
+        self.distanceMetrics = DistanceMetrics()
 
         # Create the normalize data matrix
         normalizeDataMatrix = []
@@ -84,6 +480,9 @@ class DistanceMetrics(object):
             normalizeData["fieldType"] = FieldsTypes.NominalData
             normalizeData["normalizeMethod"] = NormalizeMethod.EquilateralEncoding
             normalizeData["max"] = len(prmOptions[prmIdx])
+            if metric == "hamming":
+                normalizeData["normalizeMethod"] = NormalizeMethod.QualitativeToRange
+                normalizeData["max"] = len(prmOptions[prmIdx]) - 1
             normalizeData["min"] = 0
             normalizeData["normalizeRange"] = NormalizeRange.ZeroToOne
             normalizeData["valuesOrder"] = [value for value in prmOptions[prmIdx]]
@@ -94,30 +493,74 @@ class DistanceMetrics(object):
         # a file which means :
         # 1. each field has a header
         # 2. The values are strings
+        self.prmNameRow = ["prm" + str(idx) for idx in range(len(prmOptions))]
+        self.normalizer = Normalize(self.createInputMatrix(options), normalizeDataMatrix).fit()
+        self.options = self.normalizer.normalize().view(np.ndarray).astype(float)
 
-        # Handle the options matrix
-        options = [[str(entry) for entry in row] for row in options]
-        prmNameRow = ["prm" + str(idx) for idx in range(len(options[0]))]
-        options.insert(0, prmNameRow)
-        options = np.array(options)
+        # Build the KD-tree
+        self.tree = None
+        self.treeP = {"euclidean": 2, "sqeuclidean": 2, "manhattan": 1, "chebyshave": np.inf,
+                      "minkowski": parameters.get("order", 2)}.get(metric)
+        if self.treeP is not None and self.options.shape[1] <= NearestNeighbours.kd_tree_max_dimensions:
+            self.tree = cKDTree(self.options)
 
-        # Convert the itemToFind to a matrix with name row
-        itemToFind = [str(entry) for entry in itemToFind]
-        itemToFind = [prmNameRow, itemToFind]
-        itemToFind = np.array(itemToFind)
+    def createInputMatrix(self, items: List[List]) -> np.ndarray:
+        """ Create an input matrix for the normalizer (strings with a names row)
+        """
+        return np.array([self.prmNameRow] + [[str(entry) for entry in item] for item in items])
 
-        normalizeObject = Normalize(options, normalizeDataMatrix)
-        optionsNormalized = normalizeObject.normalize()
+    def query(self, items: List, k: int=1):
+        """ Find the k nearest options of one item or of each item in a list of items
 
-        normalizeObject = Normalize(itemToFind, normalizeDataMatrix)
-        itemNormalized = normalizeObject.normalize()
+            Args:
+                items   : (List or List[List]) - An item or a list of items
+                k       : (int) - The number of neighbours (limited to the number of options)
 
-        bestDist = float("inf")
-        for optionIdx in range(len(optionsNormalized)):
-            option = optionsNormalized.rows([optionIdx])
-            dist = self.euclidean(option, itemNormalized)
-            if dist < bestDist:
-                selectedOption = optionIdx
-                bestDist = dist
+            Returns:
+                np.ndarray : The distances of the neighbours (items X k, or k for one item)
+                np.ndarray : The indexes of the neighbours (items X k, or k for one item)
+        """
+        oneItem = len(items) > 0 and not isinstance(items[0], (list, tuple, np.ndarray))
+        if oneItem:
+            items = [items]
+        k = min(k, self.options.shape[0])
+        queries = self.normalizer.transform(self.createInputMatrix(items)).view(np.ndarray).astype(float)
+
+        if self.tree is not None:
+            distances, indexes = self.tree.query(queries, k=list(range(1, k + 1)), p=self.treeP)
+            if self.metric == "sqeuclidean":
+                distances = distances ** 2
+        else:
+            distances, indexes = self.bruteForce(queries, k)
+
+        if oneItem:
+            return distances[0], indexes[0]
+        return distances, indexes
+
+    def bruteForce(self, queries: np.ndarray, k: int):
+        """ Find the k nearest options of each query by calculating all the distances
+
+            The queries are processed in blocks so the distances matrix of a block is limited
+            to DistanceMetrics.block_size values
+
+            Returns:
+                np.ndarray : The distances of the neighbours (queries X k)
+                np.ndarray : The indexes of the neighbours (queries X k)
+        """
+        numOptions = self.options.shape[0]
+        rowsInBlock = max(1, DistanceMetrics.block_size // numOptions)
+        distances = np.empty((queries.shape[0], k))
+        indexes = np.empty((queries.shape[0], k), dtype=int)
+        for start in range(0, queries.shape[0], rowsInBlock):
+            stop = min(start + rowsInBlock, queries.shape[0])
+            blockDistances = self.distanceMetrics.pairwise(queries[start:stop], self.options, self.metric,
+                                                           **self.parameters)
 
-        return selectedOption
+            # Select the k nearest (argpartition) and sort them by the distance and the index
+            candidates = np.argpartition(blockDistances, k - 1, axis=1)[:, :k] if k < numOptions else \
+                np.tile(np.arange(numOptions), (stop - start, 1))
+            candidatesDistances = np.take_along_axis(blockDistances, candidates, axis=1)
+            order = np.lexsort((candidates, candidatesDistances), axis=1)
+            indexes[start:stop] = np.take_along_axis(candidates, order, axis=1)
+            distances[start:stop] = np.take_along_axis(candidatesDistances, order, axis=1)
+        return distances, indexes
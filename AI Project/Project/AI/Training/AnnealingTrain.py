@@ -0,0 +1,137 @@
+"""
+Hold the simulated annealing training
+
+"""
+# Python imports
+import math
+from typing import ClassVar, Tuple
+import numpy as np
+from .SupervisedTrain import ParametersList
+from .SupervisedTrain import AlgorithmData
+from .HillClimbingTrain import HillClimbingTrain
+
+
+class AnnealingTrain(HillClimbingTrain):
+    """
+    Simulated annealing train
+
+    # Algorithm Description
+
+    ## Perpose
+    To activate simulated annealing train on algorithms
+
+    ## Algorithm parameters
+    -   Allowed percent of wrong answers
+
+    ## Algorithm principals:
+    -   The long term memory is changed like HillClimbingTrain (a gaussian noise)
+    -   A score that is not worse is always kept. A worse score is kept with the probability
+        \f$e^{-\Delta/T}\f$ where \f$\Delta\f$ is the increase of the score and T is the temperature
+    -   The temperature starts at initial_temperature and is multiplied by cooling_rate in each step
+        so at the end only better scores are kept
+    -   The long term memory with the best score is saved and restored when the train finishes and before a test
+
+    ## Attributes
+    -   algorithm   (Inherits from BaseAlgorithm) - The algorithm object
+    -   algorithm_data  (AlgorithmData) - The data of the algorithm
+    -   parameters  (ParametersList) - A list of parameters for the train
+    -   best_score  (float) - The best score achived so far
+    -   current_score  (float) - The score of the current long term memory
+    -   step_size   (float) - The standard deviation of the noise
+    -   temperature  (float) - The temperature
+    -   best_ltm    (dict) - A copy of the long term memory with the best score
+
+    Args:
+        parameters: (ParametersList) - A list of parameters to be used by the algorithm
+        algorithm:  (ClassVar) - The algorithm object
+        algorithm_data: (AlgorithmData) - The algorithm data
+    """
+
+    # The temperature at the init (in percent of wrong answers) and its change in each step
+    initial_temperature = 1.0
+    cooling_rate = 0.99
+
+    def __init__(self, parameters: ParametersList, algorithm: ClassVar, algorithm_data: AlgorithmData):
+        """ __init__ method
+
+        Calls the __init__ method of HillClimbingTrain
+        """
+        super(AnnealingTrain, self).__init__(parameters, algorithm, algorithm_data)
+        self.temperature = AnnealingTrain.initial_temperature
+        self.best_ltm = None
+
+    def init(self) -> Tuple[bool, str]:
+        """Initialize the training
+
+        Set a random long term memory (see GreedyTrain.init) and the initial temperature
+
+        Returns:
+            bool:   Whether the method succeeded
+            str:    Result message
+        """
+        self.temperature = AnnealingTrain.initial_temperature
+        self.best_ltm = None
+        return super(AnnealingTrain, self).init()
+
+    def step(self) -> Tuple[bool, str, bool, bool]:
+        """ Perform a step of the algorithm
+
+        -   Perform the step of HillClimbingTrain and cool the temperature
+        -   Save the long term memory if the score is the best
+        -   Restore the best long term memory if the train finished
+
+        Returns:
+            bool:   Whether the method succeeded
+            str:    Result message
+            bool:   If the algorithm generated a new (better) score
+            bool:   If the algorithm finished
+        """
+        success, message, improved, finished = super(AnnealingTrain, self).step()
+        self.temperature *= AnnealingTrain.cooling_rate
+        if success and improved:
+            self.best_ltm = {key: np.copy(self.algorithm.ltm[key]) for key in self.algorithm.ltm.keys()}
+        if finished:
+            self.restore_best_ltm()
+        return success, message, improved, finished
+
+    def restore_best_ltm(self):
+        """Set the long term memory with the best score to the algorithm
+        """
+        if self.best_ltm is None:
+            return
+        for key in self.best_ltm.keys():
+            self.algorithm.ltm[key] = np.copy(self.best_ltm[key])
+        self.current_score = self.best_score
+
+    def test(self, test_algorithm_data: AlgorithmData) -> Tuple[bool, str, bool]:
+        """Tests the results of the algorithm
+
+        Restore the long term memory with the best score and perform the test of SupervisedTrain
+
+        Args:
+            test_algorithm_data (AlgorithmData) - The data for the test
+
+        Returns:
+            bool:   Whether the method succeeded
+            str:    Result message
+            bool:   The results of testing the operation
+        """
+        self.restore_best_ltm()
+        return super(AnnealingTrain, self).test(test_algorithm_data)
+
+    def accepted(self, score: float) -> bool:
+        """Decide whether to keep the long term memory of a step
+
+        A score that is not worse is kept and a worse score is kept with the probability \f$e^{-\Delta/T}\f$
+
+        Args:
+            score (float): The score of the step
+
+        Returns:
+            bool:   Whether to keep the long term memory
+        """
+        if score <= self.current_score:
+            return True
+        if self.temperature <= 0:
+            return False
+        return np.random.random() < math.exp(-(score - self.current_score) / self.temperature)
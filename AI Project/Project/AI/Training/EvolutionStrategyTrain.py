@@ -0,0 +1,109 @@
+"""
+Hold the (1 + lambda) evolution strategy training
+
+"""
+# Python imports
+from typing import ClassVar, Tuple
+import numpy as np
+from .SupervisedTrain import ParametersList
+from .SupervisedTrain import AlgorithmData
+from .PopulationGreedyTrain import PopulationGreedyTrain
+from .HillClimbingTrain import HillClimbingTrain
+
+
+class EvolutionStrategyTrain(PopulationGreedyTrain):
+    """
+    (1 + lambda) evolution strategy train
+
+    # Algorithm Description
+
+    ## Perpose
+    To activate (1 + lambda) evolution strategy train on algorithms
+
+    ## Algorithm parameters
+    -   Allowed percent of wrong answers
+    -   The number of offsprings in each step (the population size)
+
+    ## Algorithm principals:
+    -   At the init random values are inserted to all the Long term memory (the parent)
+    -   In each step the offsprings are created by adding a gaussian noise with a standard
+        deviation of step_size to the parent
+    -   The best offspring replaces the parent if its score is not worse (so the parent can move on a
+        plateau of the score)
+    -   The step size is adapted by the 1/5 success rule (see HillClimbingTrain.adapted_step_size).
+        Only a better score is a success
+
+    ## Attributes
+    -   algorithm   (Inherits from BaseAlgorithm) - The algorithm object
+    -   algorithm_data  (AlgorithmData) - The data of the algorithm
+    -   parameters  (ParametersList) - A list of parameters for the train
+    -   best_score  (float) - The best score achived so far
+    -   step_size   (float) - The standard deviation of the noise
+
+    Args:
+        parameters: (ParametersList) - A list of parameters to be used by the algorithm
+        algorithm:  (ClassVar) - The algorithm object
+        algorithm_data: (AlgorithmData) - The algorithm data
+    """
+
+    def __init__(self, parameters: ParametersList, algorithm: ClassVar, algorithm_data: AlgorithmData):
+        """ __init__ method
+
+        Calls the __init__ method of PopulationGreedyTrain
+        """
+        super(EvolutionStrategyTrain, self).__init__(parameters, algorithm, algorithm_data)
+        self.step_size = HillClimbingTrain.initial_step_size
+
+    def init(self) -> Tuple[bool, str]:
+        """Initialize the training
+
+        Set a random parent (see GreedyTrain.init) and the initial step size
+
+        Returns:
+            bool:   Whether the method succeeded
+            str:    Result message
+        """
+        self.step_size = HillClimbingTrain.initial_step_size
+        return super(EvolutionStrategyTrain, self).init()
+
+    def step(self) -> Tuple[bool, str, bool, bool]:
+        """ Perform a step of the algorithm
+
+        Perform the step of PopulationGreedyTrain and adapt the step size by whether the score is better
+
+        Returns:
+            bool:   Whether the method succeeded
+            str:    Result message
+            bool:   If the algorithm generated a new (better) score
+            bool:   If the algorithm finished
+        """
+        success, message, improved, finished = super(EvolutionStrategyTrain, self).step()
+        if success:
+            self.step_size = HillClimbingTrain.adapted_step_size(self.step_size, improved)
+        return success, message, improved, finished
+
+    def accepted(self, score: float) -> bool:
+        """Decide whether the best offspring replaces the parent
+
+        The parent is replaced if the score of the offspring is not worse
+
+        Args:
+            score (float): The score of the best offspring
+
+        Returns:
+            bool:   Whether to replace the parent
+        """
+        return score <= self.best_score
+
+    def population_ltm(self) -> dict:
+        """Create the offsprings
+
+        Each offspring is the parent (the long term memory) with a gaussian noise
+
+        Returns:
+            dict:   For each key of the long term memory an array with an offspring entry in each row
+        """
+        population_size = int(self.parameters["Population size"]["value"])
+        return {key: self.algorithm.ltm[key] +
+                self.step_size * np.random.randn(population_size, *self.algorithm.ltm[key].shape)
+                for key in self.algorithm.ltm.keys()}
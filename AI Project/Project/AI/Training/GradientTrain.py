@@ -0,0 +1,175 @@
+"""
+Hold the gradient descent training of RBFNetwork
+
+"""
+# Python imports
+from typing import ClassVar, Tuple
+import numpy as np
+from .SupervisedTrain import List
+from .SupervisedTrain import FieldRolls
+from .SupervisedTrain import ParametersList
+from .SupervisedTrain import AlgorithmData
+from .SupervisedTrain import StdPrmInput, StdPrm
+from .SupervisedTrain import QWidget
+from .GreedyTrain import GreedyTrain
+from ..Algorithms.RBFNetwork import RBFNetwork
+
+
+class GradientTrain(GreedyTrain):
+    """
+    Gradient descent train
+
+    # Algorithm Description
+
+    ## Perpose
+    To train RBFNetwork with the gradients of its long term memory
+
+    ## Algorithm parameters
+    -   Allowed percent of wrong answers
+    -   The number of observations in a batch
+
+    ## Algorithm principals:
+    -   At the init the centers (c) are the avarages of the observations of each group,
+        the scales (b) are 1 and the sum of a is initial_scale
+    -   In each step the observations are divided to random batches and for each batch the long term memory
+        is moved against the gradient of the loss (see RBFNetwork.gradients) multiplied by learning_rate
+    -   Unlike GreedyTrain the new long term memory is kept even if the score is not better
+        (the score and the finish are the same as GreedyTrain)
+
+    ## Attributes
+    -   algorithm   (RBFNetwork) - The algorithm object
+    -   algorithm_data  (AlgorithmData) - The data of the algorithm
+    -   parameters  (ParametersList) - A list of parameters for the train
+    -   best_score  (float) - The best score achived so far
+    -   loss        (float) - The avarage loss of the batches in the last step
+
+    Args:
+        parameters: (ParametersList) - A list of parameters to be used by the algorithm
+        algorithm:  (ClassVar) - The algorithm object
+        algorithm_data: (AlgorithmData) - The algorithm data
+    """
+
+    # The size of the steps against the gradient
+    learning_rate = 0.5
+
+    # The sum of the a coefficient at the init
+    initial_scale = 10.0
+
+    def __init__(self, parameters: ParametersList, algorithm: ClassVar, algorithm_data: AlgorithmData):
+        """ __init__ method
+
+        Calls the __init__ method of GreedyTrain
+        """
+        super(GradientTrain, self).__init__(parameters, algorithm, algorithm_data)
+        self.loss = np.inf
+
+    @staticmethod
+    def prms(widget: QWidget) -> List:
+        """Generate parameters list of the trainings
+
+        Gets the parameters of GreedyTrain
+
+        Add to these parameters the batch size parameter
+
+        Args:
+            widget: (QWidget) - The ParametersWidget that will handle the parameters
+        """
+        parameters = GreedyTrain.prms(widget)
+
+        parameters.append(
+            StdPrm("Batch size", "", False, StdPrmInput.spinBox, [10],
+                   widget.spinValueChanged, []))
+        return parameters
+
+    def init(self) -> Tuple[bool, str]:
+        """Initialize the training
+
+        Set the initial long term memory and call the init method of the algorithm
+
+        Returns:
+            bool:   Whether the method succeeded
+            str:    Result message
+        """
+        if not isinstance(self.algorithm, RBFNetwork):
+            return False, "The gradient train can train only RBFNetwork"
+        if int(self.parameters["Batch size"]["value"]) < 1:
+            return False, "The batch size has to be positive"
+
+        parameters = self.algorithm_data.cols_matrix(FieldRolls.Parameter, float)
+        groups = self.algorithm_data.labels(FieldRolls.ResultPresentation)
+        ltm = self.algorithm.ltm
+
+        # The center of each RBF method is the avarage of its group (or a random observation for an empty group)
+        counts = np.bincount(groups, minlength=ltm["c"].shape[0])[:ltm["c"].shape[0]]
+        centers = ltm["c"]
+        for group_idx in range(centers.shape[0]):
+            if counts[group_idx] > 0:
+                centers[group_idx] = parameters[groups == group_idx].mean(axis=0)
+            else:
+                centers[group_idx] = parameters[np.random.randint(0, parameters.shape[0])]
+        ltm["b"] = np.ones(ltm["b"].shape)
+        ltm["a"] = np.full(ltm["a"].shape, GradientTrain.initial_scale / ltm["a"].size)
+        return self.algorithm.init()
+
+    def step(self) -> Tuple[bool, str, bool, bool]:
+        """ Perform a step of the algorithm
+
+        -   Step :
+            -   Move the long term memory against the gradient (see change_ltm)
+            -   Perform a step of the algorithm
+            -   Score the results of the step
+            -   Check if the algorithm finished
+
+        Returns:
+            bool:   Whether the method succeeded
+            str:    Result message
+            bool:   If the algorithm generated a new (better) score
+            bool:   If the algorithm finished
+        """
+        self.change_ltm()
+
+        success, message = self.algorithm.step(self.algorithm_data)
+        if not success:
+            return False, message, 0, False
+
+        success, message, score = self.score()
+        if not success:
+            return False, message, 0, False
+
+        success, message, finished = self.finished(score)
+        if not success:
+            return False, message, 0, False
+
+        improved = score < self.best_score
+        message = "The score is " + str(score) + " the loss is " + str(self.loss)
+        self.best_score = min(score, self.best_score)
+        self.algorithm_data.evaluations.append(score)
+        return True, message, improved, finished
+
+    def change_ltm(self) -> Tuple[bool, str]:
+        """Create a new long term memory
+
+        The policy of the gradient train is to move the long term memory against the gradient
+        of the loss of each batch of the observations
+
+        Returns:
+            bool:   If the method succeeded
+            str:    The finish message
+        """
+        parameters = self.algorithm_data.cols_matrix(FieldRolls.Parameter, float)
+        groups = self.algorithm_data.labels(FieldRolls.ResultPresentation)
+
+        # Only observations of groups that has an RBF method can be learned
+        learned = np.where((groups >= 0) & (groups < self.algorithm.ltm["c"].shape[0]))[0]
+        np.random.shuffle(learned)
+
+        batch_size = int(self.parameters["Batch size"]["value"])
+        losses = []
+        for start in range(0, learned.shape[0], batch_size):
+            batch = learned[start:start + batch_size]
+            loss, gradients = self.algorithm.gradients(parameters[batch], groups[batch])
+            for key in gradients.keys():
+                self.algorithm.ltm[key] = self.algorithm.ltm[key] - GradientTrain.learning_rate * gradients[key]
+            losses.append(loss)
+        self.loss = float(np.mean(losses)) if len(losses) > 0 else np.inf
+        return True, ""
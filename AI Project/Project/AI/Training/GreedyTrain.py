@@ -116,7 +116,8 @@ class GreedyTrain(SupervisedTrain):
             float:  The score
         """
 
-        num_miss = np.sum(self.algorithm_data[:,FieldRolls.StepResult] != self.algorithm_data[:,FieldRolls.ResultPresentation])
+        num_miss = np.sum(
+            self.algorithm_data.labels(FieldRolls.StepResult) != self.algorithm_data.labels(FieldRolls.ResultPresentation))
         num_miss_perc = num_miss * 100/self.algorithm_data.shape[0]
         return True, "", num_miss_perc
 
@@ -153,7 +154,8 @@ class GreedyTrain(SupervisedTrain):
             bool:   Whether the test succeeded
         """
 
-        num_miss = np.sum(self.algorithm_data[:,FieldRolls.StepResult] != self.algorithm_data[:,FieldRolls.ResultPresentation])
+        num_miss = np.sum(
+            self.algorithm_data.labels(FieldRolls.StepResult) != self.algorithm_data.labels(FieldRolls.ResultPresentation))
         num_miss_perc = num_miss * 100/algorithm_data.shape[0]
         finish_level = self.parameters["max miss"]["value"]
         result_str = str(num_miss) + " out of " + str(algorithm_data.shape[0]) + " (" + str(num_miss_perc) + "% < " + str(finish_level) + "%)"
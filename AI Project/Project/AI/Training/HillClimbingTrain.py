@@ -0,0 +1,172 @@
+"""
+Hold the hill climbing training
+
+"""
+# Python imports
+from typing import ClassVar, Tuple
+import numpy as np
+from .SupervisedTrain import ParametersList
+from .SupervisedTrain import AlgorithmData
+from .GreedyTrain import GreedyTrain
+
+
+class HillClimbingTrain(GreedyTrain):
+    """
+    Hill climbing train
+
+    # Algorithm Description
+
+    ## Perpose
+    To activate hill climbing train on algorithms
+
+    ## Algorithm parameters
+    -   Allowed percent of wrong answers
+
+    ## Algorithm principals:
+    -   At the init random values are inserted to all the Long term memory (like GreedyTrain)
+    -   At the beginning of each step a gaussian noise with a standard deviation of step_size
+        is added to all the Long term memory
+    -   Perform a step get the score. if the score is not worse keep the long term memory
+        (so the long term memory can move on a plateau of the score). Else stay with the previouse Long Term Memory
+    -   The step size is adapted by the 1/5 success rule (see adapted_step_size). Only a better
+        score is a success (a move on a plateau is not)
+
+    ## Attributes
+    -   algorithm   (Inherits from BaseAlgorithm) - The algorithm object
+    -   algorithm_data  (AlgorithmData) - The data of the algorithm
+    -   parameters  (ParametersList) - A list of parameters for the train
+    -   best_score  (float) - The best score achived so far
+    -   current_score  (float) - The score of the current long term memory
+    -   step_size   (float) - The standard deviation of the noise
+
+    Args:
+        parameters: (ParametersList) - A list of parameters to be used by the algorithm
+        algorithm:  (ClassVar) - The algorithm object
+        algorithm_data: (AlgorithmData) - The algorithm data
+    """
+
+    # The step size at the init and its limits (the long term memory values are about 1 and
+    # with smaller steps the percent of wrong answers almost never changes)
+    initial_step_size = 0.1
+    min_step_size = 0.05
+    max_step_size = 1.0
+
+    # The change of the step size after a success (after a failure the step size is divided
+    # by the 4th root so the step size is stable when 1/5 of the steps succeed)
+    step_size_increase = 1.5
+
+    def __init__(self, parameters: ParametersList, algorithm: ClassVar, algorithm_data: AlgorithmData):
+        """ __init__ method
+
+        Calls the __init__ method of GreedyTrain
+        """
+        super(HillClimbingTrain, self).__init__(parameters, algorithm, algorithm_data)
+        self.current_score = np.inf
+        self.step_size = HillClimbingTrain.initial_step_size
+
+    def init(self) -> Tuple[bool, str]:
+        """Initialize the training
+
+        Set random values to all the long term memory (see GreedyTrain.change_ltm),
+        the initial step size and call the init method of the algorithm
+
+        Returns:
+            bool:   Whether the method succeeded
+            str:    Result message
+        """
+        self.current_score = np.inf
+        self.step_size = HillClimbingTrain.initial_step_size
+        GreedyTrain.change_ltm(self)
+        return self.algorithm.init()
+
+    def step(self) -> Tuple[bool, str, bool, bool]:
+        """ Perform a step of the algorithm
+
+        -   Step :
+            -   Change the long term memory (see change_ltm)
+            -   Perform a step of the algorithm
+            -   Score the results of the step
+            -   Keep the long term memory if the score is accepted (see accepted) and check if the algorithm finished
+            -   Adapt the step size by whether the score is better than the current score
+
+        Returns:
+            bool:   Whether the method succeeded
+            str:    Result message
+            bool:   If the algorithm generated a new (better) score
+            bool:   If the algorithm finished
+        """
+        self.algorithm.ltm.clone()
+        self.change_ltm()
+
+        success, message = self.algorithm.step(self.algorithm_data)
+        if not success:
+            return False, message, 0, False
+
+        success, message, score = self.score()
+        if not success:
+            return False, message, 0, False
+
+        self.step_size = HillClimbingTrain.adapted_step_size(self.step_size, score < self.current_score)
+        if self.accepted(score):
+            success, message, finished = self.finished(score)
+            if not success:
+                return False, message, 0, False
+
+            improved = score < self.best_score
+            message = "Score changed from " + str(self.current_score) + " to " + str(score)
+            self.current_score = score
+            self.best_score = min(score, self.best_score)
+            self.algorithm_data.evaluations.append(score)
+            return True, message, improved, finished
+        else:
+            message = "The score did not change it is " + str(self.current_score) + " The step score is " + str(score)
+            self.algorithm.ltm.reverse()
+            self.algorithm_data.evaluations.append(self.current_score)
+            return True, message, False, False
+
+    def accepted(self, score: float) -> bool:
+        """Decide whether to keep the long term memory of a step
+
+        The long term memory is kept if the score is not worse than the current score
+
+        Args:
+            score (float): The score of the step
+
+        Returns:
+            bool:   Whether to keep the long term memory
+        """
+        return score <= self.current_score
+
+    def change_ltm(self) -> Tuple[bool, str]:
+        """Create a new long term memory
+
+        The policy of the hill climbing train is to add a gaussian noise to the Long Term Memory
+
+        Returns:
+            bool:   If the method succeeded
+            str:    The finish message
+        """
+        for key in self.algorithm.ltm.keys():
+            self.algorithm.ltm[key] = self.algorithm.ltm[key] + \
+                self.step_size * np.random.randn(*self.algorithm.ltm[key].shape)
+        return True, ""
+
+    @staticmethod
+    def adapted_step_size(step_size: float, improved: bool) -> float:
+        """The step size after a step (the 1/5 success rule)
+
+        -   After a success the step size is multiplied by step_size_increase
+        -   After a failure the step size is divided by the 4th root of step_size_increase
+
+        Args:
+            step_size: (float) - The step size
+            improved: (bool) - Whether the step succeeded (its score is better)
+
+        Returns:
+            float:  The new step size (between min_step_size and max_step_size)
+        """
+        if improved:
+            step_size *= HillClimbingTrain.step_size_increase
+        else:
+            step_size /= HillClimbingTrain.step_size_increase ** 0.25
+        return float(np.clip(step_size, HillClimbingTrain.min_step_size, HillClimbingTrain.max_step_size))
@@ -0,0 +1,157 @@
+"""
+Hold the population greedy training
+
+"""
+# Python imports
+from typing import ClassVar, Tuple
+import numpy as np
+from .SupervisedTrain import List
+from .SupervisedTrain import FieldRolls
+from .SupervisedTrain import ParametersList
+from .SupervisedTrain import AlgorithmData
+from .SupervisedTrain import StdPrmInput, StdPrm
+from .SupervisedTrain import QWidget
+from .GreedyTrain import GreedyTrain
+
+
+class PopulationGreedyTrain(GreedyTrain):
+    """
+    Population greedy train
+
+    # Algorithm Description
+
+    ## Perpose
+    To activate greedy train on algorithms with a population of long term memories in each step
+
+    ## Algorithm parameters
+    -   Allowed percent of wrong answers
+    -   The number of long term memories in each step
+
+    ## Algorithm principals:
+    -   At the beginning of each step a population of long term memories with random values is created
+    -   All the population is calculated by the population_step method of the algorithm
+        (an algorithm can calculate all the population at once see RBFNetwork.population_step)
+    -   The score of each long term memory is calculated and the best one is selected
+    -   If the score of the best long term memory is better keep it. Else stay with the previouse Long Term Memory
+
+    ## Attributes
+    -   algorithm   (Inherits from BaseAlgorithm) - The algorithm object
+    -   algorithm_data  (AlgorithmData) - The data of the algorithm
+    -   parameters  (ParametersList) - A list of parameters for the train
+    -   best_score  (float) - The best score achived so far
+
+    Args:
+        parameters: (ParametersList) - A list of parameters to be used by the algorithm
+        algorithm:  (ClassVar) - The algorithm object
+        algorithm_data: (AlgorithmData) - The algorithm data
+    """
+
+    def __init__(self, parameters: ParametersList, algorithm: ClassVar, algorithm_data: AlgorithmData):
+        """ __init__ method
+
+        Calls the __init__ method of GreedyTrain
+        """
+        super(PopulationGreedyTrain, self).__init__(parameters, algorithm, algorithm_data)
+
+    @staticmethod
+    def prms(widget: QWidget) -> List:
+        """Generate parameters list of the trainings
+
+        Gets the parameters of GreedyTrain
+
+        Add to these parameters the population size parameter
+
+        Args:
+            widget: (QWidget) - The ParametersWidget that will handle the parameters
+        """
+        parameters = GreedyTrain.prms(widget)
+
+        parameters.append(
+            StdPrm("Population size", "", False, StdPrmInput.spinBox, [10],
+                   widget.spinValueChanged, []))
+        return parameters
+
+    def init(self) -> Tuple[bool, str]:
+        """Initialize the training
+
+        Check the population size and call the init method of GreedyTrain
+
+        Returns:
+            bool:   Whether the method succeeded
+            str:    Result message
+        """
+        if int(self.parameters["Population size"]["value"]) < 1:
+            return False, "The population size has to be positive"
+        return super(PopulationGreedyTrain, self).init()
+
+    def step(self) -> Tuple[bool, str, bool, bool]:
+        """ Perform a step of the algorithm
+
+        -   Step :
+            -   Create a population of long term memories (see population_ltm)
+            -   Perform a step of the algorithm for all the population
+            -   Score the results of each long term memory and select the best
+            -   If the best score is accepted (see accepted) keep its long term memory and check if the algorithm
+                finished
+
+        Returns:
+            bool:   Whether the method succeeded
+            str:    Result message
+            bool:   If the algorithm generated a new (better) score
+            bool:   If the algorithm finished
+        """
+        population = self.population_ltm()
+        success, message, results = self.algorithm.population_step(self.algorithm_data, population)
+        if not success:
+            return False, message, 0, False
+
+        # The percent of the wrong results of each long term memory
+        expected_results = self.algorithm_data.labels(FieldRolls.ResultPresentation)
+        scores = np.sum(results != expected_results, axis=1) * 100 / self.algorithm_data.shape[0]
+        best_idx = int(np.argmin(scores))
+        score = float(scores[best_idx])
+
+        if self.accepted(score):
+            success, message, finished = self.finished(score)
+            if not success:
+                return False, message, 0, False
+
+            # Keep the best long term memory and its results
+            for key in population.keys():
+                self.algorithm.ltm[key] = population[key][best_idx]
+            self.algorithm_data.set_labels(FieldRolls.StepResult, results[best_idx])
+
+            improved = score < self.best_score
+            message = "Score changed from " + str(self.best_score) + " to " + str(score)
+            self.best_score = score
+            self.algorithm_data.evaluations.append(score)
+            return True, message, improved, finished
+        else:
+            message = "The score did not change it is " + str(self.best_score) + " The step score is " + str(score)
+            self.algorithm_data.evaluations.append(self.best_score)
+            return True, message, False, False
+
+    def accepted(self, score: float) -> bool:
+        """Decide whether to keep the best long term memory of a step
+
+        The long term memory is kept if the score is better than the best score
+
+        Args:
+            score (float): The score of the best long term memory of the step
+
+        Returns:
+            bool:   Whether to keep the long term memory
+        """
+        return score < self.best_score
+
+    def population_ltm(self) -> dict:
+        """Create a population of long term memories
+
+        The policy is the same as GreedyTrain (random values to all the Long Term Memory)
+
+        Returns:
+            dict:   For each key of the long term memory an array with a random entry in each row
+        """
+        population_size = int(self.parameters["Population size"]["value"])
+        return {key: np.random.rand(population_size, *self.algorithm.ltm[key].shape)
+                for key in self.algorithm.ltm.keys()}
@@ -1,4 +1,7 @@
 # Python Imports
+import os
+import json
+from collections import OrderedDict
 from typing import List, Union
 from typing import NewType
 from enum import Enum
@@ -6,7 +9,8 @@ from enum import Enum
 
 # Third party imports
 import numpy as np
-from sklearn.decomposition import PCA
+from scipy import sparse
+from sklearn.decomposition import PCA, IncrementalPCA
 
 # PyQt imports
 
@@ -43,6 +47,76 @@ def isInt(n):
         return False
 
 
+class NamesTable(object):
+    """
+    A variable length table of the names of the columns
+
+    The names row of the AlgorithmData header holds int codes which are
+    the indexes of the names in this table. The table is only appended to
+    so it can be shared between AlgorithmData objects that share header rows
+    """
+
+    def __init__(self):
+        """
+        Method : __init__
+
+        Initialize an empty table
+        """
+        self.names = []
+        self.codes = {}
+
+    def code(self, name: str) -> int:
+        """
+        Method : code
+
+        Get the code of a name (the name is added to the table if it is not in it)
+
+        Args:
+            name    : (str) - The name
+
+        Returns:
+            int : The code of the name
+        """
+        code = self.codes.get(name)
+        if code is None:
+            code = len(self.names)
+            self.names.append(name)
+            self.codes[name] = code
+        return code
+
+    def encode(self, names) -> np.ndarray:
+        """
+        Method : encode
+
+        Convert names to a codes row
+
+        Args:
+            names   : (list of str) - The names
+
+        Returns:
+            np.ndarray : int32 codes of the names
+        """
+        return np.array([self.code(str(name)) for name in names], dtype=np.int32)
+
+    def translate(self, names_table, codes: np.ndarray) -> np.ndarray:
+        """
+        Method : translate
+
+        Convert codes of another table to the codes of this table
+
+        Args:
+            names_table : (NamesTable) - The table the codes refer to
+            codes       : (np.ndarray) - The codes in names_table
+
+        Returns:
+            np.ndarray : int32 codes in this table
+        """
+        if names_table is self:
+            return np.array(codes, dtype=np.int32)
+        conversion = np.array([self.code(name) for name in names_table.names], dtype=np.int32)
+        return conversion[codes]
+
+
 class AlgorithmData(np.ndarray):
     """
     The basic data structure of the project
@@ -58,9 +132,15 @@ class AlgorithmData(np.ndarray):
     -   The class inherits from np.ndarray so:
     -   The access to the data values is as for the np.ndarray
     -   The access to the header values is by stating the RowName in the first parameter
-    -   There are basically 2 ways to access the data:
+    -   The header rows are stored compact:
+        -#  The names row holds codes in a NamesTable
+        -#  The rolls, types and normalize methods rows hold the int values of the enums
+        -#  The enums and the names are created only when accessing the header
+            (__getitem__, header_row) and converted back in __setitem__
+    -   There are basically 3 ways to access the data:
         -#  Generating a new AlgorithmData methods rows, cols
         -#  Generating an ndarray method __getitem__ (see doc in __getitem__ to the ways to access the data)
+        -#  Generating an AlgorithmData that shares the data and the header methods rows_view, cols_view
 
     Examples:
         >>> a[1,1]
@@ -68,8 +148,19 @@ class AlgorithmData(np.ndarray):
 
         >>> a[RowNames.Name,1]
         accessing header data
+
+    Note:
+        A one-of-N encoded field can be held as one column with the index of the value
+        (see Normalize sparseOneOfN). The categories attribute holds for each column the
+        number of the values of the field (0 for a regular column) and sparse_cols
+        expands these columns to a scipy.sparse matrix
     """
 
+    # The enums of the header rows that are stored as the int values of the enums
+    header_enums = {RowNames.Roll: FieldRolls,
+                    RowNames.Types: FieldsTypes,
+                    RowNames.NormalizeMethods: NormalizeMethod}
+
     def __new__(cls,
                 data,
                 names: np.chararray=None,
@@ -80,7 +171,8 @@ class AlgorithmData(np.ndarray):
                 taraget_max: np.ndarray=None,
                 mins: np.ndarray=None,
                 maxs: np.ndarray=None,
-                info=None):
+                info=None,
+                categories: np.ndarray=None):
         """
         Method : __init__
 
@@ -96,13 +188,13 @@ class AlgorithmData(np.ndarray):
             targetMax           : (numpy.ndarray)    - The normalized maximum
             mins                : (numpy.ndarray)    - The unnormalized minimum
             maxs                : (numpy.ndarray)    - The unnormalized maximum
+            categories          : (numpy.ndarray)    - The number of values of one-of-N code columns (0 for other columns)
         """
 
         data = AlgorithmData.create_data_matrix(data)
         obj = data.view(cls)
-        obj.string_length = 100
 
-        names = AlgorithmData.adjust_char_row_length(data.shape[1], names, "Name", obj.string_length)
+        names = AlgorithmData.adjust_names_row_length(data.shape[1], names, "Name")
         rolls = AlgorithmData.adjust_row_length(data.shape[1], rolls, FieldRolls.Parameter)
         types = AlgorithmData.adjust_row_length(data.shape[1], types, FieldsTypes.RatioData)
         normalize_methods = AlgorithmData.adjust_normalize_method_row_length(normalize_methods, types)
@@ -111,9 +203,66 @@ class AlgorithmData(np.ndarray):
         mins = AlgorithmData.adjust_row_length(data.shape[1], mins, 0)
         maxs = AlgorithmData.adjust_row_length(data.shape[1], maxs, 0)
         obj.evaluations = []
-        obj.header = [names, rolls, types, normalize_methods, target_min, taraget_max, mins, maxs]
+        obj.names_table = NamesTable()
+        obj.header = [obj.names_table.encode(names),
+                      AlgorithmData.encode_enum_row(rolls),
+                      AlgorithmData.encode_enum_row(types),
+                      AlgorithmData.encode_enum_row(normalize_methods),
+                      target_min, taraget_max, mins, maxs]
+        obj.categories = AlgorithmData.adjust_row_length(data.shape[1], categories, 0).astype(np.int32)
+        obj.cols_idx_cache = {}
+        obj.header_version = [0]
+        obj.label_blocks = {}
         return obj
 
+    @staticmethod
+    def from_header(data, header: list, names_table: NamesTable, categories: np.ndarray=None):
+        """
+        Method : from_header
+
+        Creates an AlgorithmData from header rows that are already encoded
+
+        This method is used when the header rows are taken from another AlgorithmData
+        (the rows are not checked and converted again)
+
+        Args:
+            data        : (numpy.ndarray)    - The data
+            header      : (list)             - The encoded header rows
+            names_table : (NamesTable)       - The table of the codes in the names row
+            categories  : (numpy.ndarray)    - The number of values of one-of-N code columns
+
+        Returns:
+            AlgorithmData : The new AlgorithmData
+        """
+        obj = AlgorithmData.create_data_matrix(data).view(AlgorithmData)
+        obj.evaluations = []
+        obj.names_table = names_table
+        obj.header = header
+        if categories is None:
+            categories = np.zeros(obj.shape[1], dtype=np.int32)
+        obj.categories = categories
+        obj.cols_idx_cache = {}
+        obj.header_version = [0]
+        obj.label_blocks = {}
+        return obj
+
+    @staticmethod
+    def encode_enum_row(arr: np.ndarray) -> np.ndarray:
+        """
+        Method : encode_enum_row
+
+        Convert a header row of enums (rolls, types, normalize methods) to a row of the enum values
+
+        Args:
+            arr : (numpy.ndarray) - The row of the enums (or the row of the values)
+
+        Returns:
+            numpy.ndarray : int8 row with the values of the enums
+        """
+        if arr.dtype.kind in "iu":
+            return arr.astype(np.int8)
+        return np.array([entry.value for entry in arr], dtype=np.int8)
+
     @staticmethod
     def create_data_matrix(data):
         """
@@ -182,7 +331,15 @@ class AlgorithmData(np.ndarray):
         if obj is None:
             return
         self.header = getattr(obj, 'header', None)
-        self.string_length = getattr(obj, 'string_length', None)
+        self.names_table = getattr(obj, 'names_table', None)
+        self.categories = getattr(obj, 'categories', None)
+
+        # The cache is shared with the header it was built from
+        self.cols_idx_cache = getattr(obj, 'cols_idx_cache', None)
+        self.header_version = getattr(obj, 'header_version', None)
+
+        # The group index columns that are stored outside the data (see ufunc.group_by_roll)
+        self.label_blocks = getattr(obj, 'label_blocks', {})
 
     def __array_wrap__(self, out_arr, context=None):
         """
@@ -224,37 +381,31 @@ class AlgorithmData(np.ndarray):
         return np.array([arr[i] for i in range(desired_length)])
 
     @staticmethod
-    def adjust_char_row_length(desired_length: int, arr: np.chararray, default_value: str,
-                            string_length: int) -> np.chararray:
+    def adjust_names_row_length(desired_length: int, names, default_value: str) -> List[str]:
         """
-        Method : adjust_char_row_length
+        Method : adjust_names_row_length
 
-        Adjust the length of a header char row to that of the data
+        Adjust the length of the names row to that of the data
 
-        -#  if the header row is None - generate an array of the default value
-        -#  If the header row length and the data row length are equal - return
-        -#  If the header row length is larger than the data row length - cut the header row
-        -#  If the header row length is smaller to the data row length - fill with defaults
+        -#  if the names row is None - generate a list of the default value
+        -#  If the names row length and the data row length are equal - return
+        -#  If the names row length is larger than the data row length - cut the names row
+        -#  If the names row length is smaller to the data row length - fill with defaults
 
         Args:
-            desired_length  : (int)              - The data row length
-            arr             : (numpy.ndarray)    - The header row
-            default_value    : (str)              - The value for the fill
-            string_length    : (int)              - The maximum length of the item in the chararray
+            desired_length  : (int)                      - The data row length
+            names           : (numpy.chararray or list)  - The names row
+            default_value    : (str)                      - The value for the fill
 
         returns:
-            numpy.chararray   :The adjusted array
+            List[str]   :The adjusted names
         """
+        if names is None:
+            names = []
 
-        if arr is None:
-            return np.char.array([default_value for i in range(desired_length)], string_length)
-
-        if arr.shape[0] < desired_length:
-            list = [arr[i] for i in range(arr.shape[0])]
-            list.extend([default_value for i in range(arr.shape[0], desired_length)])
-            return np.char.array(list, string_length)
-
-        return np.char.array([arr[i] for i in range(desired_length)], string_length)
+        result = [str(names[i]) for i in range(min(len(names), desired_length))]
+        result.extend([default_value for i in range(len(result), desired_length)])
+        return result
 
     @staticmethod
     def adjust_normalize_method_row_length(normalize_methods: np.ndarray, types: np.ndarray) -> np.ndarray:
@@ -380,6 +531,10 @@ class AlgorithmData(np.ndarray):
         if not isinstance(index, tuple):
             index = (index, slice(0, self.shape[1]))
 
+        # If only the data section is accessed - index the underlying buffer directly
+        if AlgorithmData.is_data_index(index[0]) and self.dtype.kind in "biuf":
+            return self.get_data_items(index[0], index[1])
+
         # get the columns
         cols_idx = self.cols_idx(index[1])
 
@@ -421,8 +576,12 @@ class AlgorithmData(np.ndarray):
             if isinstance(index[0], RowNames):
 
                 # the type of the value and the item in the target place has to be the same
-                if PythonUtilities.compare_types(value, self.header[index[0].value][index[1]]):
-                    self.header[index[0].value][index[1]] = value
+                if PythonUtilities.compare_types(value, self.get_value(index[0], index[1])):
+                    self.header[index[0].value][index[1]] = self.encode_header_value(index[0], value)
+
+                    # The columns lookup tables are built from the names and the rolls rows
+                    if index[0] in (RowNames.Names, RowNames.Roll):
+                        self.clear_cols_idx_cache()
                 else:
                     error = "An attempt was made to insert : " + str(value) + " of type : " + str(
                         type(value)) + "\n to the row of : " + str(RowNames(index[0].value))
@@ -465,12 +624,19 @@ class AlgorithmData(np.ndarray):
         else:
             return index
 
+    # The number of list indexes that are kept in the columns cache
+    max_cached_cols_lists = 64
+
     def cols_idx(self, index: Union[List[Union[int, str]], FieldRolls]):
         """
         Method : cols_idx
 
         Decide which columns to include in the cols and __getitem__ method
 
+        The columns of a roll or a name are taken from lookup tables that are
+        built once (see cols_lookup). The results of the last max_cached_cols_lists
+        list indexes are kept in the same cache (the least recently used is removed)
+
         Args:
             index  : A representation of the columns to include
 
@@ -480,7 +646,7 @@ class AlgorithmData(np.ndarray):
         """
         # If the parameter is FieldRolls - return all the column numbers with that FieldRolls
         if isinstance(index, FieldRolls):
-            return np.where(self.header[RowNames.Roll.value] == index)[0].tolist()
+            return list(self.cols_lookup(RowNames.Roll).get(index, []))
 
         # If the parameter is int - return the parameter
         if isInt(index):
@@ -488,19 +654,34 @@ class AlgorithmData(np.ndarray):
 
         # If the parameter is string - return all the column numbers with that name
         if isinstance(index, str):
-            return np.where(self.header[RowNames.Names.value] == index)[0].tolist()
+            return list(self.cols_lookup(RowNames.Names).get(index, []))
 
         #  - sorted
         if isinstance(index, list):
+            cache = self.valid_cols_idx_cache().setdefault("lists", OrderedDict())
+            try:
+                key = tuple(index)
+                if key in cache:
+                    cache.move_to_end(key)
+                    return list(cache[key])
+            except TypeError:
+                key = None
+
             result = []
             for entry in index:
                 if isInt(entry):
                     result.append(entry)
                 elif isinstance(entry, str):
-                    result.extend(np.where(self.header[RowNames.Names.value] == entry)[0].tolist())
+                    result.extend(self.cols_lookup(RowNames.Names).get(entry, []))
                 else:
-                    result.extend(np.where(self.header[RowNames.Roll.value] == entry)[0].tolist())
-            return sorted(list(set(result)))
+                    result.extend(self.cols_lookup(RowNames.Roll).get(entry, []))
+            result = sorted(list(set(result)))
+
+            if key is not None:
+                cache[key] = result
+                if len(cache) > AlgorithmData.max_cached_cols_lists:
+                    cache.popitem(last=False)
+            return list(result)
 
         # If the index is slice return a list of the products of the slice
         if isinstance(index, slice):
@@ -508,6 +689,66 @@ class AlgorithmData(np.ndarray):
 
         raise IndexError("The column index type is not supported " + str(type(index)))
 
+    def cols_lookup(self, row_name: RowNames) -> dict:
+        """
+        Method : cols_lookup
+
+        Get a lookup table from the values of a header row to the columns holding them
+
+        The table is built on the first call and kept in cols_idx_cache until
+        the names or the rolls row is changed using __setitem__
+
+        Args:
+            row_name  : (RowNames) - The header row (RowNames.Names or RowNames.Roll)
+
+        Returns:
+            dict : value -> list of the indexes of the columns with the value
+        """
+        cache = self.valid_cols_idx_cache()
+        lookup = cache.get(row_name)
+        if lookup is None:
+            lookup = {}
+            codes = self.header[row_name.value]
+            for code in np.unique(codes):
+                lookup[self.decode_header_value(row_name, code)] = np.flatnonzero(codes == code).tolist()
+            cache[row_name] = lookup
+        return lookup
+
+    def valid_cols_idx_cache(self) -> dict:
+        """
+        Method : valid_cols_idx_cache
+
+        Get the columns cache after checking that it was built from the current header
+
+        The header rows can be shared with views (see cols_view) so the header
+        version is shared too. A cache that was built for an older version is cleared
+
+        Returns:
+            dict : The cache
+        """
+        if self.cols_idx_cache is None:
+            self.cols_idx_cache = {}
+        if self.header_version is None:
+            self.header_version = [0]
+
+        if self.cols_idx_cache.get("version") != self.header_version[0]:
+            self.cols_idx_cache.clear()
+            self.cols_idx_cache["version"] = self.header_version[0]
+        return self.cols_idx_cache
+
+    def clear_cols_idx_cache(self):
+        """
+        Method : clear_cols_idx_cache
+
+        Invalidate the columns lookup tables and the cached list indexes
+
+        The header version is increased so the caches of all the AlgorithmData
+        that share the header rows (views) are invalidated too
+        """
+        if self.header_version is None:
+            self.header_version = [0]
+        self.header_version[0] += 1
+
     def rows_idx(self, index):
         """
         Method : rows_idx
@@ -541,6 +782,81 @@ class AlgorithmData(np.ndarray):
 
         raise IndexError("The row index type is not supported " + str(type(index)))
 
+    @staticmethod
+    def is_data_index(index) -> bool:
+        """
+        Method : is_data_index
+
+        Check if a rows index refers only to the data section (no RowNames)
+
+        Args:
+            index  : A representation of the rows to include
+
+        Returns:
+            bool : True if the index can be used directly on the data buffer
+        """
+        if isinstance(index, list):
+            return not any(isinstance(entry, RowNames) for entry in index)
+        return isinstance(index, (int, np.integer, slice))
+
+    def get_data_items(self, rows_index, cols_index):
+        """
+        Method : get_data_items
+
+        Get items from the data section using one numpy indexing on the data buffer
+
+        The result has the same shape rules as getitems:
+        -#  One row and one column - the item
+        -#  One row - a vector with the types of the row
+        -#  One column or a matrix - a float vector or matrix
+
+        Args:
+            rows_index : The rows part of the index (int, slice or list of integers)
+            cols_index : The columns part of the index (any index supported by cols_idx)
+
+        Returns:
+            np.ndarray or the item
+        """
+        data = self.view(np.ndarray)
+
+        # Convert the rows index to a numpy selector
+        if isinstance(rows_index, slice):
+            rows_range = range(*rows_index.indices(self.shape[0]))
+            rows_sel = rows_range[0] if len(rows_range) == 1 else rows_index
+        elif isinstance(rows_index, list):
+            rows_range = sorted([entry for entry in rows_index if isInt(entry)])
+            rows_sel = rows_range[0] if len(rows_range) == 1 else np.array(rows_range, dtype=int)
+        else:
+            rows_range = [rows_index]
+            rows_sel = rows_index
+
+        # Convert the columns index to a numpy selector
+        if isinstance(cols_index, slice):
+            cols_range = range(*cols_index.indices(self.shape[1]))
+            cols_sel = cols_range[0] if len(cols_range) == 1 else cols_index
+        else:
+            cols_range = self.cols_idx(cols_index)
+            cols_sel = cols_range[0] if len(cols_range) == 1 else np.array(cols_range, dtype=int)
+
+        # Two lists has to be combined to get the cross product of the rows and columns
+        if isinstance(rows_sel, np.ndarray) and isinstance(cols_sel, np.ndarray):
+            result = data[np.ix_(rows_sel, cols_sel)]
+        else:
+            result = data[rows_sel, cols_sel]
+
+        # Only one item
+        if len(rows_range) == 1 and len(cols_range) == 1:
+            return result
+
+        # numpy basic indexing returns a view - the result should not share the data
+        if not (isinstance(rows_sel, np.ndarray) or isinstance(cols_sel, np.ndarray)):
+            result = result.copy()
+
+        # A row keeps the types of the fields, a column or a matrix is float
+        if len(rows_range) == 1:
+            return result
+        return result.astype(float, copy=False)
+
     def getitems(self, rows_idx, cols_idx):
         """
         Method : get the items specified by cols_idx and row_idx
@@ -615,10 +931,87 @@ class AlgorithmData(np.ndarray):
             The value 
         """
         if isinstance(row_idx, RowNames):
-            return self.header[row_idx.value][col_idx]
+            return self.decode_header_value(row_idx, self.header[row_idx.value][col_idx])
         else:
             return super(AlgorithmData, self).__getitem__((row_idx, col_idx))
 
+    def decode_header_value(self, row_name: RowNames, value):
+        """
+        Method : decode_header_value
+
+        Convert a value stored in the header to the value presented to the user
+
+        -#  Names row - the name from the names table
+        -#  Rolls, types and normalize methods rows - the enum
+        -#  Other rows - the value as it is
+
+        Args:
+            row_name : (RowNames) - The header row
+            value    : The value stored in the header
+
+        Returns:
+            The value
+        """
+        if row_name == RowNames.Names:
+            return self.names_table.names[value]
+        enum_class = AlgorithmData.header_enums.get(row_name)
+        if enum_class is not None:
+            return enum_class(int(value))
+        return value
+
+    def encode_header_value(self, row_name: RowNames, value):
+        """
+        Method : encode_header_value
+
+        Convert a value presented to the user to the value stored in the header
+        (The opposite of decode_header_value)
+
+        Args:
+            row_name : (RowNames) - The header row
+            value    : The value presented to the user
+
+        Returns:
+            The value to store in the header
+        """
+        if row_name == RowNames.Names:
+            return self.names_table.code(str(value))
+        if row_name in AlgorithmData.header_enums:
+            return value.value
+        return value
+
+    def header_row(self, row_name: RowNames) -> np.ndarray:
+        """
+        Method : header_row
+
+        Get a header row with the values presented to the user (names and enums)
+
+        Args:
+            row_name : (RowNames) - The header row
+
+        Returns:
+            np.ndarray : The row
+        """
+        codes = self.header[row_name.value]
+        if row_name == RowNames.Names:
+            return np.array([self.names_table.names[code] for code in codes])
+        if row_name in AlgorithmData.header_enums:
+            return np.array([self.decode_header_value(row_name, code) for code in codes], dtype=object)
+        return np.copy(codes)
+
+    def roll_mask(self, roll: FieldRolls) -> np.ndarray:
+        """
+        Method : roll_mask
+
+        Get a boolean vector that is True in the columns of the roll
+
+        Args:
+            roll : (FieldRolls) - The roll
+
+        Returns:
+            np.ndarray : The mask
+        """
+        return self.header[RowNames.Roll.value] == roll.value
+
     def cols(self, index):
         """
         Method : cols
@@ -648,13 +1041,14 @@ class AlgorithmData(np.ndarray):
         # Remove columns indexes that are not in the AlgorithmData
         index = sorted([index[idx] for idx in range(len(index)) if index[idx] < self.shape[1]])
 
-        header = [np.array([self.header[row][col] for col in index]) for row in range(len(self.header))]
+        header = [row[np.array(index, dtype=int)] for row in self.header]
 
         # Create the data
         data = np.zeros((self.shape[0], len(index)))
 
         # Create the AlgorithmData
-        algorithm_data = AlgorithmData(data, *header)
+        algorithm_data = AlgorithmData.from_header(data, header, self.names_table,
+                                                   self.categories[np.array(index, dtype=int)])
 
         # Fill the new algorithm data with values
         for row in range(self.shape[0]):
@@ -696,16 +1090,327 @@ class AlgorithmData(np.ndarray):
         data = np.zeros((len(index), self.shape[1]))
 
         # Create the AlgorithmData
-        algorithm_data = AlgorithmData(data, *header)
+        algorithm_data = AlgorithmData.from_header(data, header, self.names_table, np.copy(self.categories))
 
         # Fill the algorithm_data with values
         for row in range(len(index)):
             for col in range(self.shape[1]):
                 algorithm_data[row, col] = self[index[row], col]
 
+        # The label blocks follow the rows
+        algorithm_data.label_blocks = {roll: block[index] for roll, block in self.label_blocks.items()}
+
         # Return
         return algorithm_data
 
+    def labels(self, index=FieldRolls.StepResult) -> np.ndarray:
+        """
+        Method : labels
+
+        Get a column that holds group indexes (StepResult, ResultPresentation) as an int vector
+
+        In the typed layout (see ufunc.group_by_roll) the values are copied from the int block of the roll
+
+        Args:
+            index  : (FieldRolls or int) - The column (has to be one column)
+
+        Returns:
+            np.ndarray : int vector with the values of the column
+        """
+        if isinstance(index, FieldRolls) and index in self.label_blocks:
+            return self.label_blocks[index].astype(int)
+        col_idx = self.col_idx(index)
+        return self.view(np.ndarray)[:, col_idx].astype(int)
+
+    def set_labels(self, index, values):
+        """
+        Method : set_labels
+
+        Set a column that holds group indexes (StepResult, ResultPresentation)
+
+        In the typed layout (see ufunc.group_by_roll) the values are set to the int block of the roll
+
+        Args:
+            index  : (FieldRolls or int) - The column (has to be one column)
+            values : (np.ndarray or int) - The group indexes (a vector with an entry for each row or one value)
+        """
+        if isinstance(index, FieldRolls) and index in self.label_blocks:
+            self.label_blocks[index][:] = values
+        else:
+            self.view(np.ndarray)[:, self.col_idx(index)] = values
+
+    def has_categories(self, index) -> bool:
+        """
+        Method : has_categories
+
+        Check if there are one-of-N code columns in the columns specified by index
+
+        Args:
+            index  : A representation of the columns to include (see cols_idx)
+
+        Returns:
+            bool : True if one of the columns is a code column
+        """
+        if self.categories is None:
+            return False
+        return bool(np.any(self.categories[np.array(self.cols_idx(index), dtype=int)] > 0))
+
+    def sparse_cols(self, index) -> sparse.csr_matrix:
+        """
+        Method : sparse_cols
+
+        Returns the cols specified by index as a scipy.sparse matrix in which the
+        one-of-N code columns are expanded
+
+        -   The regular columns are first (in their order) and after them a block for each
+            code column with a column for each value
+        -   In the block of a code column the entry of the value holds MaxTarget - MinTarget
+            and the other entries are 0. This is the one-of-N encoding moved by MinTarget
+            so distances, averages of distances and PCA are the same as in the dense encoding
+
+        Args:
+            index  : A representation of the columns to include (see cols_idx)
+
+        Returns:
+            sparse.csr_matrix : The matrix
+        """
+        cols_idx = np.array(self.cols_idx(index), dtype=int)
+        data = self.view(np.ndarray)
+        rows_idx = np.arange(self.shape[0])
+        categories = self.categories if self.categories is not None else np.zeros(self.shape[1], dtype=np.int32)
+
+        # The regular columns
+        regular_cols = cols_idx[categories[cols_idx] == 0]
+        blocks = [sparse.csr_matrix(data[:, regular_cols].astype(float))]
+
+        # A block for each code column
+        for col_idx in cols_idx[categories[cols_idx] > 0]:
+            value = float(self.header[RowNames.MaxTarget.value][col_idx] - self.header[RowNames.MinTarget.value][col_idx])
+            codes = data[:, col_idx].astype(int)
+            blocks.append(sparse.csr_matrix((np.full(self.shape[0], value), (rows_idx, codes)),
+                                            shape=(self.shape[0], int(categories[col_idx]))))
+
+        return sparse.hstack(blocks, format="csr")
+
+    def cols_matrix(self, index, dtype=None, allow_sparse: bool=False):
+        """
+        Method : cols_matrix
+
+        Returns the cols specified by index as a matrix for calculations
+
+        -   If the columns are evenly spaced the result is a view of the data (not a copy)
+        -   If allow_sparse is True and there are one-of-N code columns the result is a
+            scipy.sparse matrix (see sparse_cols)
+
+        Args:
+            index           : A representation of the columns to include (see cols_idx)
+            dtype           : (numpy type) - The type of the matrix (None keeps the type of the data)
+            allow_sparse    : (bool) - Whether a sparse matrix can be returned
+
+        Returns:
+            np.ndarray or sparse.csr_matrix : The matrix
+        """
+        if allow_sparse and self.has_categories(index):
+            return self.sparse_cols(index)
+        cols_slice = self.cols_slice(index)
+        if cols_slice is None:
+            cols_slice = self.cols_idx(index)
+        matrix = self.view(np.ndarray)[:, cols_slice]
+        if dtype is not None:
+            matrix = matrix.astype(dtype, copy=False)
+        return matrix
+
+    def cols_slice(self, index):
+        """
+        Method : cols_slice
+
+        Get a slice that selects the columns specified by index
+
+        A slice exists if the columns are evenly spaced (for example all the columns
+        of a roll after ufunc.group_by_roll)
+
+        Args:
+            index  : A representation of the columns to include (see cols_idx)
+
+        Returns:
+            slice or None : The slice or None if the columns cannot be selected by a slice
+        """
+        if isinstance(index, slice):
+            return index
+
+        cols_idx = [int(idx) % self.shape[1] for idx in self.cols_idx(index)]
+        if len(cols_idx) == 0:
+            return slice(0, 0)
+        if len(cols_idx) == 1:
+            return slice(cols_idx[0], cols_idx[0] + 1)
+
+        step = cols_idx[1] - cols_idx[0]
+        if step <= 0 or cols_idx != list(range(cols_idx[0], cols_idx[-1] + 1, step)):
+            return None
+        return slice(cols_idx[0], cols_idx[-1] + 1, step)
+
+    def cols_view(self, index):
+        """
+        Method : cols_view
+
+        Returns cols specified by index, name, roll without copying the data
+
+        -   The data of the result is a (strided) numpy view of the data of self
+        -   The header rows of the result are views of the header rows of self
+        -   Changes in the result (data or header) are changes in self
+
+        Note:
+            The columns have to be evenly spaced. In order to get a view of a roll
+            that is spread over the AlgorithmData use ufunc.group_by_roll first
+
+        Args:
+            index  : A representation of the columns to include (see cols_idx)
+
+        Returns:
+            AlgorithmData : The view
+
+        Raises:
+            IndexError : If the columns cannot be selected by a slice
+        """
+        cols_slice = self.cols_slice(index)
+        if cols_slice is None:
+            raise IndexError("The columns " + str(self.cols_idx(index)) +
+                             " are not evenly spaced and cannot be viewed (use cols to copy them)")
+
+        algorithm_data = super(AlgorithmData, self).__getitem__((slice(None), cols_slice))
+        algorithm_data.header = [row[cols_slice] for row in self.header]
+        algorithm_data.categories = self.categories[cols_slice]
+        algorithm_data.cols_idx_cache = {}
+        return self.share_attributes(algorithm_data)
+
+    def rows_view(self, index: slice):
+        """
+        Method : rows_view
+
+        Returns rows specified by a slice without copying the data
+
+        The result shares the data and the header with self
+
+        Args:
+            index  : (slice or int) - The rows to include
+
+        Returns:
+            AlgorithmData : The view
+
+        Raises:
+            IndexError : If the index is not a slice or int
+        """
+        if isInt(index) and not isinstance(index, str):
+            index = int(index) % self.shape[0]
+            index = slice(index, index + 1)
+        if not isinstance(index, slice):
+            raise IndexError("Only slice can be used for rows view " + str(type(index)))
+
+        algorithm_data = super(AlgorithmData, self).__getitem__((index, slice(None)))
+        return self.share_attributes(algorithm_data, index)
+
+    def share_attributes(self, algorithm_data, rows_index=slice(None)):
+        """
+        Method : share_attributes
+
+        Set the attributes that are not part of the header to a view of self
+
+        Args:
+            algorithm_data   : (AlgorithmData) - The view
+            rows_index       : (slice or list of integers) - The rows of self in the view
+
+        Returns:
+            AlgorithmData : The view
+        """
+        algorithm_data.header_version = self.header_version
+        algorithm_data.label_blocks = {roll: block[rows_index] for roll, block in self.label_blocks.items()}
+        algorithm_data.evaluations = getattr(self, 'evaluations', [])
+        if hasattr(self, 'resultValues'):
+            algorithm_data.resultValues = self.resultValues
+        return algorithm_data
+
+    # The version of the files format of save and load
+    file_format_version = 1
+
+    def save(self, directory: str):
+        """
+        Method : save
+
+        Save the AlgorithmData to a directory
+
+        The directory holds:
+        -#  data.npy - The data block
+        -#  header_<row>.npy - The encoded header rows (see RowNames)
+        -#  categories.npy - The categories of the columns
+        -#  labels_<roll>.npy - The int blocks of the typed layout (see ufunc.group_by_roll)
+        -#  manifest.json - The names table, the result values and the evaluations
+
+        Args:
+            directory   : (str) - The directory (created if it does not exist)
+        """
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, "data.npy"), self.view(np.ndarray), allow_pickle=False)
+        for row_name in RowNames:
+            row = np.asarray(self.header[row_name.value])
+            if row.dtype == object:
+                row = row.astype(float)
+            np.save(os.path.join(directory, "header_" + row_name.name + ".npy"), row, allow_pickle=False)
+        np.save(os.path.join(directory, "categories.npy"), self.categories, allow_pickle=False)
+        for roll, block in self.label_blocks.items():
+            np.save(os.path.join(directory, "labels_" + roll.name + ".npy"), block, allow_pickle=False)
+
+        # The manifest is written last so a directory with a manifest is complete
+        manifest = {"version": AlgorithmData.file_format_version,
+                    "names": self.names_table.names,
+                    "evaluations": getattr(self, 'evaluations', []),
+                    "labels": [roll.name for roll in self.label_blocks.keys()]}
+        if hasattr(self, 'resultValues'):
+            manifest["resultValues"] = self.resultValues
+        with open(os.path.join(directory, "manifest.json"), "w") as f:
+            json.dump(manifest, f, default=lambda value: value.item())
+
+    @staticmethod
+    def load(directory: str, mmap_mode: str="c"):
+        """
+        Method : load
+
+        Load an AlgorithmData that was saved with the save method
+
+        The data block is opened with a memory map so it is not read to the memory
+        (the default mode "c" is copy on write - changes are not written to the file)
+
+        Args:
+            directory   : (str) - The directory
+            mmap_mode   : (str) - The mode of the memory map ("r", "r+", "c" or None to read to the memory)
+
+        Returns:
+            AlgorithmData : The loaded AlgorithmData
+
+        Raises:
+            ValueError : If the directory was saved in an unknown format version
+        """
+        with open(os.path.join(directory, "manifest.json"), "r") as f:
+            manifest = json.load(f)
+        if manifest["version"] != AlgorithmData.file_format_version:
+            raise ValueError("Unknown AlgorithmData file format version " + str(manifest["version"]))
+
+        names_table = NamesTable()
+        for name in manifest["names"]:
+            names_table.code(name)
+        header = [np.load(os.path.join(directory, "header_" + row_name.name + ".npy"), allow_pickle=False)
+                  for row_name in RowNames]
+        categories = np.load(os.path.join(directory, "categories.npy"), allow_pickle=False)
+        data = np.load(os.path.join(directory, "data.npy"), mmap_mode=mmap_mode, allow_pickle=False)
+
+        algorithm_data = AlgorithmData.from_header(data, header, names_table, categories)
+        algorithm_data.evaluations = manifest["evaluations"]
+        if "resultValues" in manifest:
+            algorithm_data.resultValues = manifest["resultValues"]
+        algorithm_data.label_blocks = {
+            FieldRolls[name]: np.load(os.path.join(directory, "labels_" + name + ".npy"), allow_pickle=False)
+            for name in manifest.get("labels", [])}
+        return algorithm_data
+
 
 class AlgorithmDataRowInterface(object):
     """
@@ -948,16 +1653,19 @@ class ufunc(object):
         args = [arg.algorithm_data if isinstance(arg, AlgorithmDataInterface) else arg for arg in args]
 
         # Create a new header by concatenating all the headers of the args
-        # horizontally
-        header = []
-        for idx in range(len(args[0].header)):
+        # horizontally (the names codes are converted to the codes of one table)
+        names_table = NamesTable()
+        header = [np.concatenate([names_table.translate(arg.names_table, arg.header[RowNames.Names.value])
+                                  for arg in args], 0)]
+        for idx in range(1, len(args[0].header)):
             header.append(np.concatenate([arg.header[idx] for arg in args], 0))
+        categories = np.concatenate([arg.categories for arg in args], 0)
 
         # Create the data by concatenating all the data
-        data = np.concatenate(args, 1)
+        data = np.concatenate([arg.view(np.ndarray) for arg in args], 1)
 
         # Create the result - AlgorithmData
-        result = AlgorithmData(data, *header)
+        result = AlgorithmData.from_header(data, header, names_table, categories)
 
         if returnInterface:
             return AlgorithmDataInterface(result)
@@ -965,7 +1673,62 @@ class ufunc(object):
             return result
 
     @staticmethod
-    def parameters_reduction(algorithm_data: AlgorithmData):
+    def group_by_roll(algorithm_data: AlgorithmData, dtype=None) -> AlgorithmData:
+        """
+        Method : group_by_roll
+
+        Reorder the columns so that the columns of each roll are contiguous
+
+        The rolls are ordered by the FieldRolls values and inside a roll the
+        original order of the columns is kept. After the reordering the columns
+        of a roll can be accessed with AlgorithmData.cols_view
+
+        The data can also be converted to a float type (np.float64 or np.float32)
+        In this layout the access to the data never checks the types of the values.
+        The group index columns (StepResult, ResultPresentation) are moved from the data
+        to int blocks (the smallest int type that holds the groups) and they are accessed
+        with AlgorithmData.labels and AlgorithmData.set_labels
+
+        Args:
+            algorithm_data   (AlgorithmData) : The algorithm data to reorder
+            dtype            (numpy float type) : The type of the data (None keeps the current type)
+
+        Returns:
+            AlgorithmData : A new AlgorithmData with the columns reordered
+        """
+        # If the parameter is AlgorithmDataInterface change it to AlgorithmData
+        if isinstance(algorithm_data, AlgorithmDataInterface):
+            algorithm_data = algorithm_data.algorithm_data
+
+        order = np.argsort(algorithm_data.header[RowNames.Roll.value], kind="stable")
+
+        # In the typed layout the group index rolls with one column are stored in int blocks
+        label_blocks = {roll: np.copy(block) for roll, block in algorithm_data.label_blocks.items()}
+        if dtype is not None:
+            num_groups = len(getattr(algorithm_data, 'resultValues', []))
+            for roll in (FieldRolls.StepResult, FieldRolls.ResultPresentation):
+                cols_idx = algorithm_data.cols_idx(roll)
+                if len(cols_idx) != 1:
+                    continue
+                column = algorithm_data.view(np.ndarray)[:, cols_idx[0]]
+                largest = max(num_groups, int(np.max(np.abs(column))) if column.shape[0] > 0 else 0)
+                label_dtype = np.promote_types(np.int8, np.min_scalar_type(-largest - 1))
+                label_blocks[roll] = column.astype(label_dtype)
+                order = order[order != cols_idx[0]]
+
+        header = [row[order] for row in algorithm_data.header]
+        data = algorithm_data.view(np.ndarray)[:, order]
+        if dtype is not None:
+            data = data.astype(dtype, copy=False)
+        result = AlgorithmData.from_header(data, header, algorithm_data.names_table, algorithm_data.categories[order])
+        result.label_blocks = label_blocks
+        result.evaluations = algorithm_data.evaluations
+        if hasattr(algorithm_data, 'resultValues'):
+            result.resultValues = algorithm_data.resultValues
+        return result
+
+    @staticmethod
+    def parameters_reduction(algorithm_data: AlgorithmData, chunk_size: int=None):
         """
         Method : parameters_reduction
 
@@ -974,8 +1737,13 @@ class ufunc(object):
         The parameters reduction is done from the FieldRoll.Parameters
         to the FieldRoll.Parameters Reduction columns
 
+        If chunk_size is given the reduction is done with IncrementalPCA on chunks of rows
+        (so only a chunk of the parameters is in the memory at a time). The IncrementalPCA
+        result is an approximation of the PCA result
+
         Args:
             algorithm_data   (AlgorithmData) : The algorithm data to perform the parameters reduction in
+            chunk_size      (int) : The number of rows in a chunk (None - all the rows at once)
         """
         # If the parameter is AlgorithmDataInterface change it to AlgorithmData
         if isinstance(algorithm_data, AlgorithmDataInterface):
@@ -986,17 +1754,64 @@ class ufunc(object):
         if len(indexes) == 0:
             return
 
+        if chunk_size is not None:
+            ufunc.chunked_parameters_reduction(algorithm_data, indexes, chunk_size)
+            return
+
         # Get the parameters columns
-        parameters = algorithm_data[:, FieldRolls.Parameter]
+        # If there are one-of-N code columns the parameters are a sparse matrix
+        # (PCA supports sparse matrixes with the arpack solver)
+        if algorithm_data.has_categories(FieldRolls.Parameter):
+            parameters = algorithm_data.sparse_cols(FieldRolls.Parameter)
+            pca = PCA(n_components=len(indexes), svd_solver="arpack")
+        else:
+            parameters = algorithm_data[:, FieldRolls.Parameter]
+            pca = PCA(n_components=len(indexes))
 
         # Perform the parameters reduction
-        pca = PCA(n_components=len(indexes))
         parameters_reduction = pca.fit(parameters).transform(parameters)
 
         # Copy the parameters reduction result to the algorithm data
         ufunc.copy_to(algorithm_data, parameters_reduction, [row_idx for row_idx in range(algorithm_data.shape[0])], indexes)
         
 
+    @staticmethod
+    def chunked_parameters_reduction(algorithm_data: AlgorithmData, indexes: List[int], chunk_size: int):
+        """
+        Method : chunked_parameters_reduction
+
+        Perform parameters reduction with IncrementalPCA on chunks of rows
+
+        -#  Fit the IncrementalPCA with each chunk
+        -#  Transform each chunk and copy the result to the parameters reduction columns
+
+        Args:
+            algorithm_data   (AlgorithmData) : The algorithm data to perform the parameters reduction in
+            indexes         (List[int]) : The parameters reduction columns
+            chunk_size      (int) : The number of rows in a chunk
+        """
+        # Each chunk has to have at least the number of components rows
+        # so a small last chunk is joined to the chunk before it
+        chunk_size = max(chunk_size, len(indexes))
+        starts = list(range(0, algorithm_data.shape[0], chunk_size))
+        if len(starts) > 1 and algorithm_data.shape[0] - starts[-1] < len(indexes):
+            starts.pop()
+        ends = starts[1:] + [algorithm_data.shape[0]]
+
+        def parameters(start, end):
+            chunk = algorithm_data.rows_view(slice(start, end))
+            if chunk.has_categories(FieldRolls.Parameter):
+                return chunk.sparse_cols(FieldRolls.Parameter).toarray()
+            return chunk.view(np.ndarray)[:, chunk.cols_idx(FieldRolls.Parameter)]
+
+        pca = IncrementalPCA(n_components=len(indexes))
+        for start, end in zip(starts, ends):
+            pca.partial_fit(parameters(start, end))
+
+        data = algorithm_data.view(np.ndarray)
+        for start, end in zip(starts, ends):
+            data[start:end, indexes] = pca.transform(parameters(start, end))
+
     @staticmethod
     def to_ndarray(algorithm_data: AlgorithmData):
         """
@@ -4,6 +4,8 @@ import os
 import os
 DATA_PATH = "C:\ArtificialIntelligence\ArtificialIntelligence\Python\data"
 ALGORITHM_DATA_PATH = os.path.join(os.path.dirname(__file__),"..", "Algorithm Data")
+NORMALIZE_CACHE_PATH = os.path.join(os.path.dirname(__file__),"..", "Normalize Cache")
+NORMALIZE_MODELS_PATH = os.path.join(os.path.dirname(__file__),"..", "Normalize Models")
 PROJECT_PATH = os.path.dirname(__file__)
 print("****", os.path.dirname(os.path.abspath(__file__)))
 for dirname, dirnames, filenames in os.walk(os.path.dirname(os.path.abspath(__file__))):
@@ -50,7 +50,17 @@ class AlgorithmDataInterfaceTest(TestBase):
         self.addTest(self.check_cols_mixed_indexes_and_names)
         self.addTest(self.check_cols_one_roll)
         self.addTest(self.check_cols_some_roll)
+        self.addTest(self.check_cols_roll_after_roll_change)
+        self.addTest(self.check_cols_list_cache_is_bounded)
         self.addTest(self.check_rows)
+        self.addTest("Check views")
+        self.addTest(self.check_cols_view_roll)
+        self.addTest(self.check_cols_view_not_evenly_spaced)
+        self.addTest(self.check_cols_matrix)
+        self.addTest("Check typed layout")
+        self.addTest(self.check_group_by_roll_typed_layout)
+        self.addTest("Check compact header")
+        self.addTest(self.check_hstack_header_codes)
 
     def initConstants(self):
         self.dataRowsCount = 10
@@ -489,6 +499,41 @@ class AlgorithmDataInterfaceTest(TestBase):
         algorithmDataInterface = algorithmDataInterface.cols(colsToIncludePrm)
         return self.compareMatrix(regularMatrix, algorithmDataInterface, "check_cols_one_roll")
 
+    def check_cols_roll_after_roll_change(self):
+        self.initConstants()
+        regularMatrix = self.createDefaultRegularMatrix()
+        algorithmDataInterface = self.createDefaultAlgorithmData()
+
+        # Retrieve the roll once so the columns of the rolls are cached
+        algorithmDataInterface.cols(FieldRolls.ParameterReduction)
+
+        colsToInclude = [2, 4]
+        colsToIncludePrm = FieldRolls.ParameterReduction
+        for col_idx in colsToInclude:
+            regularMatrix[RowNames.Roll.value][col_idx] = FieldRolls.ParameterReduction
+            algorithmDataInterface[RowNames.Roll.value][col_idx] = FieldRolls.ParameterReduction
+
+        regularMatrix = self.extractCols(regularMatrix, colsToInclude)
+        algorithmDataInterface = algorithmDataInterface.cols(colsToIncludePrm)
+        return self.compareMatrix(regularMatrix, algorithmDataInterface, "check_cols_roll_after_roll_change")
+
+    def check_cols_list_cache_is_bounded(self):
+        self.initConstants()
+        algorithm_data = self.createDefaultAlgorithmData().algorithm_data
+
+        # Index with more different lists than the cache can hold
+        for idx in range(AlgorithmData.max_cached_cols_lists * 2):
+            cols_idx = algorithm_data.cols_idx([FieldRolls.Parameter, idx])
+            if cols_idx != sorted(set(range(self.dataColCount)) | {idx}):
+                return self.createFailedResult("check_cols_list_cache_is_bounded",
+                                               "The columns of the index " + str(idx) + " are " + str(cols_idx))
+
+        num_cached = len(algorithm_data.valid_cols_idx_cache()["lists"])
+        if num_cached > AlgorithmData.max_cached_cols_lists:
+            return self.createFailedResult("check_cols_list_cache_is_bounded",
+                                           str(num_cached) + " lists are cached")
+        return self.createOKResult("check_cols_list_cache_is_bounded", "")
+
     def check_rows(self):
         self.initConstants()
         regularMatrix = self.createDefaultRegularMatrix()
@@ -498,3 +543,119 @@ class AlgorithmDataInterfaceTest(TestBase):
         regularMatrix = self.extractRows(regularMatrix, rowsToInclude)
         algorithmDataInterface = algorithmDataInterface.rows(rowsToInclude)
         return self.compareMatrix(regularMatrix, algorithmDataInterface, "check_rows")
+
+    def check_cols_view_roll(self):
+        self.initConstants()
+        regularMatrix = self.createDefaultRegularMatrix()
+        algorithmDataInterface = self.createDefaultAlgorithmData()
+
+        colsToInclude = [3, 4, 5]
+        for col_idx in colsToInclude:
+            regularMatrix[RowNames.Roll.value][col_idx] = FieldRolls.ParameterReduction
+            algorithmDataInterface[RowNames.Roll.value][col_idx] = FieldRolls.ParameterReduction
+
+        # Changes in the view are changes in the AlgorithmData
+        view = algorithmDataInterface.algorithm_data.cols_view(FieldRolls.ParameterReduction)
+        view[1, 0] = 1000
+        view[RowNames.Names, 2] = "A Name"
+        regularMatrix[RowNames.Max.value + 2][3] = 1000
+        regularMatrix[RowNames.Names.value][5] = "A Name"
+        return self.compareMatrix(regularMatrix, algorithmDataInterface, "check_cols_view_roll")
+
+    def check_cols_view_not_evenly_spaced(self):
+        try:
+            self.initConstants()
+            algorithmDataInterface = self.createDefaultAlgorithmData()
+            algorithmDataInterface.algorithm_data.cols_view([1, 2, 5])
+            return self.createFailedResult("check_cols_view_not_evenly_spaced", "Should have raised exception")
+        except IndexError as e:
+            return self.createOKResult("check_cols_view_not_evenly_spaced", " The exception is : " + str(e))
+
+    def check_cols_matrix(self):
+        self.initConstants()
+        algorithm_data = self.createDefaultAlgorithmData().algorithm_data
+        algorithm_data[RowNames.Roll, 3] = FieldRolls.StepResult
+        algorithm_data[RowNames.Roll, 5] = FieldRolls.ParameterReduction
+        algorithm_data[RowNames.Roll, 7] = FieldRolls.ParameterReduction
+        data = algorithm_data.view(np.ndarray)
+
+        # Evenly spaced columns are a view of the data
+        matrix = algorithm_data.cols_matrix(FieldRolls.ParameterReduction)
+        if not np.shares_memory(matrix, data) or not np.array_equal(matrix, data[:, [5, 7]]):
+            return self.createFailedResult("check_cols_matrix", "The evenly spaced columns are not a view")
+
+        # Other columns are copied
+        matrix = algorithm_data.cols_matrix(FieldRolls.Parameter, float)
+        expected_cols = [col_idx for col_idx in range(algorithm_data.shape[1]) if col_idx not in (3, 5, 7)]
+        if matrix.dtype != float or np.shares_memory(matrix, data) or \
+                not np.array_equal(matrix, data[:, expected_cols]):
+            return self.createFailedResult("check_cols_matrix", "The parameters are " + str(matrix))
+        return self.createOKResult("check_cols_matrix", "")
+
+    def check_group_by_roll_typed_layout(self):
+        self.initConstants()
+        algorithmDataInterface = self.createDefaultAlgorithmData()
+        algorithmDataInterface[RowNames.Roll.value][2] = FieldRolls.StepResult
+        algorithmDataInterface[RowNames.Roll.value][4] = FieldRolls.ParameterReduction
+
+        algorithm_data = ufunc.group_by_roll(algorithmDataInterface.algorithm_data, np.float32)
+        if algorithm_data.dtype != np.float32:
+            return self.createFailedResult("check_group_by_roll_typed_layout",
+                                           "The type is " + str(algorithm_data.dtype) + " instead of float32")
+
+        # The rolls are ordered by their values
+        rolls = [roll.value for roll in algorithm_data.header_row(RowNames.Roll)]
+        if rolls != sorted(rolls):
+            return self.createFailedResult("check_group_by_roll_typed_layout",
+                                           "The rolls are not grouped " + str(rolls))
+
+        # The StepResult column is moved to an int block and it holds the values of the second data column
+        if algorithm_data.shape[1] != algorithmDataInterface.algorithm_data.shape[1] - 1 or \
+                algorithm_data.label_blocks[FieldRolls.StepResult].dtype.kind != "i":
+            return self.createFailedResult("check_group_by_roll_typed_layout",
+                                           "The StepResult column is not stored in an int block")
+        labels = algorithm_data.labels(FieldRolls.StepResult)
+        expected = np.array([row_idx for row_idx in range(self.dataRowsCount)])
+        if labels.dtype.kind != "i" or not np.array_equal(labels, expected):
+            return self.createFailedResult("check_group_by_roll_typed_layout",
+                                           "The labels are " + str(labels) + " instead of " + str(expected))
+
+        # The labels are set to the int block and the rows view shares the block
+        algorithm_data.rows_view(slice(2, 4)).set_labels(FieldRolls.StepResult, -1)
+        expected[2:4] = -1
+        labels = algorithm_data.labels(FieldRolls.StepResult)
+        if not np.array_equal(labels, expected):
+            return self.createFailedResult("check_group_by_roll_typed_layout",
+                                           "The labels after set_labels are " + str(labels) + " instead of " +
+                                           str(expected))
+        return self.createOKResult("check_group_by_roll_typed_layout", "")
+
+    def check_hstack_header_codes(self):
+        self.initConstants()
+        algorithmDataInterface1 = self.createDefaultAlgorithmData()
+        algorithmDataInterface2 = self.createDefaultAlgorithmData()
+        algorithmDataInterface2[RowNames.Names.value][1] = "Other Name"
+        algorithmDataInterface2[RowNames.Roll.value][1] = FieldRolls.Result
+
+        algorithm_data = ufunc.hstack([algorithmDataInterface1, algorithmDataInterface2])
+
+        # The header rows hold codes
+        if algorithm_data.header[RowNames.Roll.value].dtype != np.int8:
+            return self.createFailedResult("check_hstack_header_codes",
+                                           "The rolls row type is " + str(algorithm_data.header[RowNames.Roll.value].dtype))
+
+        # The names and the enums are presented to the user
+        if algorithm_data[RowNames.Names, self.dataColCount] != "Other Name" or \
+                algorithm_data[RowNames.Roll, self.dataColCount] != FieldRolls.Result:
+            return self.createFailedResult("check_hstack_header_codes", "The header of the second AlgorithmData is " +
+                                           str(algorithm_data[RowNames.Names, self.dataColCount]) + " " +
+                                           str(algorithm_data[RowNames.Roll, self.dataColCount]))
+
+        # The names of the 2 AlgorithmData are in one table
+        cols_idx = algorithm_data.cols_idx("Name")
+        if len(cols_idx) != 2 * self.dataColCount - 1:
+            return self.createFailedResult("check_hstack_header_codes",
+                                           "The number of columns with Name is " + str(len(cols_idx)))
+        if not np.array_equal(np.flatnonzero(algorithm_data.roll_mask(FieldRolls.Result)), [self.dataColCount]):
+            return self.createFailedResult("check_hstack_header_codes", "The roll mask is wrong")
+        return self.createOKResult("check_hstack_header_codes", "")
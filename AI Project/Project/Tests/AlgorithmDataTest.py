@@ -1,6 +1,7 @@
 # Python Imports
 import sys
 import os
+import tempfile
 
 # Third party imports
 import numpy as np
@@ -93,6 +94,11 @@ class AlgorithmDataTest(TestBase):
         self.addTest(self.check_slice_start_stop_step_slice_start)
         self.addTest(self.check_slice_start_stop_step_slice_start_stop)
         self.addTest(self.check_slice_start_stop_step_slice_start_stop_step)
+        self.addTest("Check __getitem__ data section results")
+        self.addTest(self.check_data_slice_is_copy)
+        self.addTest(self.check_data_roll_column)
+        self.addTest("Check save and load")
+        self.addTest(self.check_save_load)
 
     def initTestData(self):
         self.dataRowsCount = 10
@@ -1115,3 +1121,54 @@ class AlgorithmDataTest(TestBase):
         else:
             return self.createFailedResult("check_slice_start_stop_step_slice_start_stop_step",
                                            "The arrays are not equal")
+
+    # algorithm_data[start:stop,start:stop] does not share the data
+    def check_data_slice_is_copy(self):
+        regularMatrix = self.createRegularMatrix()
+        algorithm_data = self.createAlgorithmData(regularMatrix)
+        algorithmDataSlice = algorithm_data[2:5, 1:4]
+        algorithmDataSlice[0, 0] = -1
+        if algorithm_data[2, 1] == regularMatrix[len(algorithm_data.header) + 2][1]:
+            return self.createOKResult("check_data_slice_is_copy")
+        else:
+            return self.createFailedResult("check_data_slice_is_copy", "The data was changed through the result")
+
+    # algorithm_data[[int,int...],FieldRolls]
+    def check_data_roll_column(self):
+        regularMatrix = self.createRegularMatrix()
+        algorithm_data = self.createAlgorithmData(regularMatrix)
+        cols_idx = [
+            idx for idx in range(len(regularMatrix[RowNames.Roll.value]))
+            if regularMatrix[RowNames.Roll.value][idx] == FieldRolls.Result
+        ]
+        rows_idx = [7, 1, 4]
+        regularMatrixCols = [[regularMatrix[len(algorithm_data.header) + row_idx][col_idx] for col_idx in cols_idx]
+                             for row_idx in sorted(rows_idx)]
+        algorithmDataCols = algorithm_data[rows_idx, FieldRolls.Result]
+        if np.array_equal(np.array(regularMatrixCols).flatten(), algorithmDataCols.flatten()):
+            return self.createOKResult("check_data_roll_column")
+        else:
+            return self.createFailedResult("check_data_roll_column", "The arrays are not equal")
+
+    # AlgorithmData.save and AlgorithmData.load
+    def check_save_load(self):
+        regularMatrix = self.createRegularMatrix()
+        algorithm_data = self.createAlgorithmData(regularMatrix)
+        algorithm_data.evaluations = [1.5, 0.5]
+        algorithm_data.resultValues = ["a", "b"]
+        with tempfile.TemporaryDirectory() as directory:
+            algorithm_data.save(directory)
+            loaded = AlgorithmData.load(directory)
+            if not isinstance(loaded.base, np.memmap):
+                return self.createFailedResult("check_save_load", "The data is not a memory map")
+            if not np.array_equal(loaded[:, :], algorithm_data[:, :]):
+                return self.createFailedResult("check_save_load", "The data is not equal")
+            for row_name in RowNames:
+                if not np.array_equal(loaded.header_row(row_name), algorithm_data.header_row(row_name)):
+                    return self.createFailedResult("check_save_load", "The header row " + row_name.name +
+                                                   " is not equal")
+            if loaded.evaluations != [1.5, 0.5] or loaded.resultValues != ["a", "b"]:
+                return self.createFailedResult("check_save_load", "The evaluations or the result values are " +
+                                               str(loaded.evaluations) + " " + str(loaded.resultValues))
+            del loaded
+        return self.createOKResult("check_save_load")
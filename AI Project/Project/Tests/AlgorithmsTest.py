@@ -0,0 +1,298 @@
+# Python Imports
+
+# Thired party imports
+import numpy as np
+
+# PyQt imports
+
+# My imports
+from ..Tests.TestBase import TestBase
+from ..AI.Chapter2Normalize import Normalize, NormalizeData
+from ..AI.Algorithms.KMeansClustering import KMeansClustering
+from ..AI.Algorithms.HamerlyKMeansClustering import HamerlyKMeansClustering
+from ..AI.Algorithms.MiniBatchKMeansClustering import MiniBatchKMeansClustering
+from ..AI.Algorithms.RBFNetwork import RBFNetwork
+from ..AI.Algorithms.BaseAlgorithm import BaseAlgorithm
+from ..AI.Chapter3DistanceMetrics import DistanceMetrics
+from ..Infrastructure.Enums import FieldRolls, FieldsTypes, NormalizeMethod
+
+
+class AlgorithmsTest(TestBase):
+    """description of class"""
+
+    def __init__(self, parentWindow):
+        super(AlgorithmsTest, self).__init__(parentWindow)
+        self.addTest("Check KMeans clustering")
+        self.addTest(self.check_kmeans_empty_groups)
+        self.addTest(self.check_hamerly_kmeans)
+        self.addTest(self.check_mini_batch_rows)
+        self.addTest(self.check_mini_batch_kmeans)
+        self.addTest(self.check_plus_plus_centroids)
+        self.addTest(self.check_kmeans_restarts)
+        self.addTest(self.check_kmeans_restarts_processes)
+        self.addTest("Check RBF network")
+        self.addTest(self.check_rbf_step)
+        self.addTest(self.check_rbf_gradients)
+        self.addTest(self.check_rbf_population_step)
+
+    @staticmethod
+    def createAlgorithmData(rowsCount=150, seed=0):
+        """
+        Create a normalized AlgorithmData with 3 groups of observations (4 parameters around a center of each group)
+        """
+        randomState = np.random.RandomState(seed)
+        centers = np.array([[5.0, 3.4, 1.5, 0.2], [5.9, 2.8, 4.3, 1.3], [6.6, 3.0, 5.5, 2.0]])
+        groups = np.arange(rowsCount) % centers.shape[0]
+        values = centers[groups] + randomState.randn(rowsCount, centers.shape[1]) * 0.3
+        names = ["P" + str(idx) for idx in range(centers.shape[1])]
+        inputMatrix = np.array([names + ["Class", "Step", "Presentation"]] +
+                               [["%.2f" % value for value in row] + ["G" + str(group), "0", "0"]
+                                for row, group in zip(values, groups)])
+
+        normalizeData = []
+        for idx, name in enumerate(names):
+            prmData = NormalizeData(idx, name)
+            prmData["min"] = float(values[:, idx].min())
+            prmData["max"] = float(values[:, idx].max())
+            normalizeData.append(prmData)
+        classData = NormalizeData(len(names), "Class")
+        classData["fieldType"] = FieldsTypes.NominalData
+        classData["normalizeMethod"] = NormalizeMethod.OneOfN
+        classData["roll"] = FieldRolls.Result
+        classData["valuesOrder"] = ["G" + str(group) for group in range(centers.shape[0])]
+        stepData = NormalizeData(len(names) + 1, "Step")
+        stepData["roll"] = FieldRolls.StepResult
+        presentationData = NormalizeData(len(names) + 2, "Presentation")
+        presentationData["roll"] = FieldRolls.ResultPresentation
+        return Normalize(inputMatrix, normalizeData + [classData, stepData, presentationData]).normalize()
+
+    @staticmethod
+    def createParameters(values):
+        return {name: {"value": value} for name, value in values.items()}
+
+    def runClustering(self, algorithmClass, algorithm_data, values, seed=0):
+        """
+        Run a clustering algorithm from a numpy seed until it finishes (returns the algorithm and the number of steps)
+        """
+        algorithm = algorithmClass(self.createParameters(values), algorithm_data)
+        np.random.seed(seed)
+        algorithm.init()
+        for steps in range(1, KMeansClustering.max_restart_steps + 1):
+            algorithm.step(algorithm_data)
+            if algorithm.finished(0)[2]:
+                break
+        return algorithm, steps
+
+    def createRBFNetwork(self, algorithm_data, seed=0):
+        """
+        Create an RBFNetwork with random long term memory
+        """
+        randomState = np.random.RandomState(seed)
+        network = RBFNetwork(self.createParameters({"Number of networks": len(algorithm_data.resultValues)}),
+                             algorithm_data)
+        for key in network.ltm.keys():
+            network.ltm[key] = randomState.rand(*network.ltm[key].shape)
+        return network
+
+    def check_kmeans_empty_groups(self):
+        parameters = np.array([[0.0, 0.0], [1.0, 0.0], [0.0, 1.0], [4.0, 4.0]])
+        groups = np.array([0, 0, 0, 0])
+        centroids = np.zeros((3, 2))
+        evaluation, members_dist = KMeansClustering.update_centroids(parameters, groups, centroids, 3)
+
+        # The group with members is the avarage and the empty groups are moved to the farthest observations
+        expected = np.array([[1.25, 1.25], [4.0, 4.0], [0.0, 0.0]])
+        if not np.all(np.isfinite(centroids)) or not np.allclose(centroids, expected):
+            return self.createFailedResult("check_kmeans_empty_groups", " The centroids are " + str(centroids) +
+                                           " instead of " + str(expected))
+        expected_dist = np.linalg.norm(parameters - [1.25, 1.25], axis=1)
+        if not np.allclose(members_dist, expected_dist) or abs(evaluation - expected_dist.mean()) > 1e-9:
+            return self.createFailedResult("check_kmeans_empty_groups", " The evaluation is " + str(evaluation) +
+                                           " instead of " + str(expected_dist.mean()))
+        return self.createOKResult("check_kmeans_empty_groups")
+
+    def check_hamerly_kmeans(self):
+        kmeansData = self.createAlgorithmData(300)
+        hamerlyData = self.createAlgorithmData(300)
+        kmeans, _ = self.runClustering(KMeansClustering, kmeansData, {"Number of restarts": 1})
+        hamerly, steps = self.runClustering(HamerlyKMeansClustering, hamerlyData, {"Number of restarts": 1})
+
+        # The same seed gives the same groups and centroids
+        kmeansGroups = kmeansData.labels(FieldRolls.StepResult)
+        hamerlyGroups = hamerlyData.labels(FieldRolls.StepResult)
+        if not np.array_equal(kmeansGroups, hamerlyGroups) or not np.allclose(kmeans.centroids, hamerly.centroids):
+            return self.createFailedResult("check_hamerly_kmeans", " The centroids are " + str(hamerly.centroids) +
+                                           " instead of " + str(kmeans.centroids))
+
+        # The bounds skip some of the distance calculations
+        allDistances = hamerlyData.shape[0] * hamerly.num_groups * steps
+        if hamerly.distance_evaluations >= allDistances:
+            return self.createFailedResult("check_hamerly_kmeans", " The distance evaluations are " +
+                                           str(hamerly.distance_evaluations) + " of " + str(allDistances))
+        return self.createOKResult("check_hamerly_kmeans")
+
+    def check_mini_batch_rows(self):
+        algorithm_data = self.createAlgorithmData(30)
+        rows_idx = np.array([2, 5, 17])
+        batch = MiniBatchKMeansClustering.batch(algorithm_data, rows_idx)
+        if not np.array_equal(np.asarray(batch), np.asarray(algorithm_data)[rows_idx]) or \
+                batch.resultValues != algorithm_data.resultValues:
+            return self.createFailedResult("check_mini_batch_rows", " The batch is " + str(np.asarray(batch)))
+
+        # The batch is a copy so setting its groups does not change the algorithm data
+        batch.set_labels(FieldRolls.StepResult, [1, 2, 1])
+        if batch.labels(FieldRolls.StepResult).tolist() != [1, 2, 1] or \
+                np.any(algorithm_data.labels(FieldRolls.StepResult) != 0):
+            return self.createFailedResult("check_mini_batch_rows", " The step results are " +
+                                           str(algorithm_data.labels(FieldRolls.StepResult)))
+        return self.createOKResult("check_mini_batch_rows")
+
+    def check_mini_batch_kmeans(self):
+        kmeansData = self.createAlgorithmData(600)
+        miniBatchData = self.createAlgorithmData(600)
+        kmeans, _ = self.runClustering(KMeansClustering, kmeansData, {"Number of restarts": 1})
+        miniBatch, steps = self.runClustering(MiniBatchKMeansClustering, miniBatchData,
+                                              {"Number of restarts": 1, "Batch size": 100})
+        if steps == KMeansClustering.max_restart_steps:
+            return self.createFailedResult("check_mini_batch_kmeans", " The algorithm did not finish the movement is " +
+                                           str(miniBatch.movement))
+
+        # Each centroid is near a centroid of KMeansClustering (the groups of the data are far from each other)
+        distances = np.sqrt(np.sum((miniBatch.centroids[:, np.newaxis] - kmeans.centroids) ** 2, axis=2))
+        if np.max(distances.min(axis=1)) > 0.1 or len(np.unique(distances.argmin(axis=1))) != kmeans.num_groups:
+            return self.createFailedResult("check_mini_batch_kmeans", " The centroids are " +
+                                           str(miniBatch.centroids) + " instead of " + str(kmeans.centroids))
+        return self.createOKResult("check_mini_batch_kmeans", "after " + str(steps) + " steps")
+
+    def check_plus_plus_centroids(self):
+        # The centroids are different observations even when most of the observations are the same
+        parameters = np.vstack([np.zeros((50, 2)), [[1.0, 0.0], [0.0, 1.0], [1.0, 1.0]]])
+        np.random.seed(0)
+        centroids = KMeansClustering.plus_plus_centroids(parameters, 4)
+        if len(np.unique(centroids, axis=0)) != 4:
+            return self.createFailedResult("check_plus_plus_centroids", " The centroids are " + str(centroids))
+        return self.createOKResult("check_plus_plus_centroids")
+
+    def check_kmeans_restarts(self):
+        algorithm_data = self.createAlgorithmData(300)
+        parameters = algorithm_data.cols_matrix(FieldRolls.Parameter, float)
+
+        # The centroids of the restart with the lowest evaluation are selected
+        np.random.seed(0)
+        seeds = np.random.randint(0, 2 ** 31 - 1, 4)
+        randomState = np.random.get_state()
+        results = [KMeansClustering.restart(parameters, 3, seed) for seed in seeds]
+        _, expected = min(results, key=lambda result: result[0])
+
+        # The restarts use their own random states so np.random is not changed
+        randomValue = np.random.random()
+        np.random.set_state(randomState)
+        if np.random.random() != randomValue:
+            return self.createFailedResult("check_kmeans_restarts", " The restarts changed the state of np.random")
+
+        np.random.seed(0)
+        centroids = KMeansClustering.best_centroids(parameters, 3, 4)
+        if not np.allclose(centroids, expected):
+            return self.createFailedResult("check_kmeans_restarts", " The centroids are " + str(centroids) +
+                                           " instead of " + str(expected))
+        return self.createOKResult("check_kmeans_restarts", "the evaluations are " +
+                                   str([result[0] for result in results]))
+
+    def check_kmeans_restarts_processes(self):
+        algorithm_data = self.createAlgorithmData(300)
+        parameters = algorithm_data.cols_matrix(FieldRolls.Parameter, float)
+
+        # The restarts in spawned processes give the same centroids as the restarts in this process
+        maxRestartWorkers = KMeansClustering.max_restart_workers
+        try:
+            centroids = []
+            for workers in [1, 2]:
+                KMeansClustering.max_restart_workers = workers
+                np.random.seed(0)
+                centroids.append(KMeansClustering.best_centroids(parameters, 3, 4))
+        finally:
+            KMeansClustering.max_restart_workers = maxRestartWorkers
+        if not np.allclose(centroids[0], centroids[1]):
+            return self.createFailedResult("check_kmeans_restarts_processes", " The centroids are " +
+                                           str(centroids[1]) + " instead of " + str(centroids[0]))
+        return self.createOKResult("check_kmeans_restarts_processes")
+
+    def check_rbf_step(self):
+        algorithm_data = self.createAlgorithmData(50)
+        network = self.createRBFNetwork(algorithm_data)
+        parameters = algorithm_data.cols_matrix(FieldRolls.Parameter, float)
+
+        # The result of each RBF method on each observation: sum(a * (exp(-|bX - c|^2) - 1) + 1)
+        metrics = DistanceMetrics()
+        expected = np.array([[np.sum(network.ltm["a"] * np.expm1(-metrics.euclidean(
+            row * network.ltm["b"][rbf_idx], network.ltm["c"][rbf_idx]) ** 2) + 1)
+            for rbf_idx in range(network.num_funcs)] for row in parameters])
+        results = np.array([[network.rbf(row, rbf_idx) for rbf_idx in range(network.num_funcs)] for row in parameters])
+        if not np.allclose(results, expected):
+            return self.createFailedResult("check_rbf_step", " The RBF results are " + str(results) +
+                                           " instead of " + str(expected))
+
+        # The step selects the maximum RBF result also when the observations are processed in many blocks
+        blockSize = DistanceMetrics.block_size
+        try:
+            DistanceMetrics.block_size = 2 * network.num_fields
+            network.step(algorithm_data)
+        finally:
+            DistanceMetrics.block_size = blockSize
+        selected = algorithm_data.labels(FieldRolls.StepResult)
+        if not np.array_equal(selected, expected.argmax(axis=1)):
+            return self.createFailedResult("check_rbf_step", " The step results are " + str(selected) +
+                                           " instead of " + str(expected.argmax(axis=1)))
+        return self.createOKResult("check_rbf_step")
+
+    def check_rbf_gradients(self):
+        algorithm_data = self.createAlgorithmData(30)
+        network = self.createRBFNetwork(algorithm_data)
+        parameters = algorithm_data.cols_matrix(FieldRolls.Parameter, float)
+        groups = algorithm_data.labels(FieldRolls.ResultPresentation)
+        _, gradients = network.gradients(parameters, groups)
+
+        # Compare each gradient to the central finite difference of the loss
+        epsilon = 1e-6
+        for key in network.ltm.keys():
+            values = network.ltm[key]
+            differences = np.zeros(values.shape)
+            for idx in np.ndindex(*values.shape):
+                value = values[idx]
+                values[idx] = value + epsilon
+                upperLoss, _ = network.gradients(parameters, groups)
+                values[idx] = value - epsilon
+                lowerLoss, _ = network.gradients(parameters, groups)
+                values[idx] = value
+                differences[idx] = (upperLoss - lowerLoss) / (2 * epsilon)
+            if not np.allclose(gradients[key], differences, rtol=1e-4, atol=1e-7):
+                return self.createFailedResult("check_rbf_gradients", " The gradients of " + key + " are " +
+                                               str(gradients[key]) + " instead of " + str(differences))
+        return self.createOKResult("check_rbf_gradients")
+
+    def check_rbf_population_step(self):
+        algorithm_data = self.createAlgorithmData(50)
+        network = self.createRBFNetwork(algorithm_data)
+        randomState = np.random.RandomState(1)
+        population = {key: randomState.rand(7, *network.ltm[key].shape) for key in network.ltm.keys()}
+
+        # The default population step performs a step with each long term memory and restores the long term memory
+        ltm = {key: np.copy(network.ltm[key]) for key in network.ltm.keys()}
+        _, _, expected = BaseAlgorithm.population_step(network, algorithm_data, population)
+        for key in ltm.keys():
+            if not np.array_equal(network.ltm[key], ltm[key]):
+                return self.createFailedResult("check_rbf_population_step", " The long term memory " + key +
+                                               " was not restored")
+
+        # All the population at once (also when the observations are processed in many blocks)
+        populationBlockSize = RBFNetwork.population_block_size
+        try:
+            for blockSize in [populationBlockSize, 7 * network.num_funcs * 3]:
+                RBFNetwork.population_block_size = blockSize
+                _, _, results = network.population_step(algorithm_data, population)
+                if not np.array_equal(results, expected):
+                    return self.createFailedResult("check_rbf_population_step", " The results are " + str(results) +
+                                                   " instead of " + str(expected))
+        finally:
+            RBFNetwork.population_block_size = populationBlockSize
+        return self.createOKResult("check_rbf_population_step")
@@ -0,0 +1,264 @@
+# Python Imports
+import sys
+import os
+import tempfile
+
+# Thired party imports
+import numpy as np
+
+# PyQt imports
+
+# My imports
+from ..Tests.TestBase import TestBase
+from ..AI.Chapter2Normalize import Normalize, NormalizeData, NormalizeCache
+from ..Utilities.FileUtiles import FileUtiles
+from ..Infrastructure.Enums import FieldRolls, FieldsTypes, NormalizeRange, NormalizeMethod
+
+
+class Chapter2Test(TestBase):
+    """description of class"""
+
+    def __init__(self, parentWindow):
+        super(Chapter2Test, self).__init__(parentWindow)
+        self.addTest("Check normalize to range")
+        self.addTest(self.check_normalize_to_range_zero_to_one)
+        self.addTest(self.check_normalize_to_range_minus_one_to_one)
+        self.addTest(self.check_normalize_to_range_constant_column)
+        self.addTest("Check qualitative normalize")
+        self.addTest(self.check_normalize_one_of_n)
+        self.addTest(self.check_normalize_equilateral_encoding)
+        self.addTest(self.check_normalize_qualitative_to_range)
+        self.addTest(self.check_normalize_one_of_n_sparse)
+        self.addTest("Check normalize model")
+        self.addTest(self.check_normalize_save_load)
+        self.addTest(self.check_normalize_csv_chunks)
+        self.addTest(self.check_normalize_typed_csv)
+        self.addTest(self.check_normalize_cache)
+        self.addTest(self.check_csv_loaders_quotes)
+
+    def createNormalize(self, values, minValue, maxValue, normalizeRange):
+        inputMatrix = np.array([["Prm"]] + [[str(value)] for value in values])
+        normalizeData = NormalizeData(0, "Prm")
+        normalizeData["normalizeRange"] = normalizeRange
+        normalizeData["min"] = minValue
+        normalizeData["max"] = maxValue
+        return Normalize(inputMatrix, [normalizeData])
+
+    def createQualitativeNormalize(self, values, valuesOrder, normalizeMethod, normalizeRange, sparseOneOfN=False):
+        inputMatrix = np.array([["Prm"]] + [[value] for value in values])
+        normalizeData = NormalizeData(0, "Prm")
+        normalizeData["fieldType"] = FieldsTypes.NominalData
+        normalizeData["normalizeMethod"] = normalizeMethod
+        normalizeData["normalizeRange"] = normalizeRange
+        normalizeData["valuesOrder"] = valuesOrder
+        normalizeData["min"] = 0
+        normalizeData["max"] = len(valuesOrder) - 1
+        return Normalize(inputMatrix, [normalizeData], sparseOneOfN)
+
+    def compareMatrix(self, checkName, algorithm_data, expected):
+        result = np.asarray(algorithm_data[:, :])
+        if not np.allclose(result, expected):
+            return self.createFailedResult(checkName, " Result is " + str(result) + " instead of " + str(expected))
+        return self.createOKResult(checkName)
+
+    def compareResult(self, checkName, algorithm_data, expected):
+        result = np.asarray(algorithm_data[:, 0]).flatten()
+        if not np.allclose(result, expected):
+            return self.createFailedResult(checkName, " Result is " + str(result) + " instead of " + str(expected))
+        return self.createOKResult(checkName)
+
+    def check_normalize_to_range_zero_to_one(self):
+        normalize = self.createNormalize([2, 4, 6, 10], 2, 10, NormalizeRange.ZeroToOne)
+        return self.compareResult("check_normalize_to_range_zero_to_one", normalize.normalize(),
+                                  [0, 0.25, 0.5, 1])
+
+    def check_normalize_to_range_minus_one_to_one(self):
+        normalize = self.createNormalize([2, 4, 6, 10], 2, 10, NormalizeRange.MinusOneToOne)
+        return self.compareResult("check_normalize_to_range_minus_one_to_one", normalize.normalize(),
+                                  [-1, -0.5, 0, 1])
+
+    def check_normalize_to_range_constant_column(self):
+        normalize = self.createNormalize([5, 5, 5], 5, 5, NormalizeRange.MinusOneToOne)
+        return self.compareResult("check_normalize_to_range_constant_column", normalize.normalize(),
+                                  [-1, -1, -1])
+
+    def check_normalize_one_of_n(self):
+        normalize = self.createQualitativeNormalize(["b", "a", "c", "b"], ["a", "b", "c"], NormalizeMethod.OneOfN,
+                                                    NormalizeRange.MinusOneToOne)
+        return self.compareMatrix("check_normalize_one_of_n", normalize.normalize(),
+                                  [[-1, 1, -1], [1, -1, -1], [-1, -1, 1], [-1, 1, -1]])
+
+    def check_normalize_equilateral_encoding(self):
+        normalize = self.createQualitativeNormalize(["c", "a", "b"], ["a", "b", "c"],
+                                                    NormalizeMethod.EquilateralEncoding, NormalizeRange.ZeroToOne)
+        equilateralMatrix = np.array(normalize.createEquilateralMatrix(3))
+        return self.compareMatrix("check_normalize_equilateral_encoding", normalize.normalize(),
+                                  equilateralMatrix[[2, 0, 1]])
+
+    def check_normalize_qualitative_to_range(self):
+        normalize = self.createQualitativeNormalize(["c", "a", "b"], ["a", "b", "c"],
+                                                    NormalizeMethod.QualitativeToRange, NormalizeRange.ZeroToOne)
+        return self.compareResult("check_normalize_qualitative_to_range", normalize.normalize(), [1, 0, 0.5])
+
+    def check_normalize_one_of_n_sparse(self):
+        normalize = self.createQualitativeNormalize(["b", "a", "c", "b"], ["a", "b", "c"], NormalizeMethod.OneOfN,
+                                                    NormalizeRange.MinusOneToOne, True)
+        algorithm_data = normalize.normalize()
+        if algorithm_data.shape[1] != 1 or algorithm_data.categories[0] != 3:
+            return self.createFailedResult("check_normalize_one_of_n_sparse", " The shape is " +
+                                           str(algorithm_data.shape) + " and the categories " +
+                                           str(algorithm_data.categories))
+
+        # The sparse matrix is the one-of-N encoding moved by the target min (-1)
+        result = algorithm_data.sparse_cols(FieldRolls.Parameter).toarray()
+        expected = np.array([[-1, 1, -1], [1, -1, -1], [-1, -1, 1], [-1, 1, -1]]) + 1
+        if not np.allclose(result, expected):
+            return self.createFailedResult("check_normalize_one_of_n_sparse",
+                                           " Result is " + str(result) + " instead of " + str(expected))
+        return self.createOKResult("check_normalize_one_of_n_sparse")
+
+    def check_normalize_save_load(self):
+        normalize = self.createQualitativeNormalize(["c", "a", "b"], ["a", "b", "c"],
+                                                    NormalizeMethod.EquilateralEncoding, NormalizeRange.ZeroToOne)
+        expected = normalize.fit().normalize()
+
+        # Save the model, load it and normalize the same data with the loaded model
+        with tempfile.TemporaryDirectory() as directory:
+            fileName = os.path.join(directory, "normalizer.npz")
+            normalize.save(fileName)
+            loaded = Normalize.load(fileName)
+        result = loaded.transform(normalize.inputMatrix)
+
+        if loaded.normalizeData[0]["normalizeMethod"] != NormalizeMethod.EquilateralEncoding:
+            return self.createFailedResult("check_normalize_save_load", " The normalize method is " +
+                                           str(loaded.normalizeData[0]["normalizeMethod"]))
+        return self.compareMatrix("check_normalize_save_load", result, expected[:, :])
+
+    def createCsvDesign(self):
+        lines = ["Size,Color,Class"] + [str(size) + "," + color + "," + result for size, color, result in
+                                        [(3, "red", "x"), (7, "blue", "y"), (1, "red", "y"),
+                                         (5, "green", "x"), (9, "blue", "x")]]
+        sizeData = NormalizeData(0, "Size")
+        colorData = NormalizeData(1, "Color")
+        colorData["fieldType"] = FieldsTypes.NominalData
+        colorData["normalizeMethod"] = NormalizeMethod.OneOfN
+        classData = NormalizeData(2, "Class")
+        classData["fieldType"] = FieldsTypes.NominalData
+        classData["normalizeMethod"] = NormalizeMethod.OneOfN
+        classData["roll"] = FieldRolls.Result
+        presentationData = NormalizeData(-1, "Presentation")
+        presentationData["roll"] = FieldRolls.ResultPresentation
+        return lines, [sizeData, colorData, classData, presentationData]
+
+    def check_normalize_csv_chunks(self):
+        lines, normalizeData = self.createCsvDesign()
+
+        # Normalize the file in chunks of 2 rows (the min, max and values are collected from the file)
+        with tempfile.TemporaryDirectory() as directory:
+            fileName = os.path.join(directory, "data.csv")
+            with open(fileName, "w") as f:
+                f.write("\n".join(lines) + "\n")
+            normalize = Normalize(None, normalizeData)
+            result = normalize.normalizeCsv(fileName, 2)
+            fileMatrix = FileUtiles.load_algorithm_data_from_csv(fileName)
+
+        if normalize.normalizeData[0]["max"] != 9 or normalize.normalizeData[1]["valuesOrder"] != \
+                ["red", "blue", "green"]:
+            return self.createFailedResult("check_normalize_csv_chunks", " The statistics are " +
+                                           str(normalize.normalizeData))
+
+        # The result is the same as normalizing the whole file
+        expected = Normalize(normalize.designMatrix(fileMatrix), normalize.normalizeData).normalize()
+        if result.resultValues != expected.resultValues:
+            return self.createFailedResult("check_normalize_csv_chunks", " The result values are " +
+                                           str(result.resultValues))
+        return self.compareMatrix("check_normalize_csv_chunks", result, expected[:, :])
+
+    def check_normalize_typed_csv(self):
+        lines, normalizeData = self.createCsvDesign()
+        normalizeData[0]["max"] = 9
+        normalizeData[1]["valuesOrder"] = ["red", "green", "blue"]
+        normalizeData[2]["valuesOrder"] = ["y", "x"]
+        normalize = Normalize(None, normalizeData).fit()
+
+        # Load the file as typed columns and compare to the normalizing of the strings matrix
+        with tempfile.TemporaryDirectory() as directory:
+            fileName = os.path.join(directory, "data.csv")
+            with open(fileName, "w") as f:
+                f.write("\n".join(lines) + "\n")
+            typedColumns = normalize.loadCsv(fileName)
+            fileMatrix = FileUtiles.load_algorithm_data_from_csv(fileName)
+
+            # A value that is not in the values order
+            normalizeData[1]["valuesOrder"] = ["red", "green"]
+            try:
+                Normalize(None, normalizeData).fit().loadCsv(fileName)
+                error = ""
+            except ValueError as e:
+                error = str(e)
+
+        if typedColumns[1].tolist() != [0, 2, 0, 1, 2] or typedColumns[0].dtype != np.float64 or \
+                not np.issubdtype(typedColumns[1].dtype, np.integer):
+            return self.createFailedResult("check_normalize_typed_csv", " The typed columns are " +
+                                           str(typedColumns))
+        if error != "'blue' is not in the values order of Color":
+            return self.createFailedResult("check_normalize_typed_csv", " The error is " + error)
+        result = normalize.transform(typedColumns)
+        expected = normalize.transform(normalize.designMatrix(fileMatrix))
+        if result.resultValues != expected.resultValues:
+            return self.createFailedResult("check_normalize_typed_csv", " The result values are " +
+                                           str(result.resultValues))
+        return self.compareMatrix("check_normalize_typed_csv", result, expected[:, :])
+
+    def check_normalize_cache(self):
+        lines, normalizeData = self.createCsvDesign()
+        normalizeData[0]["max"] = 9
+        normalizeData[1]["valuesOrder"] = ["red", "green", "blue"]
+        normalizeData[2]["valuesOrder"] = ["y", "x"]
+        normalize = Normalize(None, normalizeData).fit()
+
+        with tempfile.TemporaryDirectory() as directory:
+            fileName = os.path.join(directory, "data.csv")
+            with open(fileName, "w") as f:
+                f.write("\n".join(lines) + "\n")
+
+            # The second normalize is loaded from the cache
+            cache = NormalizeCache(os.path.join(directory, "cache"))
+            expected = cache.normalize(normalize, fileName)
+            result = cache.normalize(normalize, fileName)
+            if not isinstance(result.base, np.memmap) or len(os.listdir(cache.directory)) != 1:
+                return self.createFailedResult("check_normalize_cache", " The result was not loaded from the cache")
+            if result.resultValues != expected.resultValues or not np.allclose(result[:, :], expected[:, :]):
+                return self.createFailedResult("check_normalize_cache", " The cached result is " + str(result[:, :]))
+
+            # A cache that is too small for an entry removes it
+            smallCache = NormalizeCache(os.path.join(directory, "smallCache"), 1)
+            smallCache.normalize(normalize, fileName)
+            entriesCount = len(os.listdir(smallCache.directory))
+            del result
+        if entriesCount != 0:
+            return self.createFailedResult("check_normalize_cache", " The small cache has " + str(entriesCount) +
+                                           " entries")
+        return self.createOKResult("check_normalize_cache")
+
+    def check_csv_loaders_quotes(self):
+        lines = ['Size,Color,Class', '3,"dark, red",x', '7,blue,"y"', '', '1,"say ""hi""",y', '9,#red,x']
+        expected = [["Size", "Color", "Class"], ["3", "dark, red", "x"], ["7", "blue", "y"], ["1", 'say "hi"', "y"],
+                    ["9", "#red", "x"]]
+
+        # All the loaders parse the quoted values the same way
+        with tempfile.TemporaryDirectory() as directory:
+            fileName = os.path.join(directory, "data.csv")
+            with open(fileName, "w") as f:
+                f.write("\n".join(lines) + "\n")
+            fileMatrix = FileUtiles.load_algorithm_data_from_csv(fileName)
+            chunks = list(FileUtiles.load_csv_chunks(fileName, 2))
+            columns = FileUtiles.load_csv_columns(fileName, [(1, object), (0, float)])
+
+        if fileMatrix.tolist() != expected:
+            return self.createFailedResult("check_csv_loaders_quotes", " The matrix is " + str(fileMatrix))
+        if [row for chunk in chunks for row in chunk[1:].tolist()] != expected[1:]:
+            return self.createFailedResult("check_csv_loaders_quotes", " The chunks are " + str(chunks))
+        if columns[1].tolist() != [3, 7, 1, 9] or columns[0].tolist() != [row[1] for row in expected[1:]]:
+            return self.createFailedResult("check_csv_loaders_quotes", " The columns are " + str(columns))
+        return self.createOKResult("check_csv_loaders_quotes")
@@ -3,6 +3,8 @@ import sys
 import os
 
 # Thired party imports
+import numpy as np
+from scipy import sparse
 
 # PyQt imports
 
@@ -19,7 +21,7 @@ import os
 #     from TestBase import TestBase
 #     from Chapter3DistanceMetrics import DistanceMetrics
 from ..Tests.TestBase import TestBase
-from ..AI.Chapter3DistanceMetrics import DistanceMetrics
+from ..AI.Chapter3DistanceMetrics import DistanceMetrics, NearestNeighbours
 
 
 class Chapter3Test(TestBase):
@@ -30,6 +32,18 @@ class Chapter3Test(TestBase):
         self.addTest("Check select")
         self.addTest(self.check_select_from_boleans_result_1)
         self.addTest(self.check_select_from_boleans_result_0)
+        self.addTest("Check sparse")
+        self.addTest(self.check_sparse_distances)
+        self.addTest("Check batched distances")
+        self.addTest(self.check_one_to_many_distances)
+        self.addTest(self.check_pairwise_distances)
+        self.addTest(self.check_nearest)
+        self.addTest("Check metrics registry")
+        self.addTest(self.check_registry_metrics)
+        self.addTest(self.check_mahalanobis_blocks)
+        self.addTest(self.check_select_hamming)
+        self.addTest("Check nearest neighbours")
+        self.addTest(self.check_nearest_neighbours)
 
     def check_select_from_boleans_result_1(self):
         metrics = DistanceMetrics()
@@ -54,3 +68,134 @@ class Chapter3Test(TestBase):
                                            " Result is " + str(result) + " instead of 0")
         else:
             return self.createOKResult("check_select_from_boleans")
+
+    def check_sparse_distances(self):
+        metrics = DistanceMetrics()
+        p = np.array([0.5, 0, 0, 1, 0])
+        q = np.array([0.25, 1, 0, 0, 0])
+        for method in [metrics.euclidean, metrics.manhattan, metrics.chebyshave]:
+            denseResult = method(p, q)
+            sparseResult = method(sparse.csr_matrix([p]), q)
+            if abs(denseResult - sparseResult) > 1e-9:
+                return self.createFailedResult("check_sparse_distances", method.__name__ + " Result is " +
+                                               str(sparseResult) + " instead of " + str(denseResult))
+        return self.createOKResult("check_sparse_distances")
+
+    def check_one_to_many_distances(self):
+        metrics = DistanceMetrics()
+        p = np.array([0.5, 0, 1])
+        q = np.array([[0.5, 0, 1], [0, 0, 0], [1, 1, 1]])
+        for method, expected in [(metrics.euclidean, [0, 1.25 ** 0.5, 1.25 ** 0.5]),
+                                 (metrics.manhattan, [0, 1.5, 1.5]), (metrics.chebyshave, [0, 1, 1])]:
+            result = method(p, q)
+            if not np.allclose(result, expected):
+                return self.createFailedResult("check_one_to_many_distances", method.__name__ + " Result is " +
+                                               str(result) + " instead of " + str(expected))
+        return self.createOKResult("check_one_to_many_distances")
+
+    def check_pairwise_distances(self):
+        metrics = DistanceMetrics()
+        random_state = np.random.RandomState(0)
+        p = random_state.rand(5, 4)
+        q = random_state.rand(3, 4)
+        for method in [metrics.euclidean, metrics.manhattan, metrics.chebyshave]:
+            expected = np.array([[method(p_row, q_row) for q_row in q] for p_row in p])
+            for result in [metrics.pairwise(p, q, method.__name__),
+                           metrics.pairwise(sparse.csr_matrix(p), q, method.__name__)]:
+                if not np.allclose(result, expected):
+                    return self.createFailedResult("check_pairwise_distances", method.__name__ + " Result is " +
+                                                   str(result) + " instead of " + str(expected))
+        return self.createOKResult("check_pairwise_distances")
+
+    def check_registry_metrics(self):
+        metrics = DistanceMetrics()
+        p = np.array([[1, 0, 1, 1], [0, 0, 0, 0]])
+        q = np.array([[1, 1, 1, 1], [1, 0, 1, 1], [0, 1, 0, 0]])
+        data = np.random.RandomState(0).rand(20, 4)
+        for metric, parameters, expected in [
+                ("hamming", {}, [[1, 0, 4], [4, 3, 1]]),
+                ("sqeuclidean", {}, [[1, 0, 4], [4, 3, 1]]),
+                ("minkowski", {"order": 1}, [[1, 0, 4], [4, 3, 1]]),
+                ("cosine", {}, [[1 - 3 / 12 ** 0.5, 0, 1], [1, 1, 1]]),
+                ("mahalanobis", {"data": data}, [[metrics.distance(p_row, q_row, "mahalanobis",
+                                                                   inverse_covariance=np.linalg.pinv(np.cov(data.T)))
+                                                  for q_row in q] for p_row in p])]:
+            result = metrics.pairwise(p, q, metric, **parameters)
+            if not np.allclose(result, expected):
+                return self.createFailedResult("check_registry_metrics", metric + " Result is " + str(result) +
+                                               " instead of " + str(expected))
+        return self.createOKResult("check_registry_metrics")
+
+    def check_mahalanobis_blocks(self):
+        metrics = DistanceMetrics()
+        random_state = np.random.RandomState(0)
+        data = random_state.rand(20, 4)
+        p = random_state.rand(30, 4)
+        q = random_state.rand(30, 4)
+        inverse_covariance = np.linalg.pinv(np.cov(data.T))
+        expected = np.sqrt(np.sum(((p - q) @ inverse_covariance) * (p - q), axis=1))
+
+        # Calculate in blocks of 2 rows and count the calculations of the inverse covariance
+        calls = []
+        inverse_covariance_method = DistanceMetrics.inverse_covariance
+        block_size = DistanceMetrics.block_size
+        DistanceMetrics.inverse_covariance = staticmethod(lambda data: calls.append(1) or
+                                                          inverse_covariance_method(data))
+        DistanceMetrics.block_size = 8
+        try:
+            result = metrics.distance(p, q, "mahalanobis", data=data)
+            pairwise_result = metrics.pairwise(p, q, "mahalanobis", data=data)
+        finally:
+            DistanceMetrics.inverse_covariance = staticmethod(inverse_covariance_method)
+            DistanceMetrics.block_size = block_size
+
+        if not np.allclose(result, expected) or not np.allclose(np.diag(pairwise_result), expected):
+            return self.createFailedResult("check_mahalanobis_blocks", " Result is " + str(result) +
+                                           " instead of " + str(expected))
+        if len(calls) != 2:
+            return self.createFailedResult("check_mahalanobis_blocks", "The inverse covariance was calculated " +
+                                           str(len(calls)) + " times instead of once for each call")
+        return self.createOKResult("check_mahalanobis_blocks")
+
+    def check_select_hamming(self):
+        metrics = DistanceMetrics()
+        options = [["False", "False", "True", "False"], ["True", "True", "False", "False"]]
+        prmOptions = [["False", "True"] for idx in range(4)]
+        result = metrics.select(prmOptions, options, ["True", "False", "False", "False"], "hamming")
+        if result != 1:
+            return self.createFailedResult("check_select_hamming", " Result is " + str(result) + " instead of 1")
+        return self.createOKResult("check_select_hamming")
+
+    def check_nearest_neighbours(self):
+        prmOptions = [["a", "b", "c"] for idx in range(3)]
+        options = [["a", "a", "a"], ["a", "b", "a"], ["c", "c", "c"], ["b", "b", "a"]]
+        items = [["a", "b", "b"], ["c", "c", "b"]]
+        nearestNeighbours = NearestNeighbours(prmOptions, options)
+        distances, indexes = nearestNeighbours.query(items, 2)
+
+        # The KD-tree and the brute force give the same distances (the second neighbours have equal distances)
+        nearestNeighbours.tree = None
+        bruteForceDistances, bruteForceIndexes = nearestNeighbours.query(items, 2)
+        if not np.array_equal(indexes[:, 0], bruteForceIndexes[:, 0]) or \
+                not np.allclose(distances, bruteForceDistances, atol=1e-6):
+            return self.createFailedResult("check_nearest_neighbours", " The KD-tree result is " + str(distances) +
+                                           " and the brute force result is " + str(bruteForceDistances))
+        if indexes[:, 0].tolist() != [1, 2] or indexes.shape != (2, 2):
+            return self.createFailedResult("check_nearest_neighbours", " Result is " + str(indexes))
+
+        # One item returns the neighbours of the item
+        distances, indexes = nearestNeighbours.query(items[0])
+        if indexes.tolist() != [1]:
+            return self.createFailedResult("check_nearest_neighbours", " Result is " + str(indexes) + " instead of [1]")
+        return self.createOKResult("check_nearest_neighbours")
+
+    def check_nearest(self):
+        random_state = np.random.RandomState(0)
+        p = random_state.rand(50, 3)
+        q = random_state.rand(4, 3)
+        expected = np.argmin(DistanceMetrics().pairwise(p, q), axis=1)
+        for result in [DistanceMetrics.nearest(p, q), DistanceMetrics.nearest(sparse.csr_matrix(p), q)]:
+            if not np.array_equal(result, expected):
+                return self.createFailedResult("check_nearest", " Result is " + str(result) + " instead of " +
+                                               str(expected))
+        return self.createOKResult("check_nearest")
@@ -0,0 +1,139 @@
+# Python Imports
+
+# Thired party imports
+import numpy as np
+
+# PyQt imports
+
+# My imports
+from ..Tests.TestBase import TestBase
+from ..Tests.AlgorithmsTest import AlgorithmsTest
+from ..AI.Algorithms.RBFNetwork import RBFNetwork
+from ..AI.Training.GradientTrain import GradientTrain
+from ..AI.Training.PopulationGreedyTrain import PopulationGreedyTrain
+from ..AI.Training.GreedyTrain import GreedyTrain
+from ..AI.Training.HillClimbingTrain import HillClimbingTrain
+from ..AI.Training.AnnealingTrain import AnnealingTrain
+from ..AI.Training.EvolutionStrategyTrain import EvolutionStrategyTrain
+
+
+class TrainingTest(TestBase):
+    """description of class"""
+
+    # The maximum number of steps of a training in a check
+    max_steps = 100
+
+    # The number of steps of the algorithm in the comparison of the local search trainings to GreedyTrain
+    # and the seed of the comparison
+    search_steps = 1000
+    search_seed = 3
+
+    def __init__(self, parentWindow):
+        super(TrainingTest, self).__init__(parentWindow)
+        self.addTest("Check RBF network trainings")
+        self.addTest(self.check_gradient_train)
+        self.addTest(self.check_population_greedy_train)
+        self.addTest("Check local search trainings")
+        self.addTest(self.check_adapted_step_size)
+        self.addTest(self.check_hill_climbing_train)
+        self.addTest(self.check_annealing_train)
+        self.addTest(self.check_annealing_restore)
+        self.addTest(self.check_evolution_strategy_train)
+
+    def runTraining(self, trainingClass, values, steps=None, seed=0):
+        """
+        Train an RBFNetwork from a numpy seed until the training finishes or for a number of steps
+        (returns the training and the number of steps)
+        """
+        algorithm_data = AlgorithmsTest.createAlgorithmData(150, seed)
+        network = RBFNetwork(AlgorithmsTest.createParameters({"Number of networks": 3}), algorithm_data)
+        training = trainingClass(AlgorithmsTest.createParameters(values), network, algorithm_data)
+        np.random.seed(seed)
+        training.init()
+        for step in range(1, (steps or TrainingTest.max_steps) + 1):
+            _, _, _, finished = training.step()
+            if finished and steps is None:
+                break
+        return training, step
+
+    def checkBestLtm(self, checkName, training):
+        """
+        Check that the long term memory of the algorithm gives the best score of the training
+        """
+        training.algorithm.step(training.algorithm_data)
+        _, _, score = training.score()
+        if score != training.best_score or training.best_score != min(training.algorithm_data.evaluations):
+            return self.createFailedResult(checkName, " The score of the long term memory is " + str(score) +
+                                           " and the best score is " + str(training.best_score))
+        return self.createOKResult(checkName, "the score is " + str(training.best_score))
+
+    def check_gradient_train(self):
+        training, steps = self.runTraining(GradientTrain, {"max miss": 5, "Batch size": 10})
+        if training.best_score > 5:
+            return self.createFailedResult("check_gradient_train", " The score is " + str(training.best_score) +
+                                           " after " + str(steps) + " steps")
+        return self.createOKResult("check_gradient_train", "the score is " + str(training.best_score) + " after " +
+                                   str(steps) + " steps")
+
+    def check_population_greedy_train(self):
+        training, _ = self.runTraining(PopulationGreedyTrain, {"max miss": 0, "Population size": 10}, 20)
+        return self.checkBestLtm("check_population_greedy_train", training)
+
+    def check_adapted_step_size(self):
+        # One success and four failures keep the step size (the 1/5 success rule)
+        stepSize = HillClimbingTrain.adapted_step_size(0.2, True)
+        for _ in range(4):
+            stepSize = HillClimbingTrain.adapted_step_size(stepSize, False)
+        if abs(stepSize - 0.2) > 1e-9:
+            return self.createFailedResult("check_adapted_step_size", " The step size is " + str(stepSize))
+
+        # The step size is kept between the limits
+        minStepSize = HillClimbingTrain.adapted_step_size(HillClimbingTrain.min_step_size, False)
+        maxStepSize = HillClimbingTrain.adapted_step_size(HillClimbingTrain.max_step_size, True)
+        if minStepSize != HillClimbingTrain.min_step_size or maxStepSize != HillClimbingTrain.max_step_size:
+            return self.createFailedResult("check_adapted_step_size", " The limits are " + str(minStepSize) +
+                                           " " + str(maxStepSize))
+        return self.createOKResult("check_adapted_step_size")
+
+    def checkLocalSearch(self, checkName, trainingClass, values, steps):
+        """
+        Check that a local search training is better than GreedyTrain with the same number of
+        steps of the algorithm and that the long term memory of the algorithm gives the best score
+        """
+        greedy, _ = self.runTraining(GreedyTrain, {"max miss": 0}, TrainingTest.search_steps,
+                                     TrainingTest.search_seed)
+        training, _ = self.runTraining(trainingClass, values, steps, TrainingTest.search_seed)
+        if training.best_score >= greedy.best_score:
+            return self.createFailedResult(checkName, " The score is " + str(training.best_score) +
+                                           " and the score of GreedyTrain is " + str(greedy.best_score))
+        training.test(AlgorithmsTest.createAlgorithmData(30, 1))
+        return self.checkBestLtm(checkName, training)
+
+    def check_hill_climbing_train(self):
+        return self.checkLocalSearch("check_hill_climbing_train", HillClimbingTrain, {"max miss": 0},
+                                     TrainingTest.search_steps)
+
+    def check_annealing_train(self):
+        return self.checkLocalSearch("check_annealing_train", AnnealingTrain, {"max miss": 0},
+                                     TrainingTest.search_steps)
+
+    def check_annealing_restore(self):
+        # Perform steps until a worse score is accepted and check that the test restores the best long term memory
+        algorithm_data = AlgorithmsTest.createAlgorithmData(150)
+        network = RBFNetwork(AlgorithmsTest.createParameters({"Number of networks": 3}), algorithm_data)
+        training = AnnealingTrain(AlgorithmsTest.createParameters({"max miss": 0}), network, algorithm_data)
+        np.random.seed(0)
+        training.init()
+        for _ in range(TrainingTest.max_steps):
+            training.step()
+            if training.current_score > training.best_score:
+                break
+        else:
+            return self.createFailedResult("check_annealing_restore", " A worse score was not accepted")
+        training.test(AlgorithmsTest.createAlgorithmData(30, 1))
+        return self.checkBestLtm("check_annealing_restore", training)
+
+    def check_evolution_strategy_train(self):
+        # Each step performs a step of the algorithm for each offspring
+        return self.checkLocalSearch("check_evolution_strategy_train", EvolutionStrategyTrain,
+                                     {"max miss": 0, "Population size": 10}, TrainingTest.search_steps // 10)
@@ -1,5 +1,8 @@
 from . import AlgorithmDataInterfaceTest
 from . import AlgorithmDataTest
+from . import AlgorithmsTest
+from . import Chapter2Test
 from . import Chapter3Test
 from . import CheckTypesTest
-from . import TestBase
\ No newline at end of file
+from . import TestBase
+from . import TrainingTest
\ No newline at end of file
@@ -685,7 +685,8 @@ class CharacterIdentifier(QDialog, Ui_CharacterIdentifier):
 
             This method does the following :
             -#  Get a character item (using CharIdentifierInput dialog)
-            -#  Resolve the neerest character (using the select method of the DistanceMetrics)
+            -#  Resolve the neerest character (using the select method of the DistanceMetrics
+                with the hamming distance on the boolean grids)
             -#  Present the result of the selection (using the CharacterResolveResult dialog)
         """
         # Get the character to identify
@@ -702,7 +703,7 @@ class CharacterIdentifier(QDialog, Ui_CharacterIdentifier):
 
         distanceMetrics = DistanceMetrics()
         prmOptions = [["False", "True"] for idx in range(len(options[0]))]
-        optionSelected = distanceMetrics.select(prmOptions, options, itemParameters)
+        optionSelected = distanceMetrics.select(prmOptions, options, itemParameters, "hamming")
 
         # Present the results
         characterResolveResult = CharacterResolveResult(self, itemToResolve, items[optionSelected])
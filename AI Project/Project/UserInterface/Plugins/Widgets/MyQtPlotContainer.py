@@ -261,7 +261,7 @@ class ClusterPlotHandler(PlotHandler):
 
     def createMembers(self):
         pass
-        self.possibleResults = np.unique(self.algorithm_data[:, FieldRolls.ResultPresentation])
+        self.possibleResults = np.unique(self.algorithm_data.labels(FieldRolls.ResultPresentation))
         self.reducedDimensions = self.algorithm_data[:, FieldRolls.ParameterReduction]
         self.resultNames = self.algorithm_data.resultValues
         self.resultSize = len(self.resultNames)
@@ -271,8 +271,8 @@ class ClusterPlotHandler(PlotHandler):
             for idx in range(self.numOptions)
         ]
         self.labels = np.array(self.labels)
-        self.resultPresentationIdx = self.algorithm_data[:, FieldRolls.ResultPresentation]
-        self.stepResultsIdx = self.algorithm_data[:, FieldRolls.StepResult]
+        self.resultPresentationIdx = self.algorithm_data.labels(FieldRolls.ResultPresentation)
+        self.stepResultsIdx = self.algorithm_data.labels(FieldRolls.StepResult)
 
     def createInitialFigure(self):
         """
@@ -290,8 +290,8 @@ class ClusterPlotHandler(PlotHandler):
         """
         Method : drawFigure
         """
-        combinedArray = self.algorithm_data[:, FieldRolls.ResultPresentation] * 3 + self.algorithm_data[:, FieldRolls.
-                                                                                                        StepResult]
+        combinedArray = self.algorithm_data.labels(FieldRolls.ResultPresentation) * 3 + \
+            self.algorithm_data.labels(FieldRolls.StepResult)
 
         
         self.container.axis.cla()
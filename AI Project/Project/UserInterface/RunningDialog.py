@@ -34,8 +34,8 @@ from ..UserInterface.Plugins.Widgets.MyQtPlotContainer import EvaluationsPlotHan
 from ..Utilities.FileUtiles import FileUtiles
 from ..Utilities.PythonUtilities import PythonUtilities
 from ..Utilities.PythonTools import PythonTools
-from ..AI.Chapter2Normalize import Normalize
-from ..Paths import DATA_PATH
+from ..AI.Chapter2Normalize import Normalize, NormalizeCache
+from ..Paths import DATA_PATH, NORMALIZE_CACHE_PATH, NORMALIZE_MODELS_PATH
 
 # The ParametersDialog (and inside it the ParametersWidget) Gets a class (for example the BaseTrain class)
 # and lets the user choose from all it's sub classes. for this to work all the sub classes has to
@@ -80,7 +80,7 @@ class RunningDialogModel(object):
     Process methods of an algorithm according to requests of the dialog
 
     ## The sequence of processing an algorithm:
-    -#    Load -  load the data from csv files to self.data_matrix self.test_data_matrix
+    -#    Load -  load the data from the csv file to self.data_matrix (the test file is loaded by the normalize)
     -#    Normalize - Show a dialog for designing the algorithm data and produce a normalized
                       self.algorithm_data and self.test_algorithm_data according to the design
     -#    Init - Activate the init method of the train  
@@ -116,7 +116,6 @@ class RunningDialogModel(object):
     #### Variables used by the normalized actions
     -#  self.normalize_data - The normalize data as designed by the AlgorithmDataDesign dialog
     -#  self.data_matrix - The data matrix as generated by the AlgorithmDataDesign dialog
-    -#  self.test_data_matrix - The test data matrix as generated in the dialog using the same AlgorithmDataDesign dialog
     
 
     #### Variables used in the step/run_to_end actions
@@ -217,9 +216,11 @@ class RunningDialogModel(object):
         """
         load a csv file with the data
 
-        #### There are 2 files to load:  
-        -#    For learning -  The self.fileneme variable 
-        -#    For testing - The self.test_filename   variable
+        #### There are 2 files:  
+        -#    For learning -  The self.fileneme variable is loaded to a strings matrix
+              (for the AlgorithmDataDesign dialog)
+        -#    For testing - The self.test_filename variable is only checked. It is loaded by the normalize
+              straight to typed columns (see Normalize.loadCsv)
 
         Returns:  
             bool    - False if error True if ok
@@ -233,7 +234,8 @@ class RunningDialogModel(object):
             return False, False, "Error while loading algorithm data file :" + "\n" + self.filename, str(e)
 
         try:
-            self.test_data_matrix = FileUtiles.load_algorithm_data_from_csv(self.test_filename)
+            with open(self.test_filename, 'rt'):
+                pass
         except Exception as e:
             return False, False, "Error while loading training data file :" + "\n" + self.test_filename, str(e)
 
@@ -250,20 +252,45 @@ class RunningDialogModel(object):
         -#  Show a dialog in which the design of the algorithm data is done - done by the RunningDialog  
         -#  Normalize the algorithm_data and the test_algorithm_data according to the normalize data generated 
             in the dialog  
+
+        The normalize model is fitted once, used for the algorithm data and the test data
+        and saved (see normalizer_filename) so new data can be normalized with it
+
+        The data matrix that was loaded (see load) and designed is normalized (the file is not parsed again).
+        The test file is parsed once straight to typed columns (see Normalize.loadCsv)
+
+        The normalized data is kept in a NormalizeCache so normalizing the same file with
+        the same design again (like in scipy and scikitLearn) loads the result from the cache
         
         Returns:  
-            bool    : True
-            bool    : True  
+            bool    : False if error True if ok
+            bool    : False if error True if ok  
             string  : The method end message
-            string  : ""  
+            string  : A message if the normalize model was not saved or the loading exception message
         
         """
 
         # Normalize
-        normalize = Normalize(self.data_matrix, self.normalize_data)
-        self.algorithm_data = normalize.normalize()
-        normalize = Normalize(self.test_data_matrix, self.normalize_data)
-        self.test_algorithm_data = normalize.normalize()
+        self.normalizer = Normalize(None, self.normalize_data).fit()
+        try:
+            try:
+                normalize_cache = NormalizeCache(NORMALIZE_CACHE_PATH)
+                self.algorithm_data = normalize_cache.normalize(self.normalizer, self.filename, self.data_matrix)
+                self.test_algorithm_data = normalize_cache.normalize(self.normalizer, self.test_filename)
+            except OSError:
+                self.algorithm_data = self.normalizer.transform(self.data_matrix)
+                self.test_algorithm_data = self.normalizer.transform(self.normalizer.loadCsv(self.test_filename))
+        except Exception as e:
+            return False, False, "Error while normalizing the data files :" + "\n" + self.filename + "\n" + \
+                self.test_filename, str(e)
+
+        # Save the normalize model
+        save_message = ""
+        try:
+            os.makedirs(NORMALIZE_MODELS_PATH, exist_ok=True)
+            self.normalizer.save(self.normalizer_filename())
+        except Exception as e:
+            save_message = "Failed to save the normalize model :\n" + str(e)
 
         # Create the algorithm object and the train object
         if isinstance(self.algorithm, str):
@@ -279,7 +306,21 @@ class RunningDialogModel(object):
         self.view.initPlot()
 
         #return values
-        return True, True, "Finished Normalizing Data", ""
+        return True, True, "Finished Normalizing Data", save_message
+
+    def normalizer_filename(self) -> str:
+        """
+        Create the normalize model file name from the data file name
+
+        The construction : add "_normalizer.npz" at the end of the name of the data file
+        and put it in the normalize models directory of the project (NORMALIZE_MODELS_PATH)
+        so the directory of the data is not changed
+
+        Returns:
+            string  : The file name
+        """
+        name = os.path.splitext(os.path.basename(self.filename))[0]
+        return os.path.join(NORMALIZE_MODELS_PATH, name + "_normalizer.npz")
 
     def init(self):
         """
@@ -418,7 +459,7 @@ class RunningDialogModel(object):
         Activate the scipy version of the algorithm
 
         -   The scipy action is using the same data as the algorithm
-        -   The unchanged data is found in the self.data_matrix and self.test_data_matrix
+        -   The unchanged data is found in the self.data_matrix and the test file
         -   So we have to continue from there that means to generate 
             the self.algorithm_data and self.test_algorithm_data using the normalize method
         -   After it we can activate the method
@@ -434,7 +475,9 @@ class RunningDialogModel(object):
 
         """
         # reactivate the normalize for regenerating the algorithm_data and the test_algorithm_data
-        self.normalize()
+        success, result, end_message, message = self.normalize()
+        if not success:
+            return success, result, end_message, message
 
         # After this action only the load action is allowed
         self.init_enable_actions()
@@ -453,7 +496,7 @@ class RunningDialogModel(object):
         Activate the scikit - Learn version of the algorithm
 
         -   The scipy action is using the same data of the algorithm
-        -   The unchanged data is found in the self.data_matrix and self.test_data_matrix
+        -   The unchanged data is found in the self.data_matrix and the test file
         -   So we have to continue from then that means to generate 
             the self.algorithm_data and self.test_algorithm_data using the normalize method
         -   After it we can activate the method
@@ -469,7 +512,9 @@ class RunningDialogModel(object):
 
         """
         # reactivate the normalize for regenerating the algorithm_data and the test_algorithm_data
-        self.normalize()
+        success, result, end_message, message = self.normalize()
+        if not success:
+            return success, result, end_message, message
 
         # After this action only the load action is allowed
         self.init_enable_actions()
@@ -762,7 +807,6 @@ class RunningDialog(QDialog, Ui_RunningDialog):
         algorithmDataDesign.exec_()
         self.model.normalize_data = algorithmDataDesign.normalizeData
         self.model.data_matrix = algorithmDataDesign.dataMatrix
-        _, _, self.model.test_data_matrix = algorithmDataDesign.loadNormalizeData(self.model.test_data_matrix)
 
         # create the model
         self.activate(Actions.Normalize, self.label_normalizeTime, "Normalize")
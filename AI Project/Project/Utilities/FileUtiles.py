@@ -19,7 +19,86 @@ class FileUtiles(object):
 
     @staticmethod
     def load_algorithm_data_from_csv(filename):
-        return np.genfromtxt(filename, dtype=np.dtype(str), delimiter=',')
+        """ static method : load_algorithm_data_from_csv
+
+        Load a csv file to a string matrix (the first row is the names)
+
+        The file is parsed with csv.reader like load_csv_columns and load_csv_chunks
+        so quoted values are read the same way by all the loaders
+
+        Args:
+            filename - string: The file name
+
+        Returns:
+            2 dimensions np.ndarray of strings
+
+        """
+        with open(filename, 'rt', newline='') as f:
+            return np.array([row for row in csv.reader(f) if len(row) > 0], dtype=str, ndmin=2)
+
+    @staticmethod
+    def load_csv_columns(filename, columns, converters=None):
+        """ static method : load_csv_columns
+
+        Load columns of a csv file in one pass, each column is parsed straight to its own type
+        (the first row of the file, the names, is not loaded)
+
+        Quoted values are parsed like csv.reader (see load_csv_chunks)
+
+        Args:
+            filename - string: The file name
+            columns - list of (int, dtype): The index of the column in the file and the type of the column
+            converters - dict of int to function: A function that converts a value (string) of a column in the file
+                         to the type of the column (for example a qualitative value to its index). default: None
+
+        Returns:
+            list of np.ndarray : A 1 dimension array for each column
+
+        """
+        # Each column of the file is read once (a column that is asked with different types is read as object)
+        file_types = {}
+        for idx, dtype in columns:
+            if file_types.setdefault(idx, np.dtype(dtype)) != np.dtype(dtype):
+                file_types[idx] = np.dtype(object)
+        usecols = sorted(file_types.keys())
+        if len(usecols) == 0:
+            return []
+
+        table = np.loadtxt(filename, delimiter=',', skiprows=1, ndmin=1, usecols=usecols, quotechar='"',
+                           comments=None, converters=converters,
+                           dtype=[("c" + str(idx), file_types[idx]) for idx in usecols])
+        return [table["c" + str(idx)].astype(dtype, copy=False) for idx, dtype in columns]
+
+    @staticmethod
+    def load_csv_chunks(filename, chunk_size=10000):
+        """ static method : load_csv_chunks
+
+        Load a csv file in chunks of rows (the file is not read to the memory at once)
+
+        Each chunk is a string matrix like the one returned by load_algorithm_data_from_csv:
+        the first row of the chunk is the first row of the file (the names)
+
+        Args:
+            filename - string: The file name
+            chunk_size - int: The maximum number of rows (without the names row) in a chunk
+
+        Returns:
+            generator of 2 dimensions np.ndarray of strings
+
+        """
+        with open(filename, 'rt', newline='') as f:
+            reader = csv.reader(f)
+            names = next(reader)
+            rows = []
+            for row in reader:
+                if len(row) == 0:
+                    continue
+                rows.append(row)
+                if len(rows) == chunk_size:
+                    yield np.array([names] + rows, dtype=str)
+                    rows = []
+            if len(rows) > 0:
+                yield np.array([names] + rows, dtype=str)
 
     @staticmethod
     def GetAllFilesInFolder(dir, removeExtention=True, extention='.py'):